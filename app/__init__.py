@@ -17,6 +17,12 @@ def create_app(config_name: str):
     migrate = Migrate(app, db)
     login_manager.init_app(app)
     mail.init_app(app)
+
+    from . import http_client
+    http_client.init_app(app)
+
+    from . import executor
+    executor.init_app(app)
     
     login_manager.login_view = 'main.login'
     login_manager.login_message = 'Zaloguj się, aby uzyskać dostęp do tej strony.'
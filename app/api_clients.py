@@ -1,10 +1,26 @@
 # app/api_clients.py
 import re
-import unicodedata
+import threading
 import requests
-from functools import lru_cache
 from flask import current_app
 from .constans import WEATHER_CODES_PL, PLACE_TYPES_PL
+from .http_client import upstream_get, OPEN_METEO, GEOAPIFY, GOOGLE_PLACES, CircuitOpenError
+from .cache import (
+    normalize_cache_key,
+    geocode_cache_get,
+    geocode_cache_put,
+    weather_cache_get,
+    weather_cache_get_many,
+    weather_cache_put,
+    attractions_cache_get,
+    attractions_cache_put,
+    CURRENT_WEATHER_KEY,
+)
+from .executor import submit_background
+from .singleflight import single_flight
+from .geocoder import local_geocode
+from .utils import normalize_to_ascii
+from .forecast import DailySeries, current_humidity
 
 
 def _weather_code_to_polish(code: int) -> str:
@@ -24,14 +40,6 @@ def _format_date_val(val):
     return str(val)
 
 
-def normalize_to_ascii(s: str) -> str:
-    """Prosta transliteracja do ASCII: Łódź -> Lodz"""
-    if not s:
-        return s
-    nk = unicodedata.normalize("NFKD", s)
-    return "".join(c for c in nk if not unicodedata.combining(c))
-
-
 def build_geocode_variants(raw: str) -> list:
     if not raw:
         return []
@@ -78,6 +86,7 @@ def get_weather(
     end_date=None,
     lat: float = None,
     lon: float = None,
+    country: str = None,
 ) -> dict | None:
     if lat is None or lon is None:
         if not city:
@@ -86,7 +95,7 @@ def get_weather(
             )
             return None
 
-        coords = get_coordinates_for_city(city)
+        coords = get_coordinates_for_city(city, country)
         if not coords:
             current_app.logger.warning(
                 f"Nie udało się pobrać współrzędnych dla: {city}"
@@ -96,32 +105,260 @@ def get_weather(
         lat = coords.get("lat")
         lon = coords.get("lon")
 
-    if lat is None or lon is None:
+    request = _weather_request(city, lat, lon, start_date, end_date)
+    if request is None:
+        return None
+    cell_key, lat, lon, days = request
+
+    cached = weather_cache_get(cell_key, days + [CURRENT_WEATHER_KEY])
+    missing_days = [d for d in days if d not in cached]
+    need_current = CURRENT_WEATHER_KEY not in cached
+
+    if missing_days or need_current:
+        # Równoczesne żądania o te same brakujące dni tej komórki czekają na jedno zapytanie
+        flight_key = f"{cell_key}|{','.join(missing_days)}|{need_current}"
+        fresh = single_flight(
+            "weather", flight_key, _fetch_missing_weather, cell_key, lat, lon, city, missing_days, need_current
+        )
+        cached.update(fresh)
+
+    return _assemble_weather(cached, days)
+
+
+# Ile lokalizacji wysyłamy w jednym zapytaniu do Open-Meteo (ograniczenie długości URL)
+WEATHER_BULK_MAX_LOCATIONS = 50
+
+
+def get_weather_bulk(locations: list[dict], start_date=None, end_date=None) -> list[dict | None]:
+    """
+    Pogoda dla wielu miejsc naraz ({"lat", "lon"} - np. miasta na stronie sugestii).
+
+    Zwraca listę wyników w kolejności `locations` (format jak get_weather, None gdy brak danych).
+    Brakujące komórki siatki pobieramy jednym zapytaniem do Open-Meteo z listą współrzędnych
+    rozdzielonych przecinkami, a każdą lokalizację z odpowiedzi zapisujemy w cache osobno.
+    """
+    days = _date_range(_format_date_val(start_date), _format_date_val(end_date))
+    cells = []
+    for loc in locations:
+        try:
+            lat, lon = snap_to_weather_grid(float(loc["lat"]), float(loc["lon"]))
+        except (KeyError, TypeError, ValueError):
+            cells.append(None)
+            continue
+        cells.append((f"{lat:.3f},{lon:.3f}", lat, lon))
+
+    unique = {cell[0]: cell for cell in cells if cell is not None}
+    cached = weather_cache_get_many(list(unique), days + [CURRENT_WEATHER_KEY])
+
+    to_fetch = [
+        cell for key, cell in unique.items()
+        if CURRENT_WEATHER_KEY not in cached.get(key, {}) or any(d not in cached.get(key, {}) for d in days)
+    ]
+    for i in range(0, len(to_fetch), WEATHER_BULK_MAX_LOCATIONS):
+        chunk = to_fetch[i:i + WEATHER_BULK_MAX_LOCATIONS]
+        for (cell_key, _, _), data in zip(chunk, _fetch_forecast_bulk(chunk, days[0], days[-1])):
+            if isinstance(data, dict):
+                cached[cell_key] = _store_forecast(cell_key, data, cell_key, days, cached.get(cell_key, {}))
+
+    return [None if cell is None else _assemble_weather(dict(cached.get(cell[0], {})), days) for cell in cells]
+
+
+def _fetch_forecast_bulk(cells: list[tuple], s: str, e: str) -> list:
+    """Jedno zapytanie Open-Meteo dla wielu komórek; zwraca listę odpowiedzi w kolejności komórek."""
+    if not cells:
+        return []
+    data = _fetch_forecast(
+        ",".join(str(lat) for _, lat, _ in cells),
+        ",".join(str(lon) for _, _, lon in cells),
+        f"{len(cells)} lokalizacji",
+        s,
+        e,
+    )
+    if data is None:
+        return []
+    # Dla jednej lokalizacji Open-Meteo zwraca obiekt, dla wielu - listę obiektów
+    return [data] if isinstance(data, dict) else data
+
+
+def _weather_request(city: str, lat, lon, start_date, end_date) -> tuple | None:
+    """
+    Zwraca (klucz komórki, lat, lon, lista dni) albo None przy złych współrzędnych.
+    Prognozy trzymamy w cache per (komórka siatki, dzień). Pobieramy pogodę dla środka
+    komórki, więc wszyscy użytkownicy pytający o okolicę dzielą te same dane.
+    """
+    try:
+        lat = float(lat)
+        lon = float(lon)
+    except (TypeError, ValueError):
         current_app.logger.error(
             f"Nieprawidłowe lub brakujące współrzędne dla zapytania pogodowego (miasto: {city})"
         )
         return None
 
-    base_url = "https://api.open-meteo.com/v1/forecast"
+    lat, lon = snap_to_weather_grid(lat, lon)
+    cell_key = f"{lat:.3f},{lon:.3f}"
+    days = _date_range(_format_date_val(start_date), _format_date_val(end_date))
+    return cell_key, lat, lon, days
+
+
+def _assemble_weather(cached: dict, days: list[str]) -> dict | None:
+    """
+    Składa wynik get_weather z wpisów cache. Prognoza dzienna ("daily") to DailySeries -
+    słowniki dni budujemy dopiero dla szablonu (services._build_plan).
+    """
+    current = cached.get(CURRENT_WEATHER_KEY)
+    series = DailySeries.from_cache(days, cached)
+    if current is None:
+        if not len(series):
+            # Brak bieżącej pogody i prognozy (API niedostępne i nic w cache)
+            return None
+        # Częściowe dane - sama prognoza dzienna jest wciąż przydatna w planie
+        return {"opis": "Brak aktualnych danych pogodowych", "daily": series}
+
+    result = dict(current)
+    if len(series):
+        series.description = current.get("opis", series.description)
+        result["daily"] = series
+    return result
+
+
+def _recheck_weather_cache(cell_key: str, missing_days: list[str], need_current: bool) -> tuple[dict, list[str], bool]:
+    """Ponowne sprawdzenie cache - inny worker mógł go uzupełnić, kiedy czekaliśmy na blokadę."""
+    wanted = missing_days + ([CURRENT_WEATHER_KEY] if need_current else [])
+    fresh = weather_cache_get(cell_key, wanted)
+    missing_days = [d for d in missing_days if d not in fresh]
+    need_current = need_current and CURRENT_WEATHER_KEY not in fresh
+    return fresh, missing_days, need_current
+
+
+def _store_forecast(cell_key: str, data: dict, city: str, missing_days: list[str], fresh: dict) -> dict:
+    """Parsuje odpowiedź Open-Meteo, zapisuje brakujące dni (i bieżącą pogodę) w cache, uzupełnia fresh."""
+    fetched = {}
+    current = _parse_current_weather(data, city)
+    if current is not None:
+        fetched[CURRENT_WEATHER_KEY] = current
+
+    series = DailySeries(data.get("daily") or {})
+    for day_str in missing_days:
+        i = series.index_of(day_str)
+        # Dni poza zakresem prognozy zapamiętujemy jako niedostępne, żeby nie pytać o nie co chwilę
+        fetched[day_str] = series.row(i) if i is not None else {"date": day_str, "unavailable": True}
+    weather_cache_put(cell_key, fetched)
+    fresh.update(fetched)
+    return fresh
+
+
+def _fetch_missing_weather(
+    cell_key: str, lat: float, lon: float, city: str, missing_days: list[str], need_current: bool
+) -> dict:
+    """Pobiera z Open-Meteo brakujące dni (i bieżącą pogodę), zapisuje je w cache i zwraca {dzień: payload}."""
+    fresh, missing_days, need_current = _recheck_weather_cache(cell_key, missing_days, need_current)
+    if not missing_days and not need_current:
+        return fresh
+
+    data = _fetch_forecast(
+        lat, lon, city, missing_days[0] if missing_days else None, missing_days[-1] if missing_days else None
+    )
+    if data is None:
+        return _expired_weather_fallback(cell_key, missing_days, need_current, fresh)
+    return _store_forecast(cell_key, data, city, missing_days, fresh)
+
+
+def _expired_weather_fallback(cell_key: str, missing_days: list[str], need_current: bool, fresh: dict) -> dict:
+    """Open-Meteo niedostępne - uzupełniamy brakujące dni wygasłymi wpisami z cache (bez ich odnawiania)."""
+    wanted = missing_days + ([CURRENT_WEATHER_KEY] if need_current else [])
+    expired = weather_cache_get(cell_key, wanted, include_expired=True)
+    if expired:
+        current_app.logger.info(
+            f"Open-Meteo niedostępne - używam nieaktualnej pogody z cache dla {cell_key} ({len(expired)} wpisów)."
+        )
+        fresh.update(expired)
+    return fresh
+
+
+def snap_to_weather_grid(lat: float, lon: float) -> tuple[float, float]:
+    """Przyciąga współrzędne do środka komórki siatki pogodowej (WEATHER_GRID_DEG stopni)."""
+    step = current_app.config.get("WEATHER_GRID_DEG", 0.1)
+    return round(round(lat / step) * step, 3), round(round(lon / step) * step, 3)
+
+
+def _date_range(start: str | None, end: str | None) -> list[str]:
+    """Lista dni ISO od start do end włącznie. Bez dat - 7 dni od dziś (domyślny zakres Open-Meteo)."""
+    from datetime import date, timedelta
+
+    try:
+        first = date.fromisoformat(start) if start else date.today()
+        last = date.fromisoformat(end) if end else first + timedelta(days=6)
+    except ValueError:
+        first = date.today()
+        last = first + timedelta(days=6)
+    if last < first:
+        last = first
+    return [(first + timedelta(days=i)).isoformat() for i in range((last - first).days + 1)]
+
+
+OPEN_METEO_FORECAST_URL = "https://api.open-meteo.com/v1/forecast"
+
+
+def _forecast_params(lat: float, lon: float, s: str = None, e: str = None) -> dict:
     params = {
         "latitude": lat,
         "longitude": lon,
         "current_weather": True,
-        "hourly": "relativehumidity_2m",
+        # Wilgotność tylko dla bieżącej godziny - zamiast serii godzinowej dla całego zakresu dat
+        "current": "relative_humidity_2m",
         "daily": "temperature_2m_max,temperature_2m_min,precipitation_sum,weathercode,windspeed_10m_max",
         "timezone": "auto",
         "temperature_unit": "celsius",
     }
 
-    s = _format_date_val(start_date)
-    e = _format_date_val(end_date)
     if s:
         params["start_date"] = s
     if e:
         params["end_date"] = e
+    if not s and not e:
+        params.pop("daily")
+        params["forecast_days"] = 1
+    return params
+
+
+def _forecast_fallbacks(params: dict, s: str, e: str, body: str) -> list[dict]:
+    """
+    Warianty parametrów do ponowienia po błędzie Open-Meteo "out of allowed range":
+    najpierw zakres dat przycięty do dozwolonego, na końcu sama bieżąca pogoda.
+    """
+    fallbacks = []
+    if s and e:
+        m = re.search(r"from\s+(\d{4}-\d{2}-\d{2})\s+to\s+(\d{4}-\d{2}-\d{2})", body)
+        if m:
+            allowed_start = m.group(1)
+            allowed_end = m.group(2)
+            try:
+                from datetime import datetime
+
+                req_s = datetime.fromisoformat(s).date()
+                a_s = datetime.fromisoformat(allowed_start).date()
+                a_e = datetime.fromisoformat(allowed_end).date()
+                new_s = max(req_s, a_s)
+                new_e = min(datetime.fromisoformat(e).date(), a_e)
+                if new_s <= new_e:
+                    fallbacks.append({**params, "start_date": new_s.isoformat(), "end_date": new_e.isoformat()})
+            except ValueError:
+                pass
+
+    fallbacks.append({k: v for k, v in params.items() if k not in ("start_date", "end_date", "daily")})
+    return fallbacks
+
+
+def _fetch_forecast(lat: float, lon: float, city: str = None, s: str = None, e: str = None) -> dict | None:
+    """
+    Pobiera surową prognozę z Open-Meteo. Bez s/e pobiera tylko bieżącą pogodę.
+    Zwraca zdekodowany JSON albo None przy błędzie.
+    """
+    params = _forecast_params(lat, lon, s, e)
 
     try:
-        response = requests.get(base_url, params=params, timeout=10)
+        response = upstream_get(OPEN_METEO, OPEN_METEO_FORECAST_URL, params=params)
         try:
             response.raise_for_status()
         except requests.exceptions.HTTPError as http_err:
@@ -131,43 +368,27 @@ def get_weather(
                 body = ""
             current_app.logger.error(f"Open-Meteo HTTPError: {http_err} - body: {body}")
             if body and "out of allowed range" in body:
-                fixed = False
-                if s and e:
-                    m = re.search(r"from\s+(\d{4}-\d{2}-\d{2})\s+to\s+(\d{4}-\d{2}-\d{2})", body)
-                    if m:
-                        allowed_start = m.group(1)
-                        allowed_end = m.group(2)
-                        try:
-                            from datetime import datetime
-
-                            req_s = datetime.fromisoformat(s).date()
-                            a_s = datetime.fromisoformat(allowed_start).date()
-                            a_e = datetime.fromisoformat(allowed_end).date()
-                            new_s = max(req_s, a_s)
-                            new_e = min(datetime.fromisoformat(e).date(), a_e)
-                            if new_s <= new_e:
-                                params["start_date"] = new_s.isoformat()
-                                params["end_date"] = new_e.isoformat()
-                                response = requests.get(base_url, params=params, timeout=10)
-                                response.raise_for_status()
-                                fixed = True
-                        except Exception:
-                            pass
-                
-                if not fixed:
-                    params.pop("start_date", None)
-                    params.pop("end_date", None)
-                    params.pop("daily", None)
-                    response = requests.get(base_url, params=params, timeout=10)
-                    response.raise_for_status()
+                fallbacks = _forecast_fallbacks(params, s, e, body)
+                for i, fallback_params in enumerate(fallbacks):
+                    try:
+                        response = upstream_get(OPEN_METEO, OPEN_METEO_FORECAST_URL, params=fallback_params)
+                        response.raise_for_status()
+                        break
+                    except requests.exceptions.RequestException as fallback_err:
+                        # Błąd ostatniego wariantu (lub otwarty bezpiecznik) obsługuje zewnętrzny except
+                        if i == len(fallbacks) - 1 or isinstance(fallback_err, CircuitOpenError):
+                            raise
             else:
                 return None
     except requests.exceptions.RequestException as e:
         current_app.logger.error(f"Błąd podczas zapytania do Open-Meteo: {e}")
         return None
 
-    data = response.json()
+    return response.json()
 
+
+def _parse_current_weather(data: dict, city: str = None) -> dict | None:
+    """Wyciąga bieżącą pogodę (temperatura, opis, wilgotność, wiatr) z odpowiedzi Open-Meteo."""
     current = data.get("current_weather")
     if not current:
         current_app.logger.warning(f"Brak current_weather w odpowiedzi Open-Meteo dla: {city}")
@@ -179,98 +400,11 @@ def get_weather(
         current_app.logger.error(f"Niepełne dane pogodowe od Open-Meteo dla: {city} -> {current}")
         return None
 
-    humidity = None
-    hourly = data.get("hourly")
-    if hourly:
-        times = hourly.get("time", [])
-        humidities = hourly.get("relativehumidity_2m", [])
-        try:
-            from datetime import datetime, timezone
-
-            def _parse_iso_iso(s: str):
-                if not s:
-                    return None
-                try:
-                    if s.endswith("Z"):
-                        s2 = s[:-1] + "+00:00"
-                    else:
-                        s2 = s
-                    return datetime.fromisoformat(s2)
-                except Exception:
-                    return None
-
-            cur_time = _parse_iso_iso(current.get("time"))
-            parsed_times = [_parse_iso_iso(t) for t in times]
-            indexed = [(i, t) for i, t in enumerate(parsed_times) if t is not None]
-            if cur_time is not None and indexed:
-                def _to_utc_naive(dt):
-                    if dt.tzinfo is not None:
-                        return dt.astimezone(timezone.utc).replace(tzinfo=None)
-                    return dt
-
-                cur_naive = _to_utc_naive(cur_time)
-                best_i = None
-                best_diff = None
-                for i, t in indexed:
-                    t_naive = _to_utc_naive(t)
-                    diff = abs((t_naive - cur_naive).total_seconds())
-                    if best_diff is None or diff < best_diff:
-                        best_diff = diff
-                        best_i = i
-                if best_i is not None and best_i < len(humidities):
-                    humidity = humidities[best_i]
-        except Exception:
-            pass
+    humidity = current_humidity(data)
 
     description = _weather_code_to_polish(int(code))
     result = {"temperatura": round(float(temp)), "opis": description}
 
-    daily_section = data.get("daily")
-    if daily_section:
-        d_times = daily_section.get("time", [])
-        d_max = daily_section.get("temperature_2m_max", [])
-        d_min = daily_section.get("temperature_2m_min", [])
-        d_prec = daily_section.get("precipitation_sum", [])
-        d_codes = daily_section.get("weathercode", [])
-        d_wind = daily_section.get("windspeed_10m_max", [])
-
-        daily_list = []
-        for i, day_str in enumerate(d_times):
-            day_obj = {"date": day_str}
-            try:
-                if i < len(d_min):
-                    day_obj["temperatura_min"] = round(float(d_min[i]))
-            except Exception:
-                pass
-            try:
-                if i < len(d_max):
-                    day_obj["temperatura_max"] = round(float(d_max[i]))
-            except Exception:
-                pass
-            try:
-                if i < len(d_prec):
-                    day_obj["opad_mm"] = round(float(d_prec[i]), 1)
-            except Exception:
-                pass
-            try:
-                if i < len(d_wind):
-                    day_obj["wiatr_kmh"] = round(float(d_wind[i]), 1)
-            except Exception:
-                pass
-            try:
-                if i < len(d_codes):
-                    code_i = int(d_codes[i])
-                    day_obj["weathercode"] = code_i
-                    day_obj["opis"] = _weather_code_to_polish(code_i)
-                else:
-                    day_obj["opis"] = description
-            except Exception:
-                day_obj["opis"] = description
-
-            daily_list.append(day_obj)
-
-        result["daily"] = daily_list
-
     if humidity is not None:
         try:
             result["wilgotnosc"] = round(float(humidity))
@@ -287,29 +421,95 @@ def get_weather(
     return result
 
 
-@lru_cache(maxsize=256)
-def get_coordinates_for_city(city: str) -> dict | None:
+def get_coordinates_for_city(city: str, country: str = None) -> dict | None:
+    """
+    Zwraca współrzędne miasta {"lat", "lon"}. Najpierw sprawdza lokalny geokoder katalogu
+    (app/geocoder.py), potem trwały cache (app/cache.py) - pozytywne wyniki długo,
+    negatywne krótko, błędów sieci nie zapamiętujemy - a dopiero na końcu zewnętrzne API.
+    """
+    coords = local_geocode(city, country)
+    if coords:
+        return coords
+
+    cache_query = f"{city}, {country}" if country else city
+    hit, coords = geocode_cache_get(cache_query)
+    if hit:
+        return coords
+
+    return single_flight("geocode", normalize_cache_key(cache_query), _geocode_and_cache, city, country, cache_query)
+
+
+def _geocode_and_cache(city: str, country: str, cache_query: str) -> dict | None:
+    # Ponowne sprawdzenie - inny worker mógł zapisać wynik, kiedy czekaliśmy na blokadę
+    hit, coords = geocode_cache_get(cache_query)
+    if hit:
+        return coords
+
+    coords, provider, definitive = _geocode_remote(city, country)
+    if coords or definitive:
+        geocode_cache_put(cache_query, coords, provider=provider)
+    return coords
+
+
+GEOAPIFY_GEOCODE_URL = "https://api.geoapify.com/v1/geocode/search"
+OPEN_METEO_GEOCODE_URL = "https://geocoding-api.open-meteo.com/v1/search"
+
+
+def _geoapify_params(city: str, country: str, api_key: str) -> dict:
+    text = f"{city}, {country}" if country else city
+    return {"text": text, "format": "json", "apiKey": api_key, "limit": 1}
+
+
+def _parse_geoapify(data: dict, city: str) -> dict | None:
+    if data.get("results"):
+        location = data["results"][0]
+        return {"lat": location["lat"], "lon": location["lon"]}
+    current_app.logger.info(
+        f"Geoapify: brak wyników dla miasta: {city}"
+    )
+    return None
+
+
+def _open_meteo_geocode_params(city: str) -> dict:
+    return {"name": city, "count": 1, "language": "pl"}
+
+
+def _parse_open_meteo_geocoding(data: dict, city: str) -> dict | None:
+    results = data.get("results")
+    if not results:
+        current_app.logger.warning(
+            f"Open-Meteo geocoding: brak wyników dla miasta: {city}"
+        )
+        return None
+    first = results[0]
+    lat = first.get("latitude")
+    lon = first.get("longitude")
+    if lat is None or lon is None:
+        current_app.logger.error(
+            f"Open-Meteo geocoding: niepełne dane dla: {city} -> {first}"
+        )
+        return None
+    return {"lat": lat, "lon": lon}
+
+
+def _geocode_remote(city: str, country: str = None) -> tuple[dict | None, str | None, bool]:
+    """
+    Geokoduje miasto przez Geoapify (jeśli jest klucz), a w razie potrzeby przez Open-Meteo.
+    Zwraca (współrzędne, dostawca, czy_wynik_jest_pewny) - wynik niepewny to błąd sieci/HTTP.
+    """
     api_key = current_app.config.get("GEOAPIFY_API_KEY")
     if api_key:
-        base_url = "https://api.geoapify.com/v1/geocode/search"
-        params = {"text": city, "format": "json", "apiKey": api_key, "limit": 1}
-
         try:
-            response = requests.get(base_url, params=params, timeout=8)
+            response = upstream_get(GEOAPIFY, GEOAPIFY_GEOCODE_URL, params=_geoapify_params(city, country, api_key))
             if response.status_code == 401:
                 current_app.logger.warning(
                     "Geoapify zwrócił 401 Unauthorized - spróbuję fallback geokodowania."
                 )
             else:
                 response.raise_for_status()
-                data = response.json()
-                if data.get("results"):
-                    location = data["results"][0]
-                    return {"lat": location["lat"], "lon": location["lon"]}
-                else:
-                    current_app.logger.info(
-                        f"Geoapify: brak wyników dla miasta: {city}"
-                    )
+                coords = _parse_geoapify(response.json(), city)
+                if coords:
+                    return coords, GEOAPIFY, True
 
         except requests.exceptions.RequestException as e:
             current_app.logger.error(
@@ -317,93 +517,154 @@ def get_coordinates_for_city(city: str) -> dict | None:
             )
 
     try:
-        om_url = "https://geocoding-api.open-meteo.com/v1/search"
-        om_params = {"name": city, "count": 1, "language": "pl"}
-        om_resp = requests.get(om_url, params=om_params, timeout=8)
+        om_resp = upstream_get(OPEN_METEO, OPEN_METEO_GEOCODE_URL, params=_open_meteo_geocode_params(city), timeout=8)
         om_resp.raise_for_status()
-        om_data = om_resp.json()
-        results = om_data.get("results")
-        if not results:
-            current_app.logger.warning(
-                f"Open-Meteo geocoding: brak wyników dla miasta: {city}"
-            )
-            return None
-        first = results[0]
-        lat = first.get("latitude")
-        lon = first.get("longitude")
-        if lat is None or lon is None:
-            current_app.logger.error(
-                f"Open-Meteo geocoding: niepełne dane dla: {city} -> {first}"
-            )
-            return None
-        return {"lat": lat, "lon": lon}
+        return _parse_open_meteo_geocoding(om_resp.json(), city), OPEN_METEO, True
 
     except requests.exceptions.RequestException as e:
         current_app.logger.error(
             f"Błąd podczas zapytania Open-Meteo Geocoding API: {e}"
         )
-        return None
+        return None, None, False
 
 
 GOOGLE_PLACES_URL = "https://maps.googleapis.com/maps/api/place/textsearch/json"
 
 
+PLACES_LANGUAGE = "pl"
+
+# Klucze atrakcji, które są właśnie odświeżane w tle (żeby nie zlecać tego samego wielokrotnie)
+_attractions_refreshing = set()
+_attractions_refreshing_lock = threading.Lock()
+
+
 # ZMIANA: Dodano parametr country z domyślną wartością None
 def get_attractions(city: str, country: str = None, limit: int = 5) -> list[dict] | None:
-    """Pobiera listę atrakcji dla danego miasta (i opcjonalnie kraju) z Google Places API."""
-    api_key = current_app.config.get("GOOGLE_PLACES_API_KEY")
-    if not api_key:
-        current_app.logger.error("Brak klucza API dla Google Places!")
+    """
+    Pobiera listę atrakcji dla danego miasta (i opcjonalnie kraju) z Google Places API.
+
+    Wyniki są cache'owane w bazie (stale-while-revalidate): wpis po upływie świeżości
+    jest nadal zwracany od razu, a w tle zlecamy jego odświeżenie.
+    """
+    key = _attractions_cache_key(city, country)
+    entry = attractions_cache_get(key)
+    if entry is not None:
+        if not entry["fresh"]:
+            _schedule_attractions_refresh(key, city, country)
+        return entry["payload"][:limit]
+
+    attractions = single_flight("attractions", key, _refresh_attractions, key, city, country, True)
+    if attractions is None:
         return None
-    current_app.logger.info("Klucz API Google Places został wczytany.")
+    return attractions[:limit]
+
+
+def _attractions_cache_key(city: str, country: str = None) -> str:
+    return normalize_cache_key(normalize_to_ascii(city), normalize_to_ascii(country), PLACES_LANGUAGE)
+
+
+def _schedule_attractions_refresh(key: str, city: str, country: str = None) -> None:
+    with _attractions_refreshing_lock:
+        if key in _attractions_refreshing:
+            return
+        _attractions_refreshing.add(key)
+
+    def _refresh():
+        try:
+            single_flight("attractions", key, _refresh_attractions, key, city, country)
+        finally:
+            with _attractions_refreshing_lock:
+                _attractions_refreshing.discard(key)
+
+    submit_background(_refresh)
+
+
+def _refresh_attractions(key: str, city: str, country: str = None, recheck_cache: bool = False) -> list[dict] | None:
+    """Pobiera atrakcje z Google Places i zapisuje wynik (również ZERO_RESULTS) w cache."""
+    if recheck_cache:
+        # Inny worker mógł zapisać wynik, kiedy czekaliśmy na blokadę
+        entry = attractions_cache_get(key)
+        if entry is not None:
+            return entry["payload"]
+
+    attractions, api_status = _fetch_attractions(city, country)
+    if api_status in ("OK", "ZERO_RESULTS"):
+        attractions_cache_put(key, attractions, api_status)
+    elif attractions is None and recheck_cache:
+        return _expired_attractions_fallback(key)
+    return attractions
+
+
+def _expired_attractions_fallback(key: str) -> list[dict] | None:
+    """Google Places niedostępne - zwracamy przeterminowany wpis z cache, jeśli jakiś jest."""
+    entry = attractions_cache_get(key, include_expired=True)
+    if entry is None:
+        return None
+    current_app.logger.info(f"Google Places niedostępne - używam przeterminowanych atrakcji z cache dla '{key}'.")
+    return entry["payload"]
 
+
+def _places_params(city: str, country: str, api_key: str) -> dict:
     # Budujemy zapytanie uwzględniając kraj, jeśli jest podany
     query_str = f"atrakcje w {city}"
     if country:
         query_str += f", {country}"
 
-    params = {
+    return {
         "query": query_str,
         "key": api_key,
-        "language": "pl",
+        "language": PLACES_LANGUAGE,
     }
+
+
+def _parse_places_response(data: dict, api_key: str, query: str, city: str, country: str = None) -> tuple[list[dict] | None, str | None]:
+    api_status = data.get("status")
+    if api_status != "OK":
+        error_msg = data.get("error_message", "Brak szczegółów")
+        current_app.logger.error(f"Google Places API zwróciło błąd logiczny. Status: {api_status}, Komunikat: {error_msg}")
+        if api_status == "ZERO_RESULTS":
+            current_app.logger.info(f"Brak wyników dla zapytania: {query}")
+            return [], api_status
+        return None, api_status
+
+    current_app.logger.debug(f"Surowa odpowiedź z Google Places API: {data}")
+
+    results = data.get("results", [])
+    attractions = []
+
+    for place in results:
+        attractions.append(_parse_place_data(place, api_key))
+
+    current_app.logger.info(
+        f"Prawidłowy klucz API. Pobrano {len(attractions)} obiektów z zapytania do API dla miasta: {city}, kraj: {country}."
+    )
+    return attractions, api_status
+
+
+def _fetch_attractions(city: str, country: str = None) -> tuple[list[dict] | None, str | None]:
+    """Zwraca (wszystkie atrakcje z odpowiedzi, status Google Places) - lista None przy błędzie."""
+    api_key = current_app.config.get("GOOGLE_PLACES_API_KEY")
+    if not api_key:
+        current_app.logger.error("Brak klucza API dla Google Places!")
+        return None, None
+    current_app.logger.info("Klucz API Google Places został wczytany.")
+
+    params = _places_params(city, country, api_key)
     current_app.logger.info(
         f"Wysyłanie zapytania do Google Places z parametrami: {params}"
     )
 
     try:
-        response = requests.get(GOOGLE_PLACES_URL, params=params, timeout=20)
+        response = upstream_get(GOOGLE_PLACES, GOOGLE_PLACES_URL, params=params)
         current_app.logger.info(
             f"Otrzymano odpowiedź od Google Places API. Status HTTP: {response.status_code}"
         )
         response.raise_for_status()
-        data = response.json()
-        
-        api_status = data.get("status")
-        if api_status != "OK":
-            error_msg = data.get("error_message", "Brak szczegółów")
-            current_app.logger.error(f"Google Places API zwróciło błąd logiczny. Status: {api_status}, Komunikat: {error_msg}")
-            if api_status == "ZERO_RESULTS":
-                current_app.logger.info(f"Brak wyników dla zapytania: {params['query']}")
-                return []
-            return None
-
-        current_app.logger.debug(f"Surowa odpowiedź z Google Places API: {data}")
-
-        results = data.get("results", [])
-        attractions = []
-
-        for place in results[:limit]:
-            attractions.append(_parse_place_data(place, api_key))
-
-        current_app.logger.info(
-            f"Prawidłowy klucz API. Pobrano {len(attractions)} obiektów z zapytania do API dla miasta: {city}, kraj: {country}."
-        )
-        return attractions
+        return _parse_places_response(response.json(), api_key, params["query"], city, country)
 
     except requests.exceptions.RequestException as e:
         current_app.logger.error(f"Błąd sieciowy/HTTP podczas zapytania do Google Places API: {e}")
-        return None
+        return None, None
 
 
 def _parse_place_data(place: dict, api_key: str) -> dict:
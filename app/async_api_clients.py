@@ -0,0 +1,356 @@
+# app/async_api_clients.py
+"""
+Asynchroniczne odpowiedniki funkcji z app/api_clients.py (httpx.AsyncClient).
+
+Budowanie zapytań, parsowanie odpowiedzi i cache są wspólne z wersją synchroniczną -
+różni się tylko warstwa sieciowa. Klient httpx jest związany z pętlą zdarzeń, a Flask
+uruchamia każdy asynchroniczny widok we własnej, krótkiej pętli - dlatego zapytania idą
+przez jedną pętlę workera w wątku w tle (run_on_upstream_loop) z jedną pulą połączeń
+(AsyncUpstreamHTTP), współdzieloną przez wszystkie żądania.
+
+Cache w bazie i lokalny geokoder są synchroniczne - wywołujemy je przez asyncio.to_thread
+(_run_sync), żeby nie blokowały pętli. Równoczesne zapytania o te same dane łączy
+AsyncSingleFlight (jak single_flight w wersji synchronicznej).
+
+Ograniczenie: aplikacja działa pod WSGI, a Flask wykonuje widok async synchronicznie (asgiref
+async_to_sync), więc wątek workera czeka na cały plan tak samo jak w show_plan. Tryb async
+(ASYNC_PLAN_VIEW=true, domyślnie wyłączony) skraca czas jednego planu, ale nie zwiększa liczby
+planów obsługiwanych naraz przez workera - to dałby dopiero serwer ASGI.
+"""
+import asyncio
+import threading
+import time
+import httpx
+from flask import current_app
+from .http_client import OPEN_METEO, GEOAPIFY, GOOGLE_PLACES, RETRY_STATUSES, CircuitOpenError
+from .cache import (
+    geocode_cache_get,
+    geocode_cache_put,
+    weather_cache_get,
+    attractions_cache_get,
+    attractions_cache_put,
+    CURRENT_WEATHER_KEY,
+    normalize_cache_key,
+)
+from .geocoder import local_geocode
+from .singleflight import AsyncSingleFlight
+from .api_clients import (
+    OPEN_METEO_FORECAST_URL,
+    GEOAPIFY_GEOCODE_URL,
+    OPEN_METEO_GEOCODE_URL,
+    GOOGLE_PLACES_URL,
+    _weather_request,
+    _assemble_weather,
+    _recheck_weather_cache,
+    _store_forecast,
+    _expired_weather_fallback,
+    _forecast_params,
+    _forecast_fallbacks,
+    _geoapify_params,
+    _parse_geoapify,
+    _open_meteo_geocode_params,
+    _parse_open_meteo_geocoding,
+    _places_params,
+    _parse_places_response,
+    _attractions_cache_key,
+    _expired_attractions_fallback,
+    _schedule_attractions_refresh,
+)
+
+
+class AsyncUpstreamHTTP:
+    """Klienci httpx z pulą keep-alive (po jednym na upstream), z tą samą konfiguracją co app/http_client.py."""
+
+    def __init__(self, config):
+        self.config = config
+        self._clients = {}
+        self.flights = AsyncSingleFlight()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+    def _client(self, upstream: str) -> httpx.AsyncClient:
+        client = self._clients.get(upstream)
+        if client is None:
+            pool_size = self.config.get("UPSTREAM_POOL_MAXSIZE", 20)
+            client = httpx.AsyncClient(
+                limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size),
+                # Transport ponawia błędy połączenia; kody 429/5xx ponawiamy sami w get()
+                transport=httpx.AsyncHTTPTransport(retries=self.config.get("UPSTREAM_MAX_RETRIES", 2)),
+                headers={"User-Agent": "TravelMind/1.0"},
+            )
+            self._clients[upstream] = client
+        return client
+
+    async def get(self, upstream: str, url: str, params: dict = None, timeout: float = None) -> httpx.Response:
+        """GET z ponawianiem 429/5xx. Rzuca httpx.HTTPError albo CircuitOpenError (bezpiecznik wspólny z wersją synchroniczną)."""
+        sync_http = current_app.extensions["upstream_http"]
+        breaker = sync_http.breaker(upstream)
+        probe = breaker.before_call()
+        connect_timeout, read_timeout = sync_http.timeout(upstream, timeout, probe=probe)
+        client = self._client(upstream)
+        retries = self.config.get("UPSTREAM_MAX_RETRIES", 2)
+        backoff = self.config.get("UPSTREAM_BACKOFF_FACTOR", 0.3)
+
+        started = time.monotonic()
+        attempt = 0
+        try:
+            while True:
+                response = await client.get(
+                    url, params=params, timeout=httpx.Timeout(read_timeout, connect=connect_timeout)
+                )
+                if response.status_code not in RETRY_STATUSES or attempt >= retries:
+                    break
+                await asyncio.sleep(backoff * (2 ** attempt))
+                attempt += 1
+        except BaseException:
+            # Również anulowanie zadania - inaczej zapytanie próbne blokowałoby bezpiecznik
+            breaker.record(False, probe=probe)
+            raise
+        breaker.record(response.status_code not in RETRY_STATUSES, time.monotonic() - started, probe=probe)
+        return response
+
+    async def aclose(self):
+        clients = list(self._clients.values())
+        self._clients.clear()
+        for client in clients:
+            await client.aclose()
+
+
+class AsyncUpstreamLoop:
+    """Pętla zdarzeń workera w wątku w tle, z jedną pulą połączeń AsyncUpstreamHTTP."""
+
+    def __init__(self, config):
+        self.loop = asyncio.new_event_loop()
+        self.http = AsyncUpstreamHTTP(config)
+        self._thread = threading.Thread(target=self.loop.run_forever, name="travelmind-async-upstream", daemon=True)
+        self._thread.start()
+
+    async def run(self, coro_fn, *args, **kwargs):
+        """Wykonuje coro_fn(http, ...) na pętli workera (w kontekście aplikacji) i czeka na wynik bez blokowania."""
+        app = current_app._get_current_object()
+
+        async def _run():
+            with app.app_context():
+                return await coro_fn(self.http, *args, **kwargs)
+
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(_run(), self.loop))
+
+    def close(self) -> None:
+        asyncio.run_coroutine_threadsafe(self.http.aclose(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join()
+        self.loop.close()
+
+
+_upstream_loop_lock = threading.Lock()
+
+
+async def run_on_upstream_loop(coro_fn, *args, **kwargs):
+    """
+    coro_fn(http, *args, **kwargs) na wspólnej pętli workera. Pętlę tworzymy przy pierwszym
+    użyciu (już po forku workera gunicorna) i trzymamy w app.extensions["async_upstream"].
+    """
+    app = current_app._get_current_object()
+    upstream = app.extensions.get("async_upstream")
+    if upstream is None:
+        with _upstream_loop_lock:
+            upstream = app.extensions.get("async_upstream")
+            if upstream is None:
+                upstream = app.extensions["async_upstream"] = AsyncUpstreamLoop(app.config)
+    return await upstream.run(coro_fn, *args, **kwargs)
+
+
+async def _run_sync(fn, *args, **kwargs):
+    """
+    fn(*args, **kwargs) w wątku (asyncio.to_thread), we własnym kontekście aplikacji -
+    równoległe zadania nie dzielą wtedy jednej sesji bazy danych.
+    """
+    app = current_app._get_current_object()
+
+    def _call():
+        with app.app_context():
+            return fn(*args, **kwargs)
+
+    return await asyncio.to_thread(_call)
+
+
+async def get_coordinates_for_city_async(http: AsyncUpstreamHTTP, city: str, country: str = None) -> dict | None:
+    coords = await _run_sync(local_geocode, city, country)
+    if coords:
+        return coords
+
+    cache_query = f"{city}, {country}" if country else city
+    hit, coords = await _run_sync(geocode_cache_get, cache_query)
+    if hit:
+        return coords
+
+    return await http.flights.do(
+        f"geocode:{normalize_cache_key(cache_query)}", _geocode_and_cache_async, http, city, country, cache_query
+    )
+
+
+async def _geocode_and_cache_async(http: AsyncUpstreamHTTP, city: str, country: str, cache_query: str) -> dict | None:
+    # Ponowne sprawdzenie - inny worker mógł zapisać wynik, kiedy czekaliśmy na blokadę
+    hit, coords = await _run_sync(geocode_cache_get, cache_query)
+    if hit:
+        return coords
+
+    coords, provider, definitive = await _geocode_remote_async(http, city, country)
+    if coords or definitive:
+        await _run_sync(geocode_cache_put, cache_query, coords, provider=provider)
+    return coords
+
+
+async def _geocode_remote_async(http: AsyncUpstreamHTTP, city: str, country: str = None) -> tuple[dict | None, str | None, bool]:
+    api_key = current_app.config.get("GEOAPIFY_API_KEY")
+    if api_key:
+        try:
+            response = await http.get(GEOAPIFY, GEOAPIFY_GEOCODE_URL, params=_geoapify_params(city, country, api_key))
+            if response.status_code == 401:
+                current_app.logger.warning(
+                    "Geoapify zwrócił 401 Unauthorized - spróbuję fallback geokodowania."
+                )
+            else:
+                response.raise_for_status()
+                coords = _parse_geoapify(response.json(), city)
+                if coords:
+                    return coords, GEOAPIFY, True
+        except (httpx.HTTPError, CircuitOpenError) as e:
+            current_app.logger.error(f"Błąd podczas zapytania Geoapify Geocoding API: {e}")
+
+    try:
+        response = await http.get(OPEN_METEO, OPEN_METEO_GEOCODE_URL, params=_open_meteo_geocode_params(city), timeout=8)
+        response.raise_for_status()
+        return _parse_open_meteo_geocoding(response.json(), city), OPEN_METEO, True
+    except (httpx.HTTPError, CircuitOpenError) as e:
+        current_app.logger.error(f"Błąd podczas zapytania Open-Meteo Geocoding API: {e}")
+        return None, None, False
+
+
+async def get_weather_async(
+    http: AsyncUpstreamHTTP,
+    city: str = None,
+    start_date=None,
+    end_date=None,
+    lat: float = None,
+    lon: float = None,
+    country: str = None,
+) -> dict | None:
+    if lat is None or lon is None:
+        if not city:
+            current_app.logger.error("get_weather: brak 'city' oraz współrzędnych 'lat'/'lon'")
+            return None
+        coords = await get_coordinates_for_city_async(http, city, country)
+        if not coords:
+            current_app.logger.warning(f"Nie udało się pobrać współrzędnych dla: {city}")
+            return None
+        lat = coords.get("lat")
+        lon = coords.get("lon")
+
+    request = _weather_request(city, lat, lon, start_date, end_date)
+    if request is None:
+        return None
+    cell_key, lat, lon, days = request
+
+    cached = await _run_sync(weather_cache_get, cell_key, days + [CURRENT_WEATHER_KEY])
+    missing_days = [d for d in days if d not in cached]
+    need_current = CURRENT_WEATHER_KEY not in cached
+    if missing_days or need_current:
+        # Równoczesne żądania o te same brakujące dni tej komórki czekają na jedno zapytanie
+        flight_key = f"weather:{cell_key}|{','.join(missing_days)}|{need_current}"
+        fresh = await http.flights.do(
+            flight_key, _fetch_missing_weather_async, http, cell_key, lat, lon, city, missing_days, need_current
+        )
+        cached.update(fresh)
+
+    return _assemble_weather(cached, days)
+
+
+async def _fetch_missing_weather_async(
+    http: AsyncUpstreamHTTP, cell_key: str, lat: float, lon: float, city: str, missing_days: list[str], need_current: bool
+) -> dict:
+    fresh, missing_days, need_current = await _run_sync(_recheck_weather_cache, cell_key, missing_days, need_current)
+    if not missing_days and not need_current:
+        return fresh
+
+    data = await _fetch_forecast_async(
+        http, lat, lon, missing_days[0] if missing_days else None, missing_days[-1] if missing_days else None
+    )
+    if data is None:
+        return await _run_sync(_expired_weather_fallback, cell_key, missing_days, need_current, fresh)
+    return await _run_sync(_store_forecast, cell_key, data, city, missing_days, fresh)
+
+
+async def _fetch_forecast_async(http: AsyncUpstreamHTTP, lat: float, lon: float, s: str = None, e: str = None) -> dict | None:
+    params = _forecast_params(lat, lon, s, e)
+    try:
+        response = await http.get(OPEN_METEO, OPEN_METEO_FORECAST_URL, params=params)
+        if response.is_error:
+            body = response.text or ""
+            current_app.logger.error(f"Open-Meteo HTTPError: {response.status_code} - body: {body}")
+            if not (body and "out of allowed range" in body):
+                return None
+            fallbacks = _forecast_fallbacks(params, s, e, body)
+            for i, fallback_params in enumerate(fallbacks):
+                try:
+                    response = await http.get(OPEN_METEO, OPEN_METEO_FORECAST_URL, params=fallback_params)
+                    response.raise_for_status()
+                    break
+                except (httpx.HTTPError, CircuitOpenError) as fallback_err:
+                    if i == len(fallbacks) - 1 or isinstance(fallback_err, CircuitOpenError):
+                        raise
+        return response.json()
+    except (httpx.HTTPError, CircuitOpenError) as e:
+        current_app.logger.error(f"Błąd podczas zapytania do Open-Meteo: {e}")
+        return None
+
+
+async def get_attractions_async(http: AsyncUpstreamHTTP, city: str, country: str = None, limit: int = 5) -> list[dict] | None:
+    key = _attractions_cache_key(city, country)
+    entry = await _run_sync(attractions_cache_get, key)
+    if entry is not None:
+        if not entry["fresh"]:
+            _schedule_attractions_refresh(key, city, country)
+        return entry["payload"][:limit]
+
+    attractions = await http.flights.do(f"attractions:{key}", _refresh_attractions_async, http, key, city, country)
+    if attractions is None:
+        return None
+    return attractions[:limit]
+
+
+async def _refresh_attractions_async(http: AsyncUpstreamHTTP, key: str, city: str, country: str = None) -> list[dict] | None:
+    # Inny worker mógł zapisać wynik, kiedy czekaliśmy na blokadę
+    entry = await _run_sync(attractions_cache_get, key)
+    if entry is not None:
+        return entry["payload"]
+
+    attractions, api_status = await _fetch_attractions_async(http, city, country)
+    if api_status in ("OK", "ZERO_RESULTS"):
+        await _run_sync(attractions_cache_put, key, attractions, api_status)
+    elif attractions is None:
+        attractions = await _run_sync(_expired_attractions_fallback, key)
+    return attractions
+
+
+async def _fetch_attractions_async(http: AsyncUpstreamHTTP, city: str, country: str = None) -> tuple[list[dict] | None, str | None]:
+    api_key = current_app.config.get("GOOGLE_PLACES_API_KEY")
+    if not api_key:
+        current_app.logger.error("Brak klucza API dla Google Places!")
+        return None, None
+
+    params = _places_params(city, country, api_key)
+    try:
+        response = await http.get(GOOGLE_PLACES, GOOGLE_PLACES_URL, params=params)
+        current_app.logger.info(
+            f"Otrzymano odpowiedź od Google Places API. Status HTTP: {response.status_code}"
+        )
+        response.raise_for_status()
+        return _parse_places_response(response.json(), api_key, params["query"], city, country)
+    except (httpx.HTTPError, CircuitOpenError) as e:
+        current_app.logger.error(f"Błąd sieciowy/HTTP podczas zapytania do Google Places API: {e}")
+        return None, None
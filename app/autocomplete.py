@@ -0,0 +1,185 @@
+# app/autocomplete.py
+"""
+Indeks podpowiedzi miast dla pola "Miasto docelowe" (endpoint /api/geocode).
+
+Indeks żyje w pamięci procesu i obejmuje katalog destynacji (app/catalog.py) oraz miejsca zwrócone
+wcześniej przez zewnętrzne geokodowanie. Zapytania prefiksowe obsługuje posortowana
+lista kluczy (bisect), a literówki - indeks trigramów.
+"""
+import bisect
+import threading
+import time
+from flask import current_app
+from .utils import fold_text, trigrams
+from .geocoder import get_local_geocoder
+from .catalog import get_catalog
+
+# Maksymalna liczba miejsc "nauczonych" z odpowiedzi zewnętrznego API (ochrona pamięci)
+MAX_LEARNED_PLACES = 20000
+
+
+class AutocompleteIndex:
+    def __init__(self):
+        self._items = []
+        self._seen = set()
+        # Posortowane krotki (klucz, id_elementu); klucze to pełna nazwa i kolejne słowa nazwy
+        self._keys = []
+        self._grams = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._items)
+
+    def add(self, name: str, display: str, lat=None, lon=None, weight: float = 1.0, sort: bool = True) -> bool:
+        key = fold_text(name)
+        dedupe_key = fold_text(display)
+        if not key or dedupe_key in self._seen:
+            return False
+
+        with self._lock:
+            item_id = len(self._items)
+            grams = trigrams(key)
+            self._items.append({
+                "name": display, "lat": lat, "lon": lon, "key": key, "weight": weight, "gram_count": len(grams),
+            })
+            self._seen.add(dedupe_key)
+
+            words = key.split(" ")
+            entries = [(key, item_id)] + [(" ".join(words[i:]), item_id) for i in range(1, len(words))]
+            if sort:
+                for entry in entries:
+                    bisect.insort(self._keys, entry)
+            else:
+                self._keys.extend(entries)
+
+            for gram in grams:
+                self._grams.setdefault(gram, []).append(item_id)
+        return True
+
+    def finalize(self) -> None:
+        """Sortuje klucze po masowym dodaniu elementów z sort=False."""
+        with self._lock:
+            self._keys.sort()
+
+    def _prefix_hits(self, qkey: str, max_candidates: int) -> dict:
+        hits = {}
+        keys = self._keys
+        i = bisect.bisect_left(keys, (qkey, -1))
+        while i < len(keys) and len(hits) < max_candidates:
+            key, item_id = keys[i]
+            if not key.startswith(qkey):
+                break
+            item = self._items[item_id]
+            # Dopasowanie od początku pełnej nazwy jest lepsze niż od środka (kolejne słowo)
+            score = 3.0 if item["key"] == qkey else (2.0 if key == item["key"] else 1.5)
+            hits[item_id] = max(hits.get(item_id, 0), score)
+            i += 1
+        return hits
+
+    def _typo_hits(self, qkey: str, min_similarity: float) -> dict:
+        q_grams = trigrams(qkey)
+        counts = {}
+        for gram in q_grams:
+            for item_id in self._grams.get(gram, ()):
+                counts[item_id] = counts.get(item_id, 0) + 1
+        hits = {}
+        for item_id, shared in counts.items():
+            similarity = shared / (len(q_grams) + self._items[item_id]["gram_count"] - shared)
+            if similarity >= min_similarity:
+                hits[item_id] = similarity
+        return hits
+
+    def search(self, query: str, limit: int = 6, min_similarity: float = 0.3) -> list[dict]:
+        qkey = fold_text(query.split(",")[0]) if query else ""
+        if not qkey:
+            return []
+
+        hits = self._prefix_hits(qkey, max_candidates=limit * 20)
+        if len(hits) < limit and len(qkey) >= 3:
+            for item_id, similarity in self._typo_hits(qkey, min_similarity).items():
+                hits.setdefault(item_id, similarity)
+
+        ranked = sorted(
+            hits.items(),
+            key=lambda h: (-h[1], -self._items[h[0]]["weight"], len(self._items[h[0]]["key"]), self._items[h[0]]["key"]),
+        )
+        return [
+            {"name": self._items[i]["name"], "lat": self._items[i]["lat"], "lon": self._items[i]["lon"]}
+            for i, _ in ranked[:limit]
+        ]
+
+
+_index = None
+_index_built_at = 0.0
+# Wersja katalogu destynacji, z której zbudowano indeks (przebudowa po przeładowaniu katalogu)
+_index_catalog_version = None
+_index_lock = threading.Lock()
+# Miejsca z zewnętrznego geokodowania przenosimy do każdego przebudowanego indeksu
+_learned = []
+# Zapytania, o które już pytaliśmy zewnętrzne API - ich wyniki są w indeksie
+_asked_upstream = set()
+
+
+def _build_index(catalog) -> AutocompleteIndex:
+    index = AutocompleteIndex()
+    geocoder = get_local_geocoder()
+    for city in catalog:
+        name = city.get("name")
+        country = city.get("country")
+        if not name:
+            continue
+        coords = geocoder.lookup(name, country) or {}
+        display = f"{name}, {country}" if country else name
+        index.add(name, display, coords.get("lat"), coords.get("lon"), weight=2.0, sort=False)
+    for place in list(_learned):
+        index.add(place["key_name"], place["name"], place["lat"], place["lon"], weight=1.0, sort=False)
+    index.finalize()
+    return index
+
+
+def get_autocomplete_index() -> AutocompleteIndex:
+    global _index, _index_built_at, _index_catalog_version
+
+    catalog = get_catalog()
+    max_age = current_app.config.get("AUTOCOMPLETE_REFRESH_SECONDS", 600)
+
+    def _is_current():
+        return (
+            _index is not None
+            and _index_catalog_version == catalog.version
+            and time.monotonic() - _index_built_at < max_age
+        )
+
+    if _is_current():
+        return _index
+
+    with _index_lock:
+        if not _is_current():
+            _index = _build_index(catalog)
+            _index_built_at = time.monotonic()
+            _index_catalog_version = catalog.version
+            current_app.logger.info(f"Indeks autocomplete: {len(_index)} miejsc.")
+        return _index
+
+
+def learn_places(places: list[dict]) -> None:
+    """Dodaje do indeksu miejsca zwrócone przez zewnętrzne geokodowanie ({"name", "lat", "lon", "key_name"})."""
+    index = get_autocomplete_index()
+    for place in places:
+        if len(_learned) >= MAX_LEARNED_PLACES:
+            break
+        if index.add(place["key_name"], place["name"], place.get("lat"), place.get("lon"), weight=1.0):
+            _learned.append(place)
+
+
+def was_asked_upstream(query: str) -> bool:
+    return fold_text(query) in _asked_upstream
+
+
+def mark_asked_upstream(query: str) -> None:
+    if len(_asked_upstream) < MAX_LEARNED_PLACES:
+        _asked_upstream.add(fold_text(query))
+
+
+def suggest(query: str, limit: int = 6) -> list[dict]:
+    return get_autocomplete_index().search(query, limit=limit)
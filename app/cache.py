@@ -0,0 +1,300 @@
+# app/cache.py
+"""
+Trwały cache odpowiedzi zewnętrznych API, trzymany w bazie danych.
+
+Baza jest wspólna dla wszystkich workerów gunicorna i przeżywa restarty/deploye,
+w przeciwieństwie do functools.lru_cache. Operacje na cache używają osobnej sesji,
+żeby nie commitować przypadkiem zmian z sesji obsługującej żądanie.
+Błędy bazy nigdy nie przerywają żądania - cache jest tylko optymalizacją.
+
+Wygasłe wpisy usuwa purge_expired_cache: przy zapisie do cache (najwyżej raz na
+CACHE_PURGE_INTERVAL_SECONDS w procesie) albo skryptem scripts/purge_expired_cache.py.
+Wpis usuwamy dopiero CACHE_PURGE_GRACE_SECONDS po wygaśnięciu - do tego czasu bywa
+zwracany awaryjnie (include_expired), gdy zewnętrzne API jest niedostępne.
+"""
+import re
+import threading
+import time
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import delete
+from sqlalchemy.exc import SQLAlchemyError, IntegrityError
+from sqlalchemy.orm import Session
+from . import db
+from .models import GeocodeCacheEntry, WeatherCacheEntry, AttractionsCacheEntry
+
+# Klucz dnia, pod którym w cache pogody trzymamy bieżące warunki
+CURRENT_WEATHER_KEY = "current"
+
+
+def normalize_cache_key(*parts) -> str:
+    """Buduje klucz cache: małe litery, pojedyncze spacje, części rozdzielone '|'."""
+    normalized = []
+    for part in parts:
+        text = "" if part is None else str(part)
+        normalized.append(re.sub(r"\s+", " ", text).strip().casefold())
+    return "|".join(normalized)
+
+
+def _cache_session() -> Session:
+    return Session(db.engine, expire_on_commit=False)
+
+
+_purged_at = None
+_purge_lock = threading.Lock()
+
+
+def purge_expired_cache() -> dict:
+    """
+    Usuwa wpisy geokodowania, pogody i atrakcji wygasłe ponad CACHE_PURGE_GRACE_SECONDS temu.
+    Zwraca {tabela: liczba usuniętych wierszy}.
+    """
+    cutoff = datetime.utcnow() - timedelta(seconds=current_app.config.get("CACHE_PURGE_GRACE_SECONDS", 7 * 24 * 3600))
+    statements = {
+        GeocodeCacheEntry.__tablename__: delete(GeocodeCacheEntry).where(GeocodeCacheEntry.expires_at < cutoff),
+        WeatherCacheEntry.__tablename__: delete(WeatherCacheEntry).where(WeatherCacheEntry.expires_at < cutoff),
+        AttractionsCacheEntry.__tablename__: delete(AttractionsCacheEntry).where(AttractionsCacheEntry.stale_until < cutoff),
+    }
+    removed = {}
+    with _cache_session() as session:
+        for table, stmt in statements.items():
+            removed[table] = session.execute(stmt).rowcount
+        session.commit()
+    return removed
+
+
+def _maybe_purge_expired() -> None:
+    """purge_expired_cache najwyżej raz na CACHE_PURGE_INTERVAL_SECONDS w procesie (wołane przy zapisie)."""
+    global _purged_at
+
+    interval = current_app.config.get("CACHE_PURGE_INTERVAL_SECONDS", 3600)
+    if _purged_at is not None and time.monotonic() - _purged_at < interval:
+        return
+    # Sprząta jeden wątek naraz, pozostałe nie czekają
+    if not _purge_lock.acquire(blocking=False):
+        return
+    try:
+        if _purged_at is not None and time.monotonic() - _purged_at < interval:
+            return
+        _purged_at = time.monotonic()
+        removed = purge_expired_cache()
+        if any(removed.values()):
+            current_app.logger.info(f"Usunięto wygasłe wpisy cache: {removed}")
+    except SQLAlchemyError as e:
+        current_app.logger.warning(f"Nie udało się usunąć wygasłych wpisów cache: {e}")
+    finally:
+        _purge_lock.release()
+
+
+# -------------------------------------------------------------------------
+# GEOKODOWANIE
+# -------------------------------------------------------------------------
+def geocode_cache_get(city: str) -> tuple[bool, dict | None]:
+    """
+    Zwraca (trafienie, współrzędne). Współrzędne None przy trafieniu oznaczają
+    zapamiętany wynik negatywny.
+    """
+    key = normalize_cache_key(city)
+    try:
+        with _cache_session() as session:
+            entry = session.query(GeocodeCacheEntry).filter_by(query_key=key).first()
+    except SQLAlchemyError as e:
+        current_app.logger.warning(f"Cache geokodowania niedostępny: {e}")
+        return False, None
+
+    if entry is None or entry.expires_at <= datetime.utcnow():
+        return False, None
+    if entry.lat is None or entry.lon is None:
+        return True, None
+    return True, {"lat": entry.lat, "lon": entry.lon}
+
+
+def geocode_cache_put(city: str, coords: dict | None, provider: str = None) -> None:
+    """Zapisuje wynik geokodowania. coords=None zapisuje wynik negatywny z krótkim TTL."""
+    key = normalize_cache_key(city)
+    if coords:
+        ttl = current_app.config.get("GEOCODE_CACHE_TTL", 90 * 24 * 3600)
+        lat, lon = coords.get("lat"), coords.get("lon")
+    else:
+        ttl = current_app.config.get("GEOCODE_NEGATIVE_CACHE_TTL", 600)
+        lat = lon = None
+    now = datetime.utcnow()
+    expires_at = now + timedelta(seconds=ttl)
+
+    try:
+        with _cache_session() as session:
+            entry = session.query(GeocodeCacheEntry).filter_by(query_key=key).first()
+            if entry is None:
+                entry = GeocodeCacheEntry(query_key=key)
+                session.add(entry)
+            entry.lat = lat
+            entry.lon = lon
+            entry.provider = provider
+            entry.created_at = now
+            entry.expires_at = expires_at
+            session.commit()
+    except IntegrityError:
+        # Inny worker zapisał ten sam klucz w tym samym momencie - jego wpis jest równie dobry
+        pass
+    except SQLAlchemyError as e:
+        current_app.logger.warning(f"Nie udało się zapisać cache geokodowania dla '{city}': {e}")
+    _maybe_purge_expired()
+
+
+def invalidate_geocode_cache(city: str = None) -> int:
+    """Usuwa wpis dla jednego miasta albo (city=None) cały cache geokodowania. Zwraca liczbę usuniętych wierszy."""
+    stmt = delete(GeocodeCacheEntry)
+    if city is not None:
+        stmt = stmt.where(GeocodeCacheEntry.query_key == normalize_cache_key(city))
+    with _cache_session() as session:
+        result = session.execute(stmt)
+        session.commit()
+        return result.rowcount
+
+
+# -------------------------------------------------------------------------
+# POGODA (per komórka siatki i dzień)
+# -------------------------------------------------------------------------
+def weather_cache_get(cell_key: str, days: list[str], include_expired: bool = False) -> dict:
+    """
+    Zwraca {dzień: payload} dla niewygasłych wpisów z podanej listy dni (jedno zapytanie).
+    include_expired=True zwraca też wygasłe wpisy - gdy API jest niedostępne, stara prognoza jest lepsza niż żadna.
+    """
+    if not days:
+        return {}
+    filters = [WeatherCacheEntry.cell_key == cell_key, WeatherCacheEntry.day.in_(days)]
+    if not include_expired:
+        filters.append(WeatherCacheEntry.expires_at > datetime.utcnow())
+    try:
+        with _cache_session() as session:
+            rows = session.query(WeatherCacheEntry.day, WeatherCacheEntry.payload).filter(*filters).all()
+    except SQLAlchemyError as e:
+        current_app.logger.warning(f"Cache pogody niedostępny: {e}")
+        return {}
+    return {day: payload for day, payload in rows}
+
+
+def weather_cache_get_many(cell_keys: list[str], days: list[str]) -> dict:
+    """Zwraca {komórka: {dzień: payload}} dla wielu komórek naraz (jedno zapytanie, tylko niewygasłe wpisy)."""
+    if not cell_keys or not days:
+        return {}
+    now = datetime.utcnow()
+    try:
+        with _cache_session() as session:
+            rows = (
+                session.query(WeatherCacheEntry.cell_key, WeatherCacheEntry.day, WeatherCacheEntry.payload)
+                .filter(
+                    WeatherCacheEntry.cell_key.in_(cell_keys),
+                    WeatherCacheEntry.day.in_(days),
+                    WeatherCacheEntry.expires_at > now,
+                )
+                .all()
+            )
+    except SQLAlchemyError as e:
+        current_app.logger.warning(f"Cache pogody niedostępny: {e}")
+        return {}
+    result = {}
+    for cell_key, day, payload in rows:
+        result.setdefault(cell_key, {})[day] = payload
+    return result
+
+
+def weather_cache_put(cell_key: str, payloads: dict) -> None:
+    """
+    Zapisuje {dzień: payload} dla komórki. Prognozy dzienne żyją WEATHER_CACHE_TTL
+    (rytm aktualizacji modeli Open-Meteo), bieżąca pogoda krócej - WEATHER_CURRENT_CACHE_TTL.
+    """
+    if not payloads:
+        return
+    now = datetime.utcnow()
+    daily_expires = now + timedelta(seconds=current_app.config.get("WEATHER_CACHE_TTL", 3600))
+    current_expires = now + timedelta(seconds=current_app.config.get("WEATHER_CURRENT_CACHE_TTL", 900))
+
+    try:
+        with _cache_session() as session:
+            existing = {
+                entry.day: entry
+                for entry in session.query(WeatherCacheEntry).filter(
+                    WeatherCacheEntry.cell_key == cell_key,
+                    WeatherCacheEntry.day.in_(list(payloads)),
+                )
+            }
+            for day, payload in payloads.items():
+                entry = existing.get(day)
+                if entry is None:
+                    entry = WeatherCacheEntry(cell_key=cell_key, day=day)
+                    session.add(entry)
+                entry.payload = payload
+                entry.expires_at = current_expires if day == CURRENT_WEATHER_KEY else daily_expires
+            session.commit()
+    except IntegrityError:
+        pass
+    except SQLAlchemyError as e:
+        current_app.logger.warning(f"Nie udało się zapisać cache pogody dla {cell_key}: {e}")
+    _maybe_purge_expired()
+
+
+# -------------------------------------------------------------------------
+# ATRAKCJE (stale-while-revalidate)
+# -------------------------------------------------------------------------
+def attractions_cache_get(key: str, include_expired: bool = False) -> dict | None:
+    """
+    Zwraca {"payload", "status", "fresh"} albo None, jeśli wpisu nie ma lub jest zbyt stary
+    nawet do serwowania w trybie stale-while-revalidate. include_expired=True pomija ten
+    limit (awaryjnie, gdy Google Places jest niedostępne).
+    """
+    now = datetime.utcnow()
+    try:
+        with _cache_session() as session:
+            entry = session.query(AttractionsCacheEntry).filter_by(query_key=key).first()
+    except SQLAlchemyError as e:
+        current_app.logger.warning(f"Cache atrakcji niedostępny: {e}")
+        return None
+
+    if entry is None or (entry.stale_until <= now and not include_expired):
+        return None
+    return {"payload": entry.payload, "status": entry.status, "fresh": entry.fresh_until > now}
+
+
+def attractions_cache_payloads() -> list[list]:
+    """Listy atrakcji ze wszystkich wpisów, które wolno jeszcze serwować (indeks przestrzenny, app/spatial.py)."""
+    try:
+        with _cache_session() as session:
+            rows = (
+                session.query(AttractionsCacheEntry.payload)
+                .filter(AttractionsCacheEntry.stale_until > datetime.utcnow(), AttractionsCacheEntry.status == "OK")
+                .all()
+            )
+    except SQLAlchemyError as e:
+        current_app.logger.warning(f"Cache atrakcji niedostępny: {e}")
+        return []
+    return [payload for (payload,) in rows]
+
+
+def attractions_cache_put(key: str, payload: list, status: str) -> None:
+    """Zapisuje wynik Google Places. ZERO_RESULTS trzymamy krócej (ATTRACTIONS_ZERO_RESULTS_TTL)."""
+    config = current_app.config
+    now = datetime.utcnow()
+    if status == "ZERO_RESULTS":
+        fresh_ttl = stale_ttl = config.get("ATTRACTIONS_ZERO_RESULTS_TTL", 3600)
+    else:
+        fresh_ttl = config.get("ATTRACTIONS_CACHE_FRESH_TTL", 24 * 3600)
+        stale_ttl = config.get("ATTRACTIONS_CACHE_STALE_TTL", 14 * 24 * 3600)
+
+    try:
+        with _cache_session() as session:
+            entry = session.query(AttractionsCacheEntry).filter_by(query_key=key).first()
+            if entry is None:
+                entry = AttractionsCacheEntry(query_key=key)
+                session.add(entry)
+            entry.status = status
+            entry.payload = payload or []
+            entry.fetched_at = now
+            entry.fresh_until = now + timedelta(seconds=fresh_ttl)
+            entry.stale_until = now + timedelta(seconds=max(stale_ttl, fresh_ttl))
+            session.commit()
+    except IntegrityError:
+        pass
+    except SQLAlchemyError as e:
+        current_app.logger.warning(f"Nie udało się zapisać cache atrakcji dla '{key}': {e}")
+    _maybe_purge_expired()
@@ -0,0 +1,269 @@
+# app/catalog.py
+"""
+Katalog destynacji (app/plans/destinations.json) wczytywany raz na proces - ze snapshotu
+zapisanego przez import (app/destinations_import.py), a bez niego strumieniowo z pliku JSON.
+
+Zamiast parsować plik przy każdym żądaniu trzymamy go w pamięci razem z gotowymi
+indeksami (maski bitowe tagów, kody poziomów kosztów, zakresy krajów, znormalizowane
+nazwy). Katalog jest przeładowywany, gdy zmieni się data modyfikacji pliku lub snapshotu albo wersja
+'destinations' w tabeli data_versions (podbijają ją skrypty seed_destinations/geocode_destinations)
+albo plik norm klimatycznych (app/climate.py).
+Nowy katalog budujemy w całości i podmieniamy referencję - żądania w toku widzą starą wersję.
+Nieudanego ani pustego wczytania nie zapamiętujemy: zostaje ostatni dobry katalog,
+a kolejną próbę robimy już po CATALOG_RETRY_SECONDS (jak w app/countries.py).
+
+Wpisy katalogu są współdzielone przez wszystkie żądania - nie wolno ich modyfikować.
+"""
+import os
+import threading
+import time
+import zlib
+import numpy as np
+from flask import current_app
+from .utils import fold_text
+from .matching import CityMatcher
+from .climate import climate_version, load_catalog_climate
+from .destinations_import import iter_destinations, read_snapshot, snapshot_path
+from .executor import submit_background
+
+# Nazwa zbioru w tabeli data_versions
+DESTINATIONS_DATA = "destinations"
+
+
+class DestinationCatalog:
+    """
+    Wpisy są posortowane po kraju, więc miasta jednego kraju zajmują ciągły zakres indeksów
+    (country_offsets). Filtrowanie działa na tablicach NumPy: maska bitowa tagów każdego
+    miasta (po jednym bicie na tag, w słowach uint64) i kod poziomu kosztów.
+    """
+
+    def __init__(self, entries: list[dict], version: tuple = None):
+        # Sortowanie stabilne - w obrębie kraju zostaje kolejność z pliku
+        self.entries = sorted(entries, key=lambda e: e.get('country') or '')
+        self.version = version
+        self._matcher = None
+        self._matcher_lock = threading.Lock()
+        # Gotowe sugestie dla każdej kombinacji tagów i stylu (app/recommendations.py), wypełniane w get_catalog
+        self.suggestions = {}
+        # To samo dla konkretnego miesiąca podróży: {miesiąc: słownik jak suggestions}, liczone w tle
+        # po wczytaniu katalogu z normami klimatycznymi (recommendations.precompute_monthly_suggestions)
+        self.monthly_suggestions = {}
+        # Normy klimatyczne w kolejności wpisów (app/climate.py), None gdy zbioru nie zbudowano
+        self.climate = None
+        n = len(self.entries)
+
+        self.tag_bit = {}
+        for entry in self.entries:
+            for tag in entry.get('tags') or ():
+                self.tag_bit.setdefault(tag, len(self.tag_bit))
+        self.cost_tier_code = {}
+        for entry in self.entries:
+            self.cost_tier_code.setdefault(entry.get('cost_tier'), len(self.cost_tier_code))
+
+        # Maska tagów jako liczba całkowita, potem rozbita na słowa uint64 (więcej niż 64 tagi też zadziała)
+        words = max(1, (len(self.tag_bit) + 63) // 64)
+        masks = [sum(1 << self.tag_bit[tag] for tag in set(e.get('tags') or ())) for e in self.entries]
+        self.tag_bits = np.array(
+            [[(m >> (64 * w)) & 0xFFFFFFFFFFFFFFFF for w in range(words)] for m in masks], dtype=np.uint64
+        ).reshape(n, words)
+        self.cost_tiers = np.fromiter(
+            (self.cost_tier_code[e.get('cost_tier')] for e in self.entries), dtype=np.int16, count=n
+        )
+        # Brak mnożnika traktujemy tak jak reszta aplikacji (domyślnie 1.2)
+        self.cost_multipliers = np.fromiter(
+            (e.get('cost_multiplier') or 1.2 for e in self.entries), dtype=np.float64, count=n
+        )
+        # Stały skrót nazwy - podstawa rozstrzygania remisów w rekomendacjach (app/recommendations.py)
+        self.name_hashes = np.fromiter(
+            (zlib.crc32(f"{e.get('name')}|{e.get('country')}".encode('utf-8')) for e in self.entries),
+            dtype=np.uint32, count=n,
+        )
+
+        self.countries = []
+        self.country_offsets = {}
+        country_codes = []
+        for i, entry in enumerate(self.entries):
+            country = entry.get('country')
+            if not self.countries or self.countries[-1] != country:
+                self.countries.append(country)
+                self.country_offsets[country] = (i, i)
+            self.country_offsets[country] = (self.country_offsets[country][0], i + 1)
+            country_codes.append(len(self.countries) - 1)
+        self.country_codes = np.array(country_codes, dtype=np.int32)
+
+        self.by_name = {}
+        for i, entry in enumerate(self.entries):
+            key = fold_text(entry.get('name'))
+            if key:
+                self.by_name.setdefault(key, []).append(i)
+
+    @property
+    def matcher(self) -> CityMatcher:
+        """Indeks dopasowania nazw (app/matching.py), budowany przy pierwszym użyciu."""
+        if self._matcher is None:
+            with self._matcher_lock:
+                if self._matcher is None:
+                    self._matcher = CityMatcher(self.entries)
+        return self._matcher
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __iter__(self):
+        return iter(self.entries)
+
+    def _query_bits(self, tags) -> np.ndarray:
+        query = np.zeros(self.tag_bits.shape[1], dtype=np.uint64)
+        for tag in tags or ():
+            bit = self.tag_bit.get(tag)
+            if bit is not None:
+                query[bit // 64] |= np.uint64(1 << (bit % 64))
+        return query
+
+    def mask(self, tags, exclude_cost_tiers=()) -> np.ndarray:
+        """Maska miast z przynajmniej jednym z tagów, bez podanych poziomów kosztów."""
+        mask = (self.tag_bits & self._query_bits(tags)).any(axis=1)
+        excluded = [self.cost_tier_code[t] for t in exclude_cost_tiers if t in self.cost_tier_code]
+        if excluded:
+            mask &= ~np.isin(self.cost_tiers, excluded)
+        return mask
+
+    def tag_overlap(self, tags, indices: np.ndarray) -> np.ndarray:
+        """Liczba podanych tagów, które ma każde z miast `indices` (popcount iloczynu masek)."""
+        return np.bitwise_count(self.tag_bits[indices] & self._query_bits(tags)).sum(axis=1)
+
+    def matching(self, tags, exclude_cost_tiers=()) -> list[dict]:
+        """Miasta z przynajmniej jednym z tagów (bez podanych poziomów kosztów), w kolejności katalogu."""
+        return [self.entries[i] for i in np.flatnonzero(self.mask(tags, exclude_cost_tiers))]
+
+    def country_runs(self, indices: np.ndarray) -> np.ndarray:
+        """Pozycje w rosnącej tablicy `indices`, od których zaczyna się kolejny kraj."""
+        # Wpisy są posortowane po kraju, więc kody krajów w `indices` są niemalejące
+        codes = self.country_codes[indices]
+        return np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+
+    def group_by_country(self, mask: np.ndarray) -> dict:
+        """{kraj: tablica indeksów wpisów} dla zaznaczonych miast - bez przeglądania wpisów w Pythonie."""
+        indices = np.flatnonzero(mask)
+        if not len(indices):
+            return {}
+        starts = self.country_runs(indices)
+        groups = np.split(indices, starts[1:])
+        return {self.countries[self.country_codes[indices[s]]]: group for s, group in zip(starts, groups)}
+
+    def in_country(self, country: str) -> list[dict]:
+        start, end = self.country_offsets.get(country, (0, 0))
+        return self.entries[start:end]
+
+    def find_by_name(self, name: str, country: str = None) -> list[dict]:
+        """
+        Miasta o nazwie równej `name` po normalizacji (wielkość liter, znaki diakrytyczne).
+        Z podanym krajem - tylko miasta z tego kraju (inny kraj to inne miasto, np. Paris w Teksasie).
+        """
+        found = [self.entries[i] for i in self.by_name.get(fold_text(name), ())]
+        if country:
+            return [e for e in found if fold_text(e.get('country')) == fold_text(country)]
+        return found
+
+
+_catalog = None
+_next_check_at = 0.0
+_catalog_lock = threading.Lock()
+
+
+def _catalog_path() -> str:
+    return os.path.join(current_app.root_path, 'plans', 'destinations.json')
+
+
+def _snapshot_if_fresh() -> str | None:
+    """Snapshot z importu, o ile nie jest starszy niż destinations.json (ręczna edycja pliku wygrywa)."""
+    path = snapshot_path()
+    try:
+        snapshot_mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+    try:
+        json_mtime = os.stat(_catalog_path()).st_mtime_ns
+    except OSError:
+        json_mtime = None
+    return path if json_mtime is None or snapshot_mtime >= json_mtime else None
+
+
+def _current_version() -> tuple:
+    from .models import DataVersion
+
+    mtimes = []
+    for path in (_catalog_path(), snapshot_path()):
+        try:
+            mtimes.append(os.stat(path).st_mtime_ns)
+        except OSError:
+            mtimes.append(None)
+    return (*mtimes, climate_version(), DataVersion.current(DESTINATIONS_DATA))
+
+
+def _load_entries() -> list[dict] | None:
+    """
+    Wpisy ze snapshotu importu, a bez niego strumieniowo z destinations.json (bez json.load całego pliku).
+    None, gdy nie da się wczytać żadnego z nich.
+    """
+    snapshot = _snapshot_if_fresh()
+    if snapshot:
+        try:
+            return list(read_snapshot(snapshot))
+        except Exception as e:
+            current_app.logger.error(f"Błąd ładowania snapshotu katalogu {snapshot}: {e}")
+    rejected = []
+    try:
+        entries = list(iter_destinations(_catalog_path(), on_invalid=rejected.append))
+    except Exception as e:
+        current_app.logger.error(f"Błąd ładowania destinations.json: {e}")
+        return None
+    if rejected:
+        current_app.logger.warning(f"Pominięto {len(rejected)} niepoprawnych wpisów destinations.json, np.: {rejected[0]}")
+    return entries
+
+
+def get_catalog() -> DestinationCatalog:
+    """
+    Zwraca katalog procesu. Zmiany pliku/bazy sprawdzamy najwyżej co CATALOG_CHECK_SECONDS,
+    więc zwykłe żądanie nie wykonuje ani stat(), ani zapytania do bazy.
+    """
+    global _catalog, _next_check_at
+
+    if _catalog is not None and time.monotonic() < _next_check_at:
+        return _catalog
+
+    with _catalog_lock:
+        if _catalog is not None and time.monotonic() < _next_check_at:
+            return _catalog
+        config = current_app.config
+        version = _current_version()
+        if _catalog is None or version != _catalog.version:
+            from .recommendations import precompute_monthly_suggestions, precompute_suggestions
+
+            started = time.perf_counter()
+            entries = _load_entries()
+            if not entries:
+                # Nie zapamiętujemy wersji - zostaje ostatni dobry katalog (albo pusty, bez wersji)
+                current_app.logger.warning(
+                    f"Brak miast do wczytania do katalogu (wersja {version}) - ponowna próba za "
+                    f"{config.get('CATALOG_RETRY_SECONDS', 30)} s."
+                )
+                if _catalog is None:
+                    _catalog = DestinationCatalog([])
+                _next_check_at = time.monotonic() + config.get("CATALOG_RETRY_SECONDS", 30)
+                return _catalog
+            catalog = DestinationCatalog(entries, version)
+            catalog.climate = load_catalog_climate(catalog.entries)
+            catalog.suggestions = precompute_suggestions(catalog)
+            current_app.logger.info(
+                f"Katalog destynacji: {len(catalog)} miast, {len(catalog.suggestions)} zestawów sugestii, "
+                f"normy klimatyczne dla {catalog.climate.coverage if catalog.climate else 0} miast "
+                f"(wersja {version}, {time.perf_counter() - started:.2f} s)."
+            )
+            _catalog = catalog
+            if catalog.climate is not None:
+                # Sugestie dla miesięcy podróży (12 x tyle co suggestions) - w tle, żeby nie wydłużać żądania
+                submit_background(precompute_monthly_suggestions, catalog)
+        _next_check_at = time.monotonic() + config.get("CATALOG_CHECK_SECONDS", 5)
+        return _catalog
@@ -0,0 +1,115 @@
+# app/circuit_breaker.py
+"""
+Bezpieczniki (circuit breakers) i adaptacyjne timeouty dla zewnętrznych API.
+
+Każdy upstream ma własny bezpiecznik w pamięci procesu:
+- CLOSED: zapytania przechodzą, ostatnie CIRCUIT_WINDOW_SIZE wyników trafia do okna;
+  gdy odsetek błędów przekroczy CIRCUIT_ERROR_RATE, bezpiecznik się otwiera,
+- OPEN: zapytania od razu kończą się CircuitOpenError (bez czekania na timeout)
+  przez CIRCUIT_OPEN_SECONDS,
+- HALF_OPEN: przepuszczamy jedno zapytanie próbne; sukces zamyka bezpiecznik, błąd otwiera go ponownie.
+
+Timeout odczytu dopasowuje się do obserwowanego p95 czasu odpowiedzi (z zapasem),
+ale nigdy nie przekracza wartości z UPSTREAM_TIMEOUTS.
+"""
+import threading
+import time
+from collections import deque
+import requests
+from flask import current_app
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """Upstream uznany za niesprawny - zapytanie odrzucone bez łączenia się z API."""
+
+
+class CircuitBreaker:
+    def __init__(self, name: str, config):
+        self.name = name
+        self.enabled = config.get("CIRCUIT_BREAKER_ENABLED", True)
+        self.window_size = config.get("CIRCUIT_WINDOW_SIZE", 20)
+        self.min_calls = config.get("CIRCUIT_MIN_CALLS", 5)
+        self.error_rate = config.get("CIRCUIT_ERROR_RATE", 0.5)
+        self.open_seconds = config.get("CIRCUIT_OPEN_SECONDS", 30)
+        self.adaptive_timeouts = config.get("UPSTREAM_ADAPTIVE_TIMEOUTS", True)
+        self.p95_multiplier = config.get("UPSTREAM_TIMEOUT_P95_MULTIPLIER", 3.0)
+        self.min_read_timeout = config.get("UPSTREAM_MIN_READ_TIMEOUT", 2.0)
+
+        self.state = CLOSED
+        self._outcomes = deque(maxlen=self.window_size)
+        self._latencies = deque(maxlen=max(self.window_size, 50))
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def before_call(self) -> bool:
+        """
+        Rzuca CircuitOpenError, jeśli zapytanie nie może przejść.
+        Zwraca True, gdy to zapytanie próbne w stanie HALF_OPEN.
+        """
+        if not self.enabled:
+            return False
+        with self._lock:
+            if self.state == OPEN:
+                if time.monotonic() - self._opened_at < self.open_seconds:
+                    raise CircuitOpenError(f"Bezpiecznik '{self.name}' otwarty - pomijam zapytanie")
+                self.state = HALF_OPEN
+            if self.state == HALF_OPEN:
+                if self._probe_in_flight:
+                    raise CircuitOpenError(f"Bezpiecznik '{self.name}' sprawdza dostępność API - pomijam zapytanie")
+                self._probe_in_flight = True
+                return True
+            return False
+
+    def record(self, ok: bool, latency: float = None, probe: bool = False) -> None:
+        if not self.enabled:
+            return
+        transition = None
+        with self._lock:
+            if probe:
+                self._probe_in_flight = False
+                if ok:
+                    # Po awarii stare (szybsze) pomiary nie opisują już upstreamu - zaczynamy od nowa
+                    self.state = CLOSED
+                    self._outcomes.clear()
+                    self._latencies.clear()
+                    transition = CLOSED
+                else:
+                    self.state = OPEN
+                    self._opened_at = time.monotonic()
+                    transition = OPEN
+            elif self.state == CLOSED:
+                self._outcomes.append(ok)
+                failures = self._outcomes.count(False)
+                if len(self._outcomes) >= self.min_calls and failures / len(self._outcomes) >= self.error_rate:
+                    self.state = OPEN
+                    self._opened_at = time.monotonic()
+                    transition = OPEN
+            if ok and latency is not None:
+                self._latencies.append(latency)
+
+        if transition == OPEN:
+            current_app.logger.warning(
+                f"Bezpiecznik '{self.name}' otwarty na {self.open_seconds}s - API odpowiada błędami lub zbyt wolno."
+            )
+        elif transition == CLOSED:
+            current_app.logger.info(f"Bezpiecznik '{self.name}' zamknięty - API znów odpowiada.")
+
+    def is_open(self) -> bool:
+        return self.enabled and self.state == OPEN and time.monotonic() - self._opened_at < self.open_seconds
+
+    def read_timeout(self, max_timeout: float, probe: bool = False) -> float:
+        """p95 czasu odpowiedzi * mnożnik, w granicach [UPSTREAM_MIN_READ_TIMEOUT, max_timeout]."""
+        # Zapytanie próbne dostaje pełny timeout, żeby wolny, ale działający upstream mógł wrócić
+        if probe or not self.adaptive_timeouts:
+            return max_timeout
+        with self._lock:
+            samples = sorted(self._latencies)
+        if len(samples) < self.min_calls:
+            return max_timeout
+        p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+        return min(max_timeout, max(self.min_read_timeout, p95 * self.p95_multiplier))
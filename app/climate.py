@@ -0,0 +1,133 @@
+# app/climate.py
+"""
+Normy klimatyczne miast z katalogu (średnie miesięczne), budowane offline skryptem
+scripts/build_climate_normals.py - rekomendacje biorą pod uwagę termin podróży bez
+żadnego zapytania do API pogodowego.
+
+Plik climate_normals.npy (float32, kształt: miasta x 12 miesięcy x CLIMATE_VARIABLES)
+otwieramy przez np.load(mmap_mode='r'), więc do pamięci trafiają tylko czytane strony.
+Obok leży climate_normals.json z kluczami "miasto|kraj" kolejnych wierszy i opisem zbioru.
+"""
+import json
+import os
+from datetime import date, timedelta
+import numpy as np
+from flask import current_app
+from .utils import fold_text
+
+# Kolejność zmiennych w ostatnim wymiarze tablicy
+CLIMATE_VARIABLES = ("temp_mean_c", "precip_mm_day", "sunshine_h_day")
+TEMP, PRECIP, SUNSHINE = range(len(CLIMATE_VARIABLES))
+
+
+def climate_key(name: str, country: str = None) -> str:
+    return f"{fold_text(name)}|{fold_text(country)}"
+
+
+def climate_paths() -> tuple[str, str]:
+    """(plik .npy z danymi, plik .json z kluczami) - domyślnie obok destinations.json."""
+    path = current_app.config.get("CLIMATE_NORMALS_PATH") or os.path.join(
+        current_app.root_path, 'plans', 'climate_normals.npy'
+    )
+    return path, os.path.splitext(path)[0] + '.json'
+
+
+def climate_version() -> int | None:
+    """Data modyfikacji pliku z danymi (część wersji katalogu) albo None, gdy zbioru nie zbudowano."""
+    try:
+        return os.stat(climate_paths()[0]).st_mtime_ns
+    except OSError:
+        return None
+
+
+class CatalogClimate:
+    """Normy dopasowane do kolejności wpisów katalogu: wiersz pliku dla każdego miasta (-1 = brak danych)."""
+
+    def __init__(self, values: np.ndarray, rows: np.ndarray):
+        self.values = values
+        self.rows = rows
+        self.coverage = int((rows >= 0).sum())
+
+    def monthly(self, indices: np.ndarray, month: int) -> np.ndarray:
+        """Tablica (len(indices), zmienne) dla miesiąca 1-12; NaN dla miast bez danych."""
+        rows = self.rows[indices]
+        result = np.full((len(indices), len(CLIMATE_VARIABLES)), np.nan, dtype=np.float32)
+        known = rows >= 0
+        # Indeksowanie memmapy czyta tylko potrzebne wiersze
+        result[known] = self.values[rows[known], month - 1]
+        return result
+
+
+def load_catalog_climate(entries: list[dict]) -> CatalogClimate | None:
+    """Wczytuje normy dla wpisów katalogu; None, gdy pliku nie ma lub jest niezgodny."""
+    path, keys_path = climate_paths()
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(keys_path, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        values = np.load(path, mmap_mode='r')
+    except (OSError, ValueError) as e:
+        current_app.logger.error(f"Błąd ładowania norm klimatycznych {path}: {e}")
+        return None
+
+    keys = meta.get("keys") or []
+    if tuple(meta.get("variables") or ()) != CLIMATE_VARIABLES or values.shape != (len(keys), 12, len(CLIMATE_VARIABLES)):
+        current_app.logger.error(f"Niezgodny format norm klimatycznych {path}: {values.shape}, {meta.get('variables')}")
+        return None
+
+    row_of = {key: i for i, key in enumerate(keys)}
+    rows = np.fromiter(
+        (row_of.get(climate_key(e.get('name'), e.get('country')), -1) for e in entries), dtype=np.int32, count=len(entries)
+    )
+    return CatalogClimate(values, rows)
+
+
+def trip_month(start_date=None, end_date=None) -> int | None:
+    """Miesiąc (1-12), w którym wypada najwięcej dni podróży; None bez dat."""
+    try:
+        start = date.fromisoformat(start_date) if isinstance(start_date, str) else start_date
+        end = date.fromisoformat(end_date) if isinstance(end_date, str) else end_date
+    except ValueError:
+        return None
+    if not start:
+        return None
+    if not end or end < start:
+        end = start
+
+    days_per_month = {}
+    day = start
+    # Dłuższe podróże i tak rozstrzyga pierwszy rok
+    while day <= end and day < start + timedelta(days=366):
+        days_per_month[day.month] = days_per_month.get(day.month, 0) + 1
+        day += timedelta(days=1)
+    return max(days_per_month, key=days_per_month.get)
+
+
+def _ramp(values: np.ndarray, low: float, high: float) -> np.ndarray:
+    """0 poniżej `low`, 1 powyżej `high`, liniowo pomiędzy."""
+    return np.clip((values - low) / (high - low), 0.0, 1.0)
+
+
+def climate_suitability(conditions: np.ndarray, tags: list) -> np.ndarray:
+    """
+    Ocena 0-1 warunków (wynik CatalogClimate.monthly) dla wybranych tagów - średnia po tagach.
+    Plaża wymaga ciepła i słońca, góry umiarkowanej temperatury i małych opadów,
+    pozostałe tagi - ogólnego komfortu (ok. 15-25°C, bez ulew). NaN: brak danych.
+    """
+    temp, precip, sunshine = conditions[:, TEMP], conditions[:, PRECIP], conditions[:, SUNSHINE]
+    dry = 1.0 - 0.6 * _ramp(precip, 3.0, 10.0)
+    comfort = (1.0 - _ramp(np.abs(temp - 20.0), 5.0, 18.0)) * dry
+
+    scores = []
+    for tag in sorted(set(tags)):
+        if tag == "beach_sun":
+            scores.append(_ramp(temp, 18.0, 25.0) * (0.5 + 0.5 * _ramp(sunshine, 4.0, 9.0)) * dry)
+        elif tag == "mountains_trekking":
+            scores.append((1.0 - _ramp(np.abs(temp - 16.0), 6.0, 16.0)) * (1.0 - 0.8 * _ramp(precip, 2.0, 8.0)))
+        elif tag == "nightlife_parties":
+            # Życie nocne mniej zależy od pogody
+            scores.append(0.5 + 0.5 * comfort)
+        else:
+            scores.append(comfort)
+    return np.mean(scores, axis=0) if scores else np.full(len(conditions), np.nan)
@@ -240,6 +240,10 @@ BASE_COSTS = {
     "Komfortowy": 1176.85,
 }
 
+# Tagi (klimaty podróży) i poziomy kosztów miast w katalogu destynacji
+DESTINATION_TAGS = ("beach_sun", "mountains_trekking", "city_break", "history_culture", "nature", "nightlife_parties")
+COST_TIERS = ("low", "medium", "high", "very_high")
+
 # Mapowanie kodów pogodowych -> klucze ikon SVG
 WEATHERCODE_TO_KEY = {
     0: 'clear',
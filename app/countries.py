@@ -0,0 +1,91 @@
+# app/countries.py
+"""
+Metadane krajów (tabela countries: m.in. flaga bezpieczeństwa 'danger') trzymane w pamięci procesu.
+
+Tabela ma mniej niż 200 wierszy i zmienia się tylko przy scripts/seed_destinations.py,
+który podbija wersję 'countries' w data_versions. Wersję sprawdzamy najwyżej co
+CATALOG_CHECK_SECONDS, więc widok planu nie wykonuje zapytania o kraj.
+
+Nieudanego (błąd bazy) ani pustego wczytania nie zapamiętujemy: zostaje ostatni dobry słownik,
+a kolejną próbę robimy już po COUNTRIES_RETRY_SECONDS.
+"""
+import threading
+import time
+from flask import current_app
+from sqlalchemy import select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+from . import db
+from .utils import fold_text
+
+# Nazwa zbioru w tabeli data_versions
+COUNTRIES_DATA = "countries"
+
+
+class CountryDirectory:
+    """{znormalizowana nazwa: słownik kolumn tabeli countries} - wyszukiwanie O(1)."""
+
+    def __init__(self, countries: list[dict], version: int = None):
+        self.version = version
+        self._by_name = {fold_text(c["name"]): c for c in countries if c.get("name")}
+
+    def __len__(self):
+        return len(self._by_name)
+
+    def get(self, name: str) -> dict | None:
+        """Kraj o podanej nazwie (bez względu na wielkość liter i znaki diakrytyczne) albo None."""
+        return self._by_name.get(fold_text(name)) if name else None
+
+    def is_dangerous(self, name: str) -> bool:
+        country = self.get(name)
+        return bool(country and country.get("danger"))
+
+
+_directory = None
+_next_check_at = 0.0
+_directory_lock = threading.Lock()
+
+
+def _load_countries() -> list[dict] | None:
+    """Wiersze tabeli countries jako słowniki; None przy błędzie bazy."""
+    from .models import Country
+
+    columns = [c.key for c in Country.__table__.columns]
+    try:
+        with Session(db.engine) as session:
+            return [{key: getattr(c, key) for key in columns} for c in session.scalars(select(Country))]
+    except SQLAlchemyError as e:
+        current_app.logger.warning(f"Nie udało się wczytać krajów: {e}")
+        return None
+
+
+def get_countries() -> CountryDirectory:
+    """Zwraca słownik krajów procesu, przeładowany po zmianie wersji 'countries' w data_versions."""
+    global _directory, _next_check_at
+    from .models import DataVersion
+
+    if _directory is not None and time.monotonic() < _next_check_at:
+        return _directory
+
+    with _directory_lock:
+        if _directory is not None and time.monotonic() < _next_check_at:
+            return _directory
+        config = current_app.config
+        version = DataVersion.current(COUNTRIES_DATA)
+        if _directory is None or version != _directory.version:
+            countries = _load_countries()
+            if not countries:
+                # Nie zapamiętujemy wersji - zostaje ostatni dobry słownik (albo pusty, bez wersji)
+                current_app.logger.warning(
+                    f"Brak krajów do wczytania (wersja {version}) - ponowna próba za "
+                    f"{config.get('COUNTRIES_RETRY_SECONDS', 30)} s."
+                )
+                if _directory is None:
+                    _directory = CountryDirectory([])
+                _next_check_at = time.monotonic() + config.get("COUNTRIES_RETRY_SECONDS", 30)
+                return _directory
+            # Podmieniamy referencję w całości - równoległe odczyty widzą stary albo nowy słownik
+            _directory = CountryDirectory(countries, version)
+            current_app.logger.info(f"Kraje: {len(_directory)} (wersja {version}).")
+        _next_check_at = time.monotonic() + config.get("CATALOG_CHECK_SECONDS", 5)
+        return _directory
@@ -0,0 +1,248 @@
+# app/destinations_import.py
+"""
+Strumieniowy import katalogu destynacji (scripts/seed_destinations.py) i jego snapshot.
+
+Źródło (tablica JSON jak destinations.json albo JSON Lines: .jsonl/.ndjson) czytamy
+kawałkami - tablicę przez JSONDecoder.raw_decode na buforze, JSON Lines linia po linii -
+więc w pamięci jest naraz tylko jedna partia rekordów, niezależnie od rozmiaru pliku.
+Rekord dłuższy niż MAX_RECORD_CHARS (np. niedomknięty obiekt) przerywa import - bufor nie rośnie bez końca.
+
+Snapshot (destinations.snapshot) to JSON Lines - same dane, bez pickle, więc podmieniony
+plik nie wykona kodu: nagłówek z listą pól, potem po linii na partię wierszy (listy wartości
+w kolejności SNAPSHOT_FIELDS). Każde miasto (nazwa, kraj) występuje raz - jak w bazie, wygrywa
+ostatni wpis. Katalog (app/catalog.py) wczytuje snapshot zamiast JSON-a źródła.
+"""
+import json
+import math
+import os
+from itertools import islice
+from flask import current_app
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from . import db
+from .constans import COST_TIERS, DESTINATION_TAGS
+
+# Pola rekordu katalogu (i kolejność w krotkach snapshotu)
+SNAPSHOT_FIELDS = ("name", "country", "tags", "cost_tier", "cost_multiplier", "image_keyword")
+SNAPSHOT_FORMAT = 2
+# Znaków czytanych naraz z pliku źródłowego
+READ_CHUNK = 1 << 16
+# Najdłuższy rekord tablicy JSON (znaki) - dłuższy uznajemy za uszkodzony plik
+MAX_RECORD_CHARS = 1 << 20
+# Mnożnik kosztów spoza tego zakresu uznajemy za błąd danych
+MAX_COST_MULTIPLIER = 10.0
+
+
+class InvalidDestination(ValueError):
+    """Rekord źródła, którego nie da się zaimportować (powód w komunikacie)."""
+
+
+def _iter_json_array(f):
+    decoder = json.JSONDecoder()
+    buf, pos, eof = "", 0, False
+
+    def fill():
+        nonlocal buf, pos, eof
+        chunk = f.read(READ_CHUNK)
+        eof = not chunk
+        # Przetworzony początek bufora odrzucamy - pamięć rośnie najwyżej do rozmiaru jednego rekordu
+        buf, pos = buf[pos:] + chunk, 0
+        return not eof
+
+    def skip(chars):
+        nonlocal pos
+        while True:
+            while pos < len(buf) and buf[pos] in chars:
+                pos += 1
+            if pos < len(buf) or not fill():
+                return
+
+    skip(" \t\r\n")
+    if buf[pos:pos + 1] != "[":
+        raise InvalidDestination("Plik JSON musi zawierać tablicę rekordów")
+    pos += 1
+    while True:
+        skip(" \t\r\n,")
+        if pos >= len(buf) or buf[pos] == "]":
+            return
+        try:
+            obj, end = decoder.raw_decode(buf, pos)
+        except json.JSONDecodeError:
+            # Rekord urwany na końcu bufora - doczytujemy, ale uszkodzony rekord nie wczyta całego pliku
+            if len(buf) - pos <= MAX_RECORD_CHARS and fill():
+                continue
+            raise
+        if end >= len(buf) and not eof and fill():
+            # Liczba/literał na samym końcu bufora mógł być ucięty - dekodujemy ponownie
+            continue
+        pos = end
+        yield obj
+
+
+def iter_source(path: str):
+    """Surowe rekordy ze źródła: JSON Lines (.jsonl, .ndjson) albo tablica JSON."""
+    with open(path, "r", encoding="utf-8") as f:
+        if path.endswith((".jsonl", ".ndjson")):
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            yield from _iter_json_array(f)
+
+
+def normalize_destination(record) -> dict:
+    """
+    Sprawdza i porządkuje rekord źródła: nazwa i kraj (przycięte), znane tagi bez powtórzeń,
+    poziom kosztów z COST_TIERS, dodatni mnożnik kosztów. Rzuca InvalidDestination.
+    """
+    if not isinstance(record, dict):
+        raise InvalidDestination(f"Rekord nie jest obiektem: {record!r:.60}")
+    name = (record.get("name") or "").strip() if isinstance(record.get("name"), str) else ""
+    country = (record.get("country") or "").strip() if isinstance(record.get("country"), str) else ""
+    if not name or not country:
+        raise InvalidDestination(f"Brak nazwy lub kraju: {record!r:.60}")
+    if len(name) > 100 or len(country) > 100:
+        raise InvalidDestination(f"Za długa nazwa: {name[:40]}..., {country[:40]}")
+
+    tags = record.get("tags") or []
+    if not isinstance(tags, list):
+        raise InvalidDestination(f"Tagi nie są listą: {name}, {country}")
+    tags = list(dict.fromkeys(t for t in tags if t in DESTINATION_TAGS))
+    if not tags:
+        raise InvalidDestination(f"Brak znanych tagów: {name}, {country}")
+
+    cost_tier = record.get("cost_tier")
+    if cost_tier not in COST_TIERS:
+        cost_tier = None
+
+    cost_multiplier = record.get("cost_multiplier")
+    try:
+        cost_multiplier = float(cost_multiplier) if cost_multiplier is not None else None
+    except (TypeError, ValueError):
+        cost_multiplier = None
+    if cost_multiplier is not None and not (0 < cost_multiplier <= MAX_COST_MULTIPLIER and math.isfinite(cost_multiplier)):
+        cost_multiplier = None
+
+    image_keyword = record.get("image_keyword")
+    if not isinstance(image_keyword, str) or not image_keyword.strip():
+        image_keyword = f"{name} {country}"
+
+    return {
+        "name": name,
+        "country": country,
+        "tags": tags,
+        "cost_tier": cost_tier,
+        "cost_multiplier": cost_multiplier,
+        "image_keyword": image_keyword.strip()[:255],
+    }
+
+
+def iter_destinations(path: str, on_invalid=None):
+    """Poprawne, znormalizowane rekordy ze źródła; odrzucone przekazujemy do on_invalid(błąd)."""
+    for record in iter_source(path):
+        try:
+            yield normalize_destination(record)
+        except InvalidDestination as e:
+            if on_invalid is not None:
+                on_invalid(e)
+
+
+def batched(iterable, size: int):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def upsert(table, rows: list[dict], key_columns: list[str], update_columns) -> None:
+    """
+    INSERT ... ON CONFLICT (key_columns) DO UPDATE - PostgreSQL i SQLite.
+    Wiersze idą jako executemany jednego skompilowanego zapytania (SQLAlchemy łączy je
+    w wielowierszowe INSERT-y), więc kolejne partie nie kompilują SQL od nowa.
+    """
+    dialect = db.engine.dialect.name
+    if dialect == "postgresql":
+        insert = pg_insert
+    elif dialect == "sqlite":
+        insert = sqlite_insert
+    else:
+        raise RuntimeError(f"Upsert nieobsługiwany dla bazy: {dialect}")
+
+    stmt = insert(table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=key_columns,
+        set_={column: stmt.excluded[column] for column in update_columns},
+    )
+    db.session.execute(stmt, rows)
+
+
+def snapshot_path() -> str:
+    """Plik snapshotu katalogu - domyślnie obok destinations.json."""
+    return current_app.config.get("CATALOG_SNAPSHOT_PATH") or os.path.join(
+        current_app.root_path, 'plans', 'destinations.snapshot'
+    )
+
+
+def _write_line(f, value) -> None:
+    f.write(json.dumps(value, ensure_ascii=False, separators=(",", ":")))
+    f.write("\n")
+
+
+class SnapshotWriter:
+    """
+    Zapis snapshotu partiami do pliku tymczasowego; close() podmienia plik docelowy (os.replace).
+    Miasto powtórzone w kolejnej partii zastępuje wcześniejszy wpis (close() przepisuje wtedy plik).
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        # (nazwa, kraj) -> numer ostatniego wiersza z tym miastem
+        self._last_row = {}
+        self._rows = 0
+        self._file = open(path + ".tmp", "w", encoding="utf-8", newline="\n")
+        _write_line(self._file, {"format": SNAPSHOT_FORMAT, "fields": SNAPSHOT_FIELDS})
+
+    @property
+    def count(self) -> int:
+        return len(self._last_row)
+
+    def write(self, entries: list[dict]) -> None:
+        batch = [[e.get(field) for field in SNAPSHOT_FIELDS] for e in entries]
+        for entry in entries:
+            self._last_row[(entry.get("name"), entry.get("country"))] = self._rows
+            self._rows += 1
+        _write_line(self._file, batch)
+
+    def close(self) -> None:
+        self._file.close()
+        if self._rows != len(self._last_row):
+            self._drop_duplicates()
+        os.replace(self.path + ".tmp", self.path)
+
+    def abort(self) -> None:
+        self._file.close()
+        os.remove(self.path + ".tmp")
+
+    def _drop_duplicates(self) -> None:
+        """Przepisuje plik tymczasowy, zostawiając dla każdego miasta tylko ostatni wiersz."""
+        name, country = SNAPSHOT_FIELDS.index("name"), SNAPSHOT_FIELDS.index("country")
+        rows = iter(range(self._rows))
+        with open(self.path + ".tmp", "r", encoding="utf-8") as src, \
+                open(self.path + ".dedup", "w", encoding="utf-8", newline="\n") as dst:
+            dst.write(src.readline())
+            for line in src:
+                batch = [row for row in json.loads(line) if self._last_row[(row[name], row[country])] == next(rows)]
+                if batch:
+                    _write_line(dst, batch)
+        os.replace(self.path + ".dedup", self.path + ".tmp")
+
+
+def read_snapshot(path: str):
+    """Rekordy katalogu (słowniki z polami SNAPSHOT_FIELDS) ze snapshotu, partia po partii."""
+    with open(path, "r", encoding="utf-8") as f:
+        header = json.loads(f.readline() or "null")
+        if not isinstance(header, dict) or header.get("format") != SNAPSHOT_FORMAT:
+            raise ValueError(f"Nieobsługiwany format snapshotu: {path}")
+        fields = header["fields"]
+        for line in f:
+            for row in json.loads(line):
+                yield dict(zip(fields, row))
@@ -0,0 +1,44 @@
+# app/executor.py
+"""
+Ograniczone pule wątków do zapytań do zewnętrznych API.
+
+- "upstream_executor": zapytania, na które czeka żądanie (np. atrakcje planu równolegle z pogodą).
+- "background_executor": odświeżanie w tle (stale-while-revalidate w api_clients) - osobna, mniejsza
+  pula, więc odświeżenia nie zajmują miejsc, na które czekają plany użytkowników.
+
+Zadania uruchamiane są w kontekście aplikacji Flask (current_app, logger, config, db),
+tak samo jak kod wywoływany bezpośrednio z widoku.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from flask import current_app
+
+
+def init_app(app):
+    app.extensions["upstream_executor"] = ThreadPoolExecutor(
+        max_workers=app.config.get("UPSTREAM_EXECUTOR_WORKERS", 8),
+        thread_name_prefix="travelmind-upstream",
+    )
+    app.extensions["background_executor"] = ThreadPoolExecutor(
+        max_workers=app.config.get("BACKGROUND_EXECUTOR_WORKERS", 2),
+        thread_name_prefix="travelmind-background",
+    )
+
+
+def _submit(pool: str, fn, *args, **kwargs):
+    app = current_app._get_current_object()
+
+    def _run():
+        with app.app_context():
+            return fn(*args, **kwargs)
+
+    return app.extensions[pool].submit(_run)
+
+
+def submit_with_app_context(fn, *args, **kwargs):
+    """Zleca wykonanie fn(*args, **kwargs) w puli wątków, wewnątrz kontekstu bieżącej aplikacji."""
+    return _submit("upstream_executor", fn, *args, **kwargs)
+
+
+def submit_background(fn, *args, **kwargs):
+    """Jak submit_with_app_context, ale w puli zadań w tle - nikt nie czeka na wynik."""
+    return _submit("background_executor", fn, *args, **kwargs)
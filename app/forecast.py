@@ -0,0 +1,176 @@
+# app/forecast.py
+"""
+Oszczędne parsowanie prognozy Open-Meteo.
+
+Prognozę dzienną trzymamy kolumnowo (array.array - po jednej tablicy na pole) zamiast
+listy słowników. W cache (app/cache.py) dzień to krótki wiersz liczb (row/from_cache),
+a słownik dnia dla szablonu powstaje dopiero przy budowaniu planu (services._build_plan).
+"""
+import math
+from array import array
+from datetime import date, datetime
+from .constans import WEATHER_CODES_PL
+
+_NAN = float("nan")
+# Kod pogodowy "brak danych" w kolumnie kodów (array typu 'h' nie przechowuje None)
+_NO_CODE = -1
+_MAX_CODE = 32767
+
+
+def _float_column(values, n: int) -> array:
+    values = list(values or [])[:n]
+    values += [None] * (n - len(values))
+    try:
+        return array("d", [_NAN if v is None else v for v in values])
+    except (TypeError, OverflowError):
+        # Pojedyncze nieliczbowe lub zbyt duże wartości (nie powinny się zdarzać) zamieniamy na brak danych
+        return array("d", [_as_float(v) for v in values])
+
+
+def _as_float(v) -> float:
+    if not isinstance(v, (int, float)):
+        return _NAN
+    try:
+        return float(v)
+    except OverflowError:
+        return _NAN
+
+
+def _finite(v: float) -> float | None:
+    """Wartość kolumny albo None dla braku danych (NaN) i wartości nieskończonych."""
+    return v if math.isfinite(v) else None
+
+
+# Klucze słownika dnia (stary format wpisów cache) w kolejności wiersza z DailySeries.row
+_LEGACY_DAY_KEYS = ("temperatura_min", "temperatura_max", "opad_mm", "wiatr_kmh", "weathercode")
+
+
+def _code_column(values, n: int) -> array:
+    values = list(values or [])[:n]
+    values += [None] * (n - len(values))
+    return array("h", [
+        int(v) if isinstance(v, (int, float)) and math.isfinite(v) and 0 <= v <= _MAX_CODE else _NO_CODE
+        for v in values
+    ])
+
+
+class DailySeries:
+    """Prognoza dzienna Open-Meteo w kolumnach; indeks dnia wyliczamy z daty, bez przeszukiwania."""
+
+    __slots__ = ("dates", "start", "temp_min", "temp_max", "precipitation", "wind", "codes", "description")
+
+    def __init__(self, daily: dict):
+        self.dates = list(daily.get("time") or [])
+        n = len(self.dates)
+        try:
+            self.start = date.fromisoformat(self.dates[0]) if n else None
+        except ValueError:
+            self.start = None
+        self.temp_min = _float_column(daily.get("temperature_2m_min"), n)
+        self.temp_max = _float_column(daily.get("temperature_2m_max"), n)
+        self.precipitation = _float_column(daily.get("precipitation_sum"), n)
+        self.wind = _float_column(daily.get("windspeed_10m_max"), n)
+        self.codes = _code_column(daily.get("weathercode"), n)
+        # Opis dnia bez kodu pogodowego (zwykle opis bieżącej pogody)
+        self.description = "Nieznane warunki pogodowe"
+
+    @classmethod
+    def from_cache(cls, days: list[str], payloads: dict) -> "DailySeries":
+        """Seria z wierszy cache ({dzień: wiersz z row()}); dni niedostępne i brakujące pomijamy."""
+        dates, rows = [], []
+        for day in days:
+            payload = payloads.get(day)
+            if isinstance(payload, dict) and not payload.get("unavailable"):
+                # Wpis zapisany przed przejściem na wiersze
+                payload = [payload.get(key) for key in _LEGACY_DAY_KEYS]
+            if isinstance(payload, list):
+                dates.append(day)
+                rows.append(payload)
+        columns = list(zip(*rows)) or [()] * 5
+        return cls({
+            "time": dates,
+            "temperature_2m_min": columns[0],
+            "temperature_2m_max": columns[1],
+            "precipitation_sum": columns[2],
+            "windspeed_10m_max": columns[3],
+            "weathercode": columns[4],
+        })
+
+    def __len__(self):
+        return len(self.dates)
+
+    def index_of(self, day: str) -> int | None:
+        """Indeks dnia w serii (dni w odpowiedzi Open-Meteo są kolejne) albo None."""
+        if self.start is None:
+            return None
+        try:
+            i = (date.fromisoformat(day) - self.start).days
+        except ValueError:
+            return None
+        if 0 <= i < len(self.dates) and self.dates[i] == day:
+            return i
+        return None
+
+    def row(self, i: int) -> list:
+        """Dzień jako wiersz do cache: [temp. min, temp. max, opad, wiatr, kod] (None - brak danych)."""
+        code = self.codes[i]
+        return [
+            _finite(self.temp_min[i]),
+            _finite(self.temp_max[i]),
+            _finite(self.precipitation[i]),
+            _finite(self.wind[i]),
+            code if code != _NO_CODE else None,
+        ]
+
+    def day_dict(self, i: int) -> dict:
+        """Słownik dnia w formacie używanym w szablonie plan_results.html i w zapisanych planach."""
+        day = {"date": self.dates[i]}
+        # Brak danych (NaN) i wartości nieskończone pomijamy
+        v = _finite(self.temp_min[i])
+        if v is not None:
+            day["temperatura_min"] = round(v)
+        v = _finite(self.temp_max[i])
+        if v is not None:
+            day["temperatura_max"] = round(v)
+        v = _finite(self.precipitation[i])
+        if v is not None:
+            day["opad_mm"] = round(v, 1)
+        v = _finite(self.wind[i])
+        if v is not None:
+            day["wiatr_kmh"] = round(v, 1)
+        code = self.codes[i]
+        if code != _NO_CODE:
+            day["weathercode"] = code
+            day["opis"] = WEATHER_CODES_PL.get(code, "Nieznane warunki pogodowe")
+        else:
+            day["opis"] = self.description
+        return day
+
+    def to_dicts(self) -> list[dict]:
+        return [self.day_dict(i) for i in range(len(self.dates))]
+
+
+def current_humidity(data: dict) -> float | None:
+    """
+    Wilgotność dla bieżącej godziny. Preferujemy blok "current" (jedna wartość);
+    dla odpowiedzi z pełną serią godzinową indeks liczymy z różnicy czasu względem
+    pierwszej godziny, zamiast parsować i przeszukiwać wszystkie znaczniki czasu.
+    """
+    current = data.get("current") or {}
+    if current.get("relative_humidity_2m") is not None:
+        return current["relative_humidity_2m"]
+
+    hourly = data.get("hourly") or {}
+    times = hourly.get("time") or []
+    values = hourly.get("relativehumidity_2m") or []
+    current_time = (data.get("current_weather") or {}).get("time")
+    if not times or not values or not current_time:
+        return None
+    try:
+        first = datetime.fromisoformat(times[0])
+        now = datetime.fromisoformat(current_time)
+        i = round((now - first).total_seconds() / 3600)
+    except (TypeError, ValueError):
+        return None
+    i = min(max(i, 0), len(values) - 1)
+    return values[i]
@@ -0,0 +1,166 @@
+# app/geocoder.py
+"""
+Lokalny (offline) geokoder dla miast z katalogu destynacji.
+
+Współrzędne miast z tabeli `cities` (uzupełniane skryptem scripts/geocode_destinations.py)
+trzymamy w pamięci procesu, więc miasta z katalogu nie wymagają zapytania do Geoapify/Open-Meteo.
+Nieznane miejsca obsługuje dalej zdalne geokodowanie w api_clients.get_coordinates_for_city.
+
+Oprócz polskiej nazwy z katalogu miasto znajdziemy pod nazwami z app/plans/city_aliases.json
+(np. Paryż - "Paris"). Kraj w zapytaniu nadal musi być nazwą z katalogu.
+Po błędzie bazy zostaje poprzedni indeks, a przebudowę ponawiamy po LOCAL_GEOCODER_RETRY_SECONDS.
+"""
+import json
+import os
+import threading
+import time
+from flask import current_app
+from sqlalchemy.exc import SQLAlchemyError
+from . import db
+from .utils import fold_text
+from .catalog import get_catalog
+
+
+class LocalGeocoder:
+    """Indeks {znormalizowana nazwa/alias: [miejsca]} zbudowany z listy słowników name/country/lat/lon."""
+
+    def __init__(self, entries):
+        self._index = {}
+        # Wszystkie miejsca - źródło indeksu przestrzennego miast (app/spatial.py)
+        self.places = []
+        self.size = 0
+        for entry in entries:
+            self.add(entry)
+
+    def add(self, entry: dict) -> None:
+        place = {
+            "name": entry["name"],
+            "country": entry.get("country"),
+            "country_key": fold_text(entry.get("country")),
+            "lat": entry["lat"],
+            "lon": entry["lon"],
+        }
+        keys = {fold_text(entry["name"])}
+        if entry.get("country"):
+            keys.add(fold_text(f"{entry['name']} {entry['country']}"))
+        for alias in entry.get("aliases") or []:
+            keys.add(fold_text(alias))
+        for key in keys:
+            if key:
+                self._index.setdefault(key, []).append(place)
+        self.places.append(place)
+        self.size += 1
+
+    def lookup(self, query: str, country: str = None) -> dict | None:
+        """
+        Zwraca {"lat", "lon"} albo None, gdy miejsca nie ma w katalogu, nie ma go w podanym
+        kraju lub nazwa jest niejednoznaczna (to samo miasto w kilku krajach, a kraj nie został podany).
+        """
+        if not query:
+            return None
+        parts = [p for p in query.split(",") if p.strip()]
+        if not parts:
+            return None
+        if country is None and len(parts) > 1:
+            # "Kraków, Polska" - ostatni człon traktujemy jako kraj
+            country = parts[-1]
+
+        candidates = self._index.get(fold_text(query)) or self._index.get(fold_text(parts[0])) or []
+        if country:
+            # Miasto o tej nazwie w innym kraju ("Paris, Texas") to nie to miejsce - zostawiamy je zdalnemu geokoderowi
+            country_key = fold_text(country)
+            candidates = [p for p in candidates if p["country_key"] == country_key]
+
+        distinct = {(p["lat"], p["lon"]) for p in candidates}
+        if len(distinct) != 1:
+            return None
+        lat, lon = distinct.pop()
+        return {"lat": lat, "lon": lon}
+
+
+_geocoder = None
+_geocoder_built_at = 0.0
+# Wersja katalogu (plik + data_versions) - skrypty podbijają ją po zmianie współrzędnych miast
+_geocoder_catalog_version = None
+# Po nieudanej przebudowie - do tej chwili zwracamy poprzedni indeks bez ponownej próby
+_geocoder_retry_at = 0.0
+_geocoder_lock = threading.Lock()
+
+
+def _aliases_path() -> str:
+    return os.path.join(current_app.root_path, 'plans', 'city_aliases.json')
+
+
+def _load_aliases() -> dict:
+    """{(nazwa, kraj) po fold_text: [inne nazwy miasta]} z city_aliases.json; pusty przy błędzie pliku."""
+    try:
+        with open(_aliases_path(), 'r', encoding='utf-8') as f:
+            rows = json.load(f)
+        return {(fold_text(r["name"]), fold_text(r["country"])): list(r["aliases"]) for r in rows}
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        current_app.logger.warning(f"Nie udało się wczytać aliasów miast: {e}")
+        return {}
+
+
+def _load_catalog_entries() -> list[dict]:
+    from .models import City, Country
+
+    rows = (
+        db.session.query(City.name, Country.name, City.lat, City.lon)
+        .join(Country, City.country_id == Country.id)
+        .filter(City.lat.isnot(None), City.lon.isnot(None))
+        .all()
+    )
+    # image_keyword to fraza do wyszukiwania zdjęć, a nie nazwa miejsca - aliasy są tylko w city_aliases.json
+    aliases = _load_aliases()
+    return [
+        {"name": name, "country": country, "lat": lat, "lon": lon,
+         "aliases": aliases.get((fold_text(name), fold_text(country)))}
+        for name, country, lat, lon in rows
+    ]
+
+
+def get_local_geocoder() -> LocalGeocoder:
+    """Zwraca geokoder procesu, przebudowując go co LOCAL_GEOCODER_REFRESH_SECONDS i po zmianie katalogu."""
+    global _geocoder, _geocoder_built_at, _geocoder_catalog_version, _geocoder_retry_at
+
+    catalog_version = get_catalog().version
+    config = current_app.config
+    max_age = config.get("LOCAL_GEOCODER_REFRESH_SECONDS", 600)
+
+    def _is_current():
+        if _geocoder is None:
+            return False
+        now = time.monotonic()
+        return now < _geocoder_retry_at or (
+            _geocoder_catalog_version == catalog_version and now - _geocoder_built_at < max_age
+        )
+
+    if _is_current():
+        return _geocoder
+
+    with _geocoder_lock:
+        if _is_current():
+            return _geocoder
+        try:
+            entries = _load_catalog_entries()
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            retry = config.get("LOCAL_GEOCODER_RETRY_SECONDS", 30)
+            # Nie zapamiętujemy wersji - zostaje poprzedni indeks (albo pusty), kolejna próba za `retry` s
+            current_app.logger.warning(f"Nie udało się zbudować lokalnego geokodera (ponowna próba za {retry} s): {e}")
+            if _geocoder is None:
+                _geocoder = LocalGeocoder([])
+            _geocoder_retry_at = time.monotonic() + retry
+            return _geocoder
+        # Podmieniamy referencję w całości - równoległe odczyty widzą stary albo nowy indeks
+        _geocoder = LocalGeocoder(entries)
+        _geocoder_built_at = time.monotonic()
+        _geocoder_catalog_version = catalog_version
+        _geocoder_retry_at = 0.0
+        current_app.logger.info(f"Lokalny geokoder: {_geocoder.size} miast ze współrzędnymi.")
+        return _geocoder
+
+
+def local_geocode(city: str, country: str = None) -> dict | None:
+    return get_local_geocoder().lookup(city, country)
@@ -0,0 +1,117 @@
+# app/http_client.py
+"""
+Wspólna warstwa HTTP dla wszystkich zewnętrznych API (Open-Meteo, Geoapify, Google Places).
+
+Każde API ma własną sesję `requests.Session` z pulą połączeń keep-alive,
+więc kolejne zapytania nie płacą ponownie za handshake TCP/TLS, oraz własny
+bezpiecznik z adaptacyjnym timeoutem (app/circuit_breaker.py).
+"""
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from flask import current_app
+from .circuit_breaker import CircuitBreaker, CircuitOpenError
+
+# Nazwy upstreamów używane w konfiguracji (UPSTREAM_TIMEOUTS) i w wywołaniach upstream_get
+OPEN_METEO = "open_meteo"
+GEOAPIFY = "geoapify"
+GOOGLE_PLACES = "google_places"
+
+# Kody HTTP, przy których warto ponowić zapytanie (przeciążenie / chwilowy błąd serwera)
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class UpstreamHTTP:
+    """Rejestr sesji HTTP (po jednej na upstream), tworzonych leniwie przy pierwszym użyciu."""
+
+    def __init__(self, config):
+        self.config = config
+        self._sessions = {}
+        self._breakers = {}
+        self._lock = threading.Lock()
+
+    def _build_session(self, upstream: str) -> requests.Session:
+        pool_size = self.config.get("UPSTREAM_POOL_MAXSIZE", 20)
+        retries = self.config.get("UPSTREAM_MAX_RETRIES", 2)
+
+        # Ponawiamy tylko błędy połączenia i kody z RETRY_STATUSES.
+        # Timeoutów odczytu nie ponawiamy, żeby nie mnożyć czasu oczekiwania (np. 20s Google Places).
+        retry = Retry(
+            total=retries,
+            connect=retries,
+            read=0,
+            status=retries,
+            backoff_factor=self.config.get("UPSTREAM_BACKOFF_FACTOR", 0.3),
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=frozenset(["GET"]),
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=self.config.get("UPSTREAM_POOL_CONNECTIONS", 4),
+            pool_maxsize=pool_size,
+            max_retries=retry,
+        )
+
+        session = requests.Session()
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        session.headers.update({"User-Agent": "TravelMind/1.0"})
+        return session
+
+    def session(self, upstream: str) -> requests.Session:
+        session = self._sessions.get(upstream)
+        if session is None:
+            with self._lock:
+                session = self._sessions.get(upstream)
+                if session is None:
+                    session = self._build_session(upstream)
+                    self._sessions[upstream] = session
+        return session
+
+    def breaker(self, upstream: str) -> CircuitBreaker:
+        breaker = self._breakers.get(upstream)
+        if breaker is None:
+            with self._lock:
+                breaker = self._breakers.setdefault(upstream, CircuitBreaker(upstream, self.config))
+        return breaker
+
+    def timeout(self, upstream: str, override: float = None, probe: bool = False) -> tuple:
+        """Zwraca krotkę (connect, read) dla requests. Timeout z konfiguracji (lub override) jest górną granicą."""
+        max_read_timeout = override
+        if max_read_timeout is None:
+            max_read_timeout = self.config.get("UPSTREAM_TIMEOUTS", {}).get(upstream, 10)
+        read_timeout = self.breaker(upstream).read_timeout(max_read_timeout, probe=probe)
+        connect_timeout = min(self.config.get("UPSTREAM_CONNECT_TIMEOUT", 3.05), read_timeout)
+        return (connect_timeout, read_timeout)
+
+    def close(self):
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+
+
+def init_app(app):
+    app.extensions["upstream_http"] = UpstreamHTTP(app.config)
+
+
+def upstream_get(upstream: str, url: str, params: dict = None, timeout: float = None) -> requests.Response:
+    """
+    Wykonuje GET przez sesję z pulą połączeń przypisaną do danego upstreamu.
+    Rzuca wyjątki requests.exceptions.RequestException tak jak zwykłe requests.get -
+    również CircuitOpenError, gdy bezpiecznik upstreamu jest otwarty.
+    """
+    http = current_app.extensions["upstream_http"]
+    breaker = http.breaker(upstream)
+    probe = breaker.before_call()
+    started = time.monotonic()
+    try:
+        response = http.session(upstream).get(url, params=params, timeout=http.timeout(upstream, timeout, probe=probe))
+    except Exception:
+        breaker.record(False, probe=probe)
+        raise
+    breaker.record(response.status_code not in RETRY_STATUSES, time.monotonic() - started, probe=probe)
+    return response
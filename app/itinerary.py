@@ -0,0 +1,161 @@
+# app/itinerary.py
+"""
+Plan dnia po dniu: atrakcje planu dzielone na dni według położenia i ustawiane w kolejności
+skracającej przejścia między nimi.
+
+1. Macierz odległości (haversine, wektorowo w NumPy) między atrakcjami i centrum miasta.
+2. Zrównoważone grupy na dni: ziarna metodą najdalszego punktu, przydział do najbliższego
+   ziarna z limitem pojemności dnia (ceil(n / dni)), kilka rund poprawiania medoidów.
+3. Kolejność w dniu: wstawianie najtańsze (od centrum miasta), potem 2-opt.
+
+Całość ma twardy limit czasu (ITINERARY_TIME_BUDGET_MS) - po jego przekroczeniu zwracamy
+najlepszy dotychczasowy wynik, więc czas odpowiedzi nie rośnie z liczbą dni i atrakcji.
+"""
+import time
+from datetime import date, timedelta
+import numpy as np
+from flask import current_app
+from .spatial import haversine_km
+
+# Rundy poprawiania podziału na dni (przydział -> nowe medoidy)
+MAX_CLUSTER_ROUNDS = 8
+
+
+def distance_matrix(lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+    """Macierz odległości (km) między wszystkimi punktami - jedno wywołanie haversine."""
+    return haversine_km(lats[:, None], lons[:, None], lats[None, :], lons[None, :])
+
+
+def _balanced_clusters(dist: np.ndarray, k: int, deadline: float) -> list[list[int]]:
+    """Dzieli punkty na najwyżej k grup, każda co najwyżej ceil(n / k) punktów."""
+    n = len(dist)
+
+    # Ziarna: punkt najdalszy od reszty, potem kolejno najdalszy od wybranych
+    seeds = [int(np.argmax(dist.sum(axis=1)))]
+    while len(seeds) < k:
+        seeds.append(int(np.argmax(dist[:, seeds].min(axis=1))))
+
+    clusters = None
+    for _ in range(MAX_CLUSTER_ROUNDS):
+        # Pary (punkt, grupa) od najbliższej - każdy punkt trafia do najbliższej grupy z wolnym miejscem
+        order = np.argsort(dist[:, seeds], axis=None, kind="stable")
+        assigned = [-1] * n
+        free = [-(-n // len(seeds))] * len(seeds)
+        for flat in order:
+            point, c = divmod(int(flat), len(seeds))
+            if assigned[point] < 0 and free[c] > 0:
+                assigned[point] = c
+                free[c] -= 1
+        # Pustą grupę (np. punkty o identycznych współrzędnych) pomijamy
+        new_clusters = [members for members in ([p for p in range(n) if assigned[p] == c] for c in range(len(seeds))) if members]
+        if new_clusters == clusters or time.perf_counter() > deadline:
+            return new_clusters
+        clusters = new_clusters
+        # Nowe ziarno grupy: medoid (najmniejsza suma odległości do pozostałych)
+        seeds = [members[int(np.argmin(dist[np.ix_(members, members)].sum(axis=1)))] for members in clusters]
+    return clusters
+
+
+def _path_length(dist: np.ndarray, route: list[int]) -> float:
+    return float(sum(dist[a, b] for a, b in zip(route, route[1:])))
+
+
+def _cheapest_insertion(dist: np.ndarray, start: int, points: list[int]) -> list[int]:
+    """Ścieżka otwarta od `start`: kolejno wstawiamy punkt i miejsce o najmniejszym przyroście długości."""
+    route = [start]
+    remaining = [p for p in points if p != start]
+    while remaining:
+        rem = np.array(remaining)
+        r = np.array(route)
+        # Wstawienie między route[i] a route[i+1] ...
+        between = dist[r[:-1, None], rem[None, :]] + dist[rem[None, :], r[1:, None]] - dist[r[:-1], r[1:]][:, None]
+        # ... albo na końcu ścieżki
+        at_end = dist[r[-1], rem][None, :]
+        costs = np.vstack([between, at_end])
+        pos, j = divmod(int(np.argmin(costs)), len(rem))
+        route.insert(pos + 1, remaining.pop(j))
+    return route
+
+
+def _two_opt(dist: np.ndarray, route: list[int], deadline: float) -> list[int]:
+    """Odwraca fragmenty ścieżki (początek stały), dopóki skraca to trasę i starcza czasu."""
+    route = list(route)
+    n = len(route)
+    improved = True
+    while improved and time.perf_counter() < deadline:
+        improved = False
+        for i in range(1, n - 1):
+            r = np.array(route)
+            j = np.arange(i + 1, n)
+            nxt = np.minimum(j + 1, n - 1)
+            # Zysk z odwrócenia route[i..j]; ostatni punkt nie ma następnika (ścieżka otwarta)
+            tail = np.where(j + 1 < n, dist[r[i], r[nxt]] - dist[r[j], r[nxt]], 0.0)
+            delta = dist[r[i - 1], r[j]] - dist[r[i - 1], r[i]] + tail
+            best = int(np.argmin(delta))
+            if delta[best] < -1e-9:
+                route[i:j[best] + 1] = reversed(route[i:j[best] + 1])
+                improved = True
+            if time.perf_counter() > deadline:
+                break
+    return route
+
+
+def build_itinerary(attractions: list[dict], days: int, center: dict = None, start_date=None) -> list[dict]:
+    """
+    Zwraca listę dni [{"day", "date", "stops": [indeksy w `attractions`], "distance_km"}].
+    Atrakcje bez współrzędnych dopisujemy na końcu najmniej zajętych dni.
+    center ({"lat", "lon"}) to punkt startu każdego dnia (np. centrum miasta), może go nie być.
+    """
+    if not attractions or not days:
+        return []
+    budget_ms = current_app.config.get("ITINERARY_TIME_BUDGET_MS", 50)
+    deadline = time.perf_counter() + budget_ms / 1000.0
+
+    located = [i for i, a in enumerate(attractions) if a.get("lat") is not None and a.get("lon") is not None]
+    unlocated = sorted(set(range(len(attractions))) - set(located))
+    k = max(1, min(int(days), len(attractions)))
+
+    schedule = [[] for _ in range(k)]
+    distances = [0.0] * k
+    if located:
+        lats = np.array([float(attractions[i]["lat"]) for i in located])
+        lons = np.array([float(attractions[i]["lon"]) for i in located])
+        has_center = center is not None and center.get("lat") is not None and center.get("lon") is not None
+        if has_center:
+            # Centrum jako ostatni wiersz macierzy - początek trasy każdego dnia
+            lats = np.append(lats, float(center["lat"]))
+            lons = np.append(lons, float(center["lon"]))
+        dist = distance_matrix(lats, lons)
+        n = len(located)
+
+        clusters = _balanced_clusters(dist[:n, :n], min(k, n), deadline)
+        if has_center:
+            # Dzień 1 najbliżej centrum
+            clusters.sort(key=lambda members: float(dist[n, members].min()))
+
+        for c, members in enumerate(clusters):
+            start = n if has_center else members[int(np.argmin(dist[np.ix_(members, members)].sum(axis=1)))]
+            route = _cheapest_insertion(dist, start, members)
+            if time.perf_counter() < deadline:
+                route = _two_opt(dist, route, deadline)
+            distances[c] = _path_length(dist, route)
+            schedule[c] = [located[p] for p in route if p < n]
+
+    for i in unlocated:
+        lightest = min(range(k), key=lambda c: len(schedule[c]))
+        schedule[lightest].append(i)
+
+    try:
+        first_day = date.fromisoformat(start_date) if isinstance(start_date, str) else start_date
+    except ValueError:
+        first_day = None
+    return [
+        {
+            "day": c + 1,
+            "date": (first_day + timedelta(days=c)).isoformat() if first_day else None,
+            "stops": stops,
+            "distance_km": round(distances[c], 1),
+        }
+        for c, stops in enumerate(schedule)
+        if stops
+    ]
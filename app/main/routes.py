@@ -3,11 +3,16 @@ from flask_login import login_user, logout_user, current_user, login_required
 from . import main
 from .forms import PlanGeneratorForm
 from ..api_clients import build_geocode_variants
+from ..http_client import upstream_get, OPEN_METEO
+from ..autocomplete import suggest, learn_places, was_asked_upstream, mark_asked_upstream
 from app.forms import LoginForm 
-import json
-import os
+from datetime import datetime
+from sqlalchemy import tuple_
+from sqlalchemy.orm import load_only
 from app.utils import normalize_city_name
-from app.recommendations import recommend_city, get_grouped_recommendations
+from app.catalog import get_catalog
+from app.recommendations import get_grouped_recommendations
+from app.services import get_suggestions_weather
 
 
 from app.models import User, GeneratedPlan
@@ -23,16 +28,6 @@ BASE_COSTS = {
     "Komfortowy": 1000    # np. hotel 4-5*, taxi, drogie atrakcje
 }
 
-def load_destinations():
-    """Ładuje listę miast z pliku JSON."""
-    try:
-        json_path = os.path.join(current_app.root_path, 'plans', 'destinations.json')
-        with open(json_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except Exception as e:
-        current_app.logger.error(f"Błąd ładowania destinations.json: {e}")
-        return []
-
 @main.route("/", methods=["GET", "POST"])
 def index():
     form = PlanGeneratorForm()
@@ -41,7 +36,7 @@ def index():
         vibes_input = form.vibes.data
         style = form.travel_style.data
         
-        destinations = load_destinations()
+        destinations = get_catalog()
         
         start = form.start_date
         end = form.end_date
@@ -88,12 +83,18 @@ def index():
         
         # Ścieżka B: Użytkownik wybrał kafelki (i NIE wpisał miasta) -> SUGESTIE
         elif vibes_input:
-            grouped_suggestions = get_grouped_recommendations(vibes_input, destinations, budget_style=style)
+            # Odczyt z sugestii przeliczonych przy wczytaniu katalogu (precompute_suggestions)
+            grouped_suggestions = get_grouped_recommendations(
+                vibes_input, destinations, budget_style=style, start_date=start, end_date=end
+            )
             
             if grouped_suggestions:
+                # Pogoda dla wszystkich sugerowanych miast - jedno zbiorcze zapytanie do Open-Meteo
+                suggestions_weather = get_suggestions_weather(grouped_suggestions, start_iso, end_iso)
                 return render_template(
                     "suggestions.html",
                     grouped_suggestions=grouped_suggestions,
+                    suggestions_weather=suggestions_weather,
                     vibes=vibes_input,
                     days=days,
                     style=style,
@@ -114,7 +115,9 @@ def index():
 
 @main.route("/api/geocode")
 def api_geocode():
-    """Prosty proxy do Open-Meteo Geocoding API (darmowe). Zwraca listę sugestii.
+    """Podpowiedzi miast dla pola wyszukiwania. Zwraca listę sugestii.
+    Najpierw przeszukuje lokalny indeks (katalog + wcześniej znalezione miejsca),
+    a Open-Meteo Geocoding API (darmowe) odpytuje tylko przy zbyt małej liczbie trafień.
     Query param: q (string)
     """
     q = request.args.get("q", "")
@@ -122,6 +125,11 @@ def api_geocode():
     if not q:
         return jsonify([])
 
+    limit = 6
+    local_results = suggest(q, limit=limit)
+    if len(local_results) >= current_app.config.get("AUTOCOMPLETE_MIN_LOCAL_HITS", 3) or was_asked_upstream(q):
+        return jsonify(local_results)
+
     # Upraszczamy zapytanie dla lepszych wyników geokodowania - użyjemy zwykle tylko nazwy miasta
     try:
         variants = build_geocode_variants(q)
@@ -130,11 +138,9 @@ def api_geocode():
     except Exception:
         search_q = q
     try:
-        import requests
-
         om_url = "https://geocoding-api.open-meteo.com/v1/search"
-        params = {"name": search_q, "count": 6, "language": "pl"}
-        resp = requests.get(om_url, params=params, timeout=6)
+        params = {"name": search_q, "count": limit, "language": "pl"}
+        resp = upstream_get(OPEN_METEO, om_url, params=params, timeout=6)
         resp.raise_for_status()
         data = resp.json()
         results = []
@@ -148,11 +154,22 @@ def api_geocode():
             if country:
                 display += f", {country}"
             results.append(
-                {"name": display, "lat": r.get("latitude"), "lon": r.get("longitude")}
+                {"name": display, "lat": r.get("latitude"), "lon": r.get("longitude"), "key_name": name}
             )
-        return jsonify(results)
+        learn_places(results)
+        mark_asked_upstream(q)
+
+        merged = list(local_results)
+        seen = {item["name"] for item in merged}
+        for item in results:
+            if item["name"] not in seen and len(merged) < limit:
+                merged.append({"name": item["name"], "lat": item["lat"], "lon": item["lon"]})
+                seen.add(item["name"])
+        return jsonify(merged)
     except Exception as e:
         current_app.logger.error(f"Błąd geokodowania (Open-Meteo) dla q={q}: {e}")
+        if local_results:
+            return jsonify(local_results)
         return jsonify([]), 500
 
 @main.route('/login', methods=['GET', 'POST'])
@@ -251,8 +268,44 @@ def profile():
 @main.route('/my-plans')
 @login_required
 def my_plans():
-    user_plans = GeneratedPlan.query.filter_by(user_id=current_user.id).order_by(GeneratedPlan.created_at.desc()).all()
-    return render_template('my_plans.html', plans=user_plans)
+    """
+    Plany użytkownika od najnowszych, stronami po MY_PLANS_PAGE_SIZE. Kolejna strona zaczyna się
+    za (created_at, id) ostatniego planu (parametr `after`), więc zapytanie czyta tylko jedną stronę
+    indeksu ix_generated_plans_user_id_created_at - bez OFFSET i bez kolumn JSON, których lista nie pokazuje.
+    """
+    page_size = current_app.config.get('MY_PLANS_PAGE_SIZE', 24)
+    query = (
+        GeneratedPlan.query
+        .options(load_only(
+            GeneratedPlan.id, GeneratedPlan.city, GeneratedPlan.country, GeneratedPlan.days,
+            GeneratedPlan.travel_style, GeneratedPlan.created_at,
+        ))
+        .filter_by(user_id=current_user.id)
+    )
+
+    after = _parse_plans_cursor(request.args.get('after'))
+    if after:
+        query = query.filter(tuple_(GeneratedPlan.created_at, GeneratedPlan.id) < after)
+
+    # Jeden wiersz więcej mówi, czy jest następna strona
+    user_plans = query.order_by(GeneratedPlan.created_at.desc(), GeneratedPlan.id.desc()).limit(page_size + 1).all()
+    next_cursor = None
+    if len(user_plans) > page_size:
+        user_plans = user_plans[:page_size]
+        last = user_plans[-1]
+        next_cursor = f"{last.created_at.isoformat()}_{last.id}"
+    return render_template('my_plans.html', plans=user_plans, next_cursor=next_cursor, is_first_page=after is None)
+
+
+def _parse_plans_cursor(cursor: str):
+    """'<created_at ISO>_<id>' -> (datetime, id); niepoprawny kursor oznacza pierwszą stronę."""
+    if not cursor:
+        return None
+    created_at, _, plan_id = cursor.rpartition('_')
+    try:
+        return datetime.fromisoformat(created_at), int(plan_id)
+    except ValueError:
+        return None
 
 @main.route('/reset-password', methods=['GET', 'POST'])
 def reset_request():
@@ -0,0 +1,71 @@
+# app/matching.py
+"""
+Indeks rozmytego dopasowania nazw miast (pole "Miasto docelowe" -> wpis katalogu).
+
+Nazwy są normalizowane (fold_text: ASCII, małe litery) raz, przy budowie indeksu.
+Dla zapytania wybieramy kandydatów po wspólnych trigramach (blocking), a dopiero
+ich oceniamy funkcjami RapidFuzz (process.extract, implementacja w C) - zamiast
+porównywać zapytanie z całym katalogiem.
+"""
+import numpy as np
+from rapidfuzz import fuzz, process
+from .utils import fold_text, trigrams
+
+# Ilu kandydatów z blockingu oceniamy dokładnie
+MAX_CANDIDATES = 200
+
+
+class CityMatcher:
+    def __init__(self, entries: list[dict]):
+        self.entries = entries
+        self.keys = [fold_text(e.get('name')) for e in entries]
+        self.country_keys = [fold_text(e.get('country')) for e in entries]
+
+        postings = {}
+        for i, key in enumerate(self.keys):
+            for gram in trigrams(key) if key else ():
+                postings.setdefault(gram, []).append(i)
+        self._postings = {gram: np.array(ids, dtype=np.int32) for gram, ids in postings.items()}
+
+    def candidates(self, qkey: str, max_candidates: int = MAX_CANDIDATES) -> np.ndarray:
+        """Indeksy wpisów o największej liczbie wspólnych trigramów z zapytaniem."""
+        q_grams = trigrams(qkey)
+        postings = [self._postings[g] for g in q_grams if g in self._postings]
+        if not postings:
+            return np.empty(0, dtype=np.int64)
+        counts = np.bincount(np.concatenate(postings), minlength=len(self.keys))
+        # Co najmniej jedna trzecia trigramów zapytania musi się zgadzać
+        ids = np.flatnonzero(counts >= max(1, len(q_grams) // 3))
+        if len(ids) > max_candidates:
+            ids = ids[np.argpartition(-counts[ids], max_candidates)[:max_candidates]]
+        return ids
+
+    def search(self, query: str, limit: int = 5, score_cutoff: float = 0, country: str = None) -> list[tuple]:
+        """
+        Zwraca do `limit` par (wpis katalogu, wynik 0-100), od najlepszej.
+        "Miasto, Kraj" w zapytaniu (albo parametr country) stawia miasta z tego kraju na początku.
+        """
+        name, _, country_part = (query or "").partition(",")
+        qkey = fold_text(name)
+        if not qkey:
+            return []
+        country_key = fold_text(country or country_part)
+
+        # Krótkich zapytań (mniej niż trigram) nie da się zawęzić - oceniamy cały katalog
+        ids = self.candidates(qkey) if len(qkey) >= 3 else np.arange(len(self.keys))
+        if not len(ids):
+            return []
+
+        results = process.extract(
+            qkey,
+            [self.keys[i] for i in ids],
+            scorer=fuzz.token_sort_ratio,
+            processor=None,
+            limit=limit * 4 if country_key else limit,
+            score_cutoff=score_cutoff,
+        )
+        matches = [(int(ids[pos]), score) for _, score, pos in results]
+        if country_key:
+            # sorted() jest stabilne - w obrębie grupy zostaje kolejność wg wyniku
+            matches.sort(key=lambda m: self.country_keys[m[0]] != country_key)
+        return [(self.entries[i], score) for i, score in matches[:limit]]
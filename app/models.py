@@ -4,7 +4,10 @@ from flask_login import UserMixin
 from itsdangerous import URLSafeTimedSerializer
 from flask import current_app
 from . import db 
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
 import uuid
 
 
@@ -43,6 +46,15 @@ class User(UserMixin, db.Model):
 
 class GeneratedPlan(db.Model):
     __tablename__ = 'generated_plans'
+    # Lista "Moje plany" - stronicowanie po (created_at, id) w obrębie użytkownika (main/routes.py).
+    # Wyszukiwanie po atrakcjach (app/plan_search.py) w PostgreSQL: indeks GIN (jsonb_path_ops) pod operator @>
+    __table_args__ = (
+        db.Index('ix_generated_plans_user_id_created_at', 'user_id', 'created_at', 'id'),
+        db.Index(
+            'ix_generated_plans_attractions_data', 'attractions_data',
+            postgresql_using='gin', postgresql_ops={'attractions_data': 'jsonb_path_ops'},
+        ).ddl_if(dialect='postgresql'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     city = db.Column(db.String(100), nullable=False)
     country = db.Column(db.String(100))
@@ -56,10 +68,12 @@ class GeneratedPlan(db.Model):
     total_cost_local_currency = db.Column(db.Float)
     local_currency_code = db.Column(db.String(3))
 
-    weather_data = db.Column(db.JSON) 
-    attractions_data = db.Column(db.JSON) 
+    # W PostgreSQL JSONB (zapytania i indeksy GIN), w SQLite zwykły JSON
+    weather_data = db.Column(db.JSON().with_variant(JSONB(), 'postgresql'))
+    attractions_data = db.Column(db.JSON().with_variant(JSONB(), 'postgresql'))
 
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    # NOT NULL - kursor listy "Moje plany" opiera się na (created_at, id)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
     
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True)
     
@@ -81,15 +95,108 @@ class Country(db.Model):
 
 class City(db.Model):
     __tablename__ = 'cities'
+    # Klucz naturalny - upsert w scripts/seed_destinations.py (ON CONFLICT)
+    __table_args__ = (
+        db.UniqueConstraint('name', 'country_id', name='uq_cities_name_country'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
     tags = db.Column(db.JSON)
     cost_tier = db.Column(db.String(50))
     cost_multiplier = db.Column(db.Float)
     image_keyword = db.Column(db.String(255))
+    # Współrzędne dla lokalnego geokodera (scripts/geocode_destinations.py)
+    lat = db.Column(db.Float)
+    lon = db.Column(db.Float)
     
     # Klucz obcy do tabeli countries
     country_id = db.Column(db.Integer, db.ForeignKey('countries.id'), nullable=False)
 
     def __repr__(self):
-        return f'<City {self.name}>'
\ No newline at end of file
+        return f'<City {self.name}>'
+
+# --- CACHE ZAPYTAŃ DO ZEWNĘTRZNYCH API (współdzielony przez wszystkie workery) ---
+
+class GeocodeCacheEntry(db.Model):
+    __tablename__ = 'geocode_cache'
+    id = db.Column(db.Integer, primary_key=True)
+    # Znormalizowane zapytanie (patrz app/cache.py: normalize_cache_key)
+    query_key = db.Column(db.String(255), unique=True, nullable=False)
+    # lat/lon = NULL oznacza wynik negatywny (brak miasta u dostawców)
+    lat = db.Column(db.Float)
+    lon = db.Column(db.Float)
+    provider = db.Column(db.String(50))
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+
+    def __repr__(self):
+        return f'<GeocodeCacheEntry {self.query_key}>'
+
+
+class WeatherCacheEntry(db.Model):
+    __tablename__ = 'weather_cache'
+    __table_args__ = (
+        db.UniqueConstraint('cell_key', 'day', name='uq_weather_cache_cell_day'),
+    )
+    id = db.Column(db.Integer, primary_key=True)
+    # Środek komórki siatki pogodowej, np. "50.100,19.900"
+    cell_key = db.Column(db.String(32), nullable=False)
+    # Dzień w formacie ISO albo 'current' dla bieżącej pogody
+    day = db.Column(db.String(10), nullable=False)
+    payload = db.Column(db.JSON, nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+
+    def __repr__(self):
+        return f'<WeatherCacheEntry {self.cell_key} {self.day}>'
+
+
+class AttractionsCacheEntry(db.Model):
+    __tablename__ = 'attractions_cache'
+    id = db.Column(db.Integer, primary_key=True)
+    # Znormalizowane (miasto, kraj, język)
+    query_key = db.Column(db.String(255), unique=True, nullable=False)
+    # Status odpowiedzi Google Places: 'OK' albo 'ZERO_RESULTS'
+    status = db.Column(db.String(20), nullable=False)
+    payload = db.Column(db.JSON, nullable=False)
+    fetched_at = db.Column(db.DateTime, default=datetime.utcnow)
+    # Do fresh_until zwracamy wpis bez odświeżania, do stale_until zwracamy go i odświeżamy w tle
+    fresh_until = db.Column(db.DateTime, nullable=False)
+    stale_until = db.Column(db.DateTime, nullable=False, index=True)
+
+    def __repr__(self):
+        return f'<AttractionsCacheEntry {self.query_key} ({self.status})>'
+
+
+# --- WERSJE DANYCH (unieważnianie pamięci podręcznych procesów, np. app/catalog.py) ---
+
+class DataVersion(db.Model):
+    __tablename__ = 'data_versions'
+    # Nazwa zbioru danych, np. 'destinations'
+    name = db.Column(db.String(50), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    @staticmethod
+    def bump(name):
+        """Podbija wersję zbioru danych (commit po stronie wywołującego)."""
+        entry = db.session.get(DataVersion, name)
+        if entry is None:
+            entry = DataVersion(name=name, version=0)
+            db.session.add(entry)
+        entry.version = (entry.version or 0) + 1
+        entry.updated_at = datetime.utcnow()
+        return entry.version
+
+    @staticmethod
+    def current(name):
+        """Aktualna wersja zbioru (0 przy braku wpisu) - osobna sesja, nie dotyka sesji żądania."""
+        try:
+            with Session(db.engine) as session:
+                return session.scalar(select(DataVersion.version).where(DataVersion.name == name)) or 0
+        except SQLAlchemyError as e:
+            # Np. baza bez migracji data_versions - pamięci podręczne reagują wtedy tylko na inne zmiany
+            current_app.logger.debug(f"Brak wersji danych '{name}': {e}")
+            return 0
+
+    def __repr__(self):
+        return f'<DataVersion {self.name}={self.version}>'
@@ -0,0 +1,75 @@
+# app/plan_search.py
+"""
+Wyszukiwanie w zapisanych planach użytkownika: po rodzaju atrakcji ("muzeum"), nazwie
+atrakcji i kraju. Filtr wykonuje baza, Python dostaje tylko pasujące wiersze.
+
+- PostgreSQL: attractions_data @> '[{"types": ["Muzeum"]}]' / '[{"name": "..."}]'
+  - zawieranie JSONB obsługuje indeks GIN ix_generated_plans_attractions_data.
+- SQLite: EXISTS po json_each(attractions_data) (i json_each typów atrakcji).
+
+Rodzaje atrakcji są zapisane po polsku (PLACE_TYPES_PL, api_clients._parse_place_data), więc zapytanie
+przyjmuje zarówno klucz Google Places ("museum"), jak i polską nazwę ("muzeum").
+"""
+from sqlalchemy import exists, func, or_, select, type_coerce
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import load_only
+from . import db
+from .constans import PLACE_TYPES_PL
+from .models import GeneratedPlan
+
+# Polska nazwa rodzaju (małymi literami) -> zapisana etykieta
+_TYPE_LABELS = {label.lower(): label for label in PLACE_TYPES_PL.values() if label}
+
+
+def attraction_type_labels(attraction_type: str) -> list[str]:
+    """Etykiety, pod którymi rodzaj mógł zostać zapisany w planie (patrz _parse_place_data)."""
+    value = attraction_type.strip()
+    key = value.lower().replace(" ", "_")
+    labels = {
+        PLACE_TYPES_PL.get(key),
+        _TYPE_LABELS.get(value.lower()),
+        # Rodzaj bez tłumaczenia zapisujemy jako "Tourist attraction"
+        key.replace("_", " ").capitalize(),
+    }
+    return sorted(label for label in labels if label)
+
+
+def _contains_attraction(dialect: str, name: str = None, types: list[str] = None):
+    """Warunek "plan ma atrakcję o tej nazwie / jednym z tych rodzajów" w SQL danej bazy."""
+    column = GeneratedPlan.attractions_data
+    if dialect == "postgresql":
+        # Typ kolumny to JSON z wariantem JSONB - bez type_coerce contains() byłoby LIKE zamiast @>
+        jsonb = type_coerce(column, JSONB)
+        if name is not None:
+            return jsonb.contains([{"name": name}])
+        # Każde @> osobno korzysta z indeksu GIN (BitmapOr)
+        return or_(*(jsonb.contains([{"types": [label]}]) for label in types))
+
+    attraction = func.json_each(column).table_valued("value").alias("attraction")
+    if name is not None:
+        return exists(select(1).select_from(attraction).where(func.json_extract(attraction.c.value, "$.name") == name))
+    attraction_type = func.json_each(attraction.c.value, "$.types").table_valued("value").alias("attraction_type")
+    return exists(
+        select(1).select_from(attraction).join(attraction_type, db.true()).where(attraction_type.c.value.in_(types))
+    )
+
+
+def search_plans(user_id: int, attraction_type: str = None, attraction_name: str = None,
+                 country: str = None, limit: int = 50) -> list[GeneratedPlan]:
+    """Plany użytkownika spełniające wszystkie podane kryteria, od najnowszych (bez kolumn JSON)."""
+    dialect = db.engine.dialect.name
+    query = (
+        GeneratedPlan.query
+        .options(load_only(
+            GeneratedPlan.id, GeneratedPlan.city, GeneratedPlan.country, GeneratedPlan.days,
+            GeneratedPlan.travel_style, GeneratedPlan.created_at,
+        ))
+        .filter_by(user_id=user_id)
+    )
+    if attraction_type:
+        query = query.filter(_contains_attraction(dialect, types=attraction_type_labels(attraction_type)))
+    if attraction_name:
+        query = query.filter(_contains_attraction(dialect, name=attraction_name.strip()))
+    if country:
+        query = query.filter(func.lower(GeneratedPlan.country) == country.strip().lower())
+    return query.order_by(GeneratedPlan.created_at.desc(), GeneratedPlan.id.desc()).limit(limit).all()
@@ -1,23 +1,42 @@
-from flask import abort, jsonify, render_template, request, flash, redirect, url_for
+from flask import abort, current_app, jsonify, render_template, request, flash, redirect, url_for
 from flask_login import current_user, login_required
 import json
 from datetime import datetime
 from . import plans
-from ..services import get_plan_details
+from ..services import get_plan_details, get_plan_details_async
 from ..api_clients import get_attractions
-from app.models import GeneratedPlan, db, Country
+from ..itinerary import build_itinerary
+from ..plan_search import search_plans
+from app.models import GeneratedPlan, db
+from app.countries import get_countries
 
 # -------------------------------------------------------------------------
 # 1. GENEROWANIE NOWEGO PLANU (Dla niezapisanych)
 # -------------------------------------------------------------------------
-@plans.route("/<string:city>/<int:days>/<string:style>")
 def show_plan(city, days, style):
-    start = request.args.get("start")
-    end = request.args.get("end")
-    country_name = request.args.get("country") # Zmienna z nazwą kraju
-    lat = request.args.get("lat")
-    lon = request.args.get("lon")
-    
+    query = _plan_query_args(city)
+    plan_data = get_plan_details(query.pop("city"), days, style, **query)
+    return _render_new_plan(plan_data, query["country"])
+
+
+async def show_plan_async(city, days, style):
+    """
+    Wersja asynchroniczna (ASYNC_PLAN_VIEW=true) - pogoda i atrakcje pobierane współbieżnie przez httpx.
+    Pod WSGI żądanie nadal zajmuje wątek workera do końca (patrz app/async_api_clients.py).
+    """
+    query = _plan_query_args(city)
+    plan_data = await get_plan_details_async(query.pop("city"), days, style, **query)
+    return _render_new_plan(plan_data, query["country"])
+
+
+@plans.record_once
+def _register_plan_view(state):
+    # Jeden endpoint 'plans.show_plan' - url_for działa tak samo w obu trybach
+    view = show_plan_async if state.app.config.get("ASYNC_PLAN_VIEW") else show_plan
+    state.add_url_rule("/<string:city>/<int:days>/<string:style>", endpoint="show_plan", view_func=view)
+
+
+def _plan_query_args(city) -> dict:
     if isinstance(city, str):
         city = city.strip()
 
@@ -26,19 +45,26 @@ def show_plan(city, days, style):
     except (ValueError, TypeError):
         cost_mult = 1.2
 
-    plan_data = get_plan_details(
-        city, days, style, country=country_name, start_date=start, end_date=end, lat=lat, lon=lon, cost_mult=cost_mult
-    )
-    
+    return {
+        "city": city,
+        "country": request.args.get("country"), # Zmienna z nazwą kraju
+        "start_date": request.args.get("start"),
+        "end_date": request.args.get("end"),
+        "lat": request.args.get("lat"),
+        "lon": request.args.get("lon"),
+        "cost_mult": cost_mult,
+    }
+
+
+def _render_new_plan(plan_data, country_name):
     if plan_data.get("error"):
         abort(404, description=plan_data["error"])
     
     if country_name:
         plan_data['query']['country'] = country_name
         
-        # SPRAWDZANIE BEZPIECZEŃSTWA
-        country_obj = Country.query.filter_by(name=country_name).first()
-        if country_obj and country_obj.danger:
+        # SPRAWDZANIE BEZPIECZEŃSTWA (słownik krajów w pamięci procesu, bez zapytania do bazy)
+        if get_countries().is_dangerous(country_name):
             plan_data['is_dangerous'] = True
     
     return render_template("plan_results.html", plan=plan_data, is_saved=False)
@@ -75,6 +101,8 @@ def view_saved_plan(plan_id):
         "weather": saved_plan.weather_data or {},
         "attractions": saved_plan.attractions_data or [] 
     }
+    # Podział na dni liczymy na nowo - zapisany plan zawiera tylko wybrane atrakcje
+    plan_data["itinerary"] = build_itinerary(plan_data["attractions"], saved_plan.days, start_date=saved_plan.data_start)
 
     return render_template("plan_results.html", plan=plan_data, is_saved=True)
 
@@ -90,6 +118,31 @@ def api_get_attractions(city):
     return jsonify({"attractions": attractions_data})
 
 
+@plans.route("/api/search")
+@login_required
+def api_search_plans():
+    """Zapisane plany użytkownika, np. ?type=museum, ?name=Luwr, ?country=Francja (kryteria łączone)."""
+    found = search_plans(
+        current_user.id,
+        attraction_type=request.args.get("type"),
+        attraction_name=request.args.get("name"),
+        country=request.args.get("country"),
+        limit=current_app.config.get("PLAN_SEARCH_LIMIT", 50),
+    )
+    return jsonify({"plans": [
+        {
+            "id": plan.id,
+            "city": plan.city,
+            "country": plan.country,
+            "days": plan.days,
+            "style": plan.travel_style,
+            "created_at": plan.created_at.isoformat() if plan.created_at else None,
+            "url": url_for("plans.view_saved_plan", plan_id=plan.id),
+        }
+        for plan in found
+    ]})
+
+
 # -------------------------------------------------------------------------
 # 3. ZAPISYWANIE PLANU DO BAZY (Logika wyboru atrakcji)
 # -------------------------------------------------------------------------
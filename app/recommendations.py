@@ -1,82 +1,214 @@
-import random
-from collections import defaultdict
+import heapq
+import itertools
+import zlib
+import numpy as np
+from .catalog import DestinationCatalog
+from .climate import climate_suitability, trip_month
+from .constans import BASE_COSTS
 
-def recommend_city(selected_tags: list, cities_list: list, budget_style: str = None) -> dict | None:
+# Wagi oceny miasta (suma = 1): pokrycie wybranych tagów i dopasowanie do budżetu
+TAG_WEIGHT = 0.7
+BUDGET_WEIGHT = 0.3
+# Mnożnik kosztów, przy którym dzienny koszt w danym stylu uznajemy za "typowy" (domyślny w aplikacji)
+REFERENCE_COST_MULTIPLIER = 1.2
+# Kara za każde już wybrane miasto tego samego kraju o identycznym zestawie tagów
+DIVERSITY_PENALTY = 0.15
+# Udział warunków klimatycznych w terminie podróży (app/climate.py) w ocenie, gdy znamy daty i normy
+CLIMATE_WEIGHT = 0.3
+# Miasta o gorszym klimacie dla wybranych tagów odrzucamy (np. plaża nad Bałtykiem w styczniu)
+CLIMATE_MIN_SUITABILITY = 0.2
+# Ocena klimatu miast bez norm - neutralna, nie wyklucza ich z sugestii
+CLIMATE_UNKNOWN_SUITABILITY = 0.5
+# Wynik zaokrąglamy do tej skali, żeby prawie równe oceny były remisem rozstrzyganym skrótem
+SCORE_SCALE = 1_000_000
+# Powyżej tylu tagów w katalogu nie przeliczamy z góry wszystkich kombinacji (2^n - 1 zestawów)
+MAX_PRECOMPUTED_TAGS = 10
+
+
+def _excluded_cost_tiers(budget_style: str = None) -> tuple:
+    # Przy stylu "Ekonomiczny" odrzucamy miasta bardzo drogie (cost_tier: "high")
+    return ('high',) if budget_style == "Ekonomiczny" else ()
+
+
+def _query_seed(selected_tags: list, budget_style: str = None) -> int:
+    """Ziarno rozstrzygania remisów - to samo zapytanie zawsze daje ten sam wynik."""
+    key = "|".join(sorted(set(selected_tags))) + f"#{budget_style or ''}"
+    return zlib.crc32(key.encode('utf-8'))
+
+
+def _budget_fit(cost_multipliers: np.ndarray, budget_style: str = None) -> np.ndarray:
+    """
+    Dopasowanie do budżetu w skali 0-1. Dzienny koszt w mieście to BASE_COSTS[styl] * cost_multiplier
+    (jak w kosztorysie planu); miasta nie droższe niż typowe (REFERENCE_COST_MULTIPLIER) dostają 1.
+    Droższe tracą tym szybciej, im tańszy styl: wykładnik to stosunek stawki "Standardowy" do stawki stylu.
+    """
+    base_rate = BASE_COSTS.get(budget_style, BASE_COSTS["Standardowy"])
+    daily_cost = base_rate * cost_multipliers
+    daily_budget = base_rate * REFERENCE_COST_MULTIPLIER
+    elasticity = BASE_COSTS["Standardowy"] / base_rate
+    return np.minimum(1.0, daily_budget / daily_cost) ** elasticity
+
+
+def score_cities(selected_tags: list, catalog: DestinationCatalog, budget_style: str = None, month: int = None) -> tuple:
+    """
+    Ocenia miasta z przynajmniej jednym z wybranych tagów. Z podanym miesiącem (1-12) i normami
+    klimatycznymi w katalogu odrzuca miasta z nieodpowiednią pogodą i uwzględnia klimat w ocenie.
+
+    Returns:
+        tuple: (indeksy wpisów katalogu rosnąco, klucze int64). Klucz to zaokrąglony wynik
+               w starszych bitach i skrót (nazwa miasta, ziarno zapytania) w młodszych -
+               porównanie kluczy rozstrzyga też remisy, zawsze tak samo dla tego samego zapytania.
+    """
+    indices = np.flatnonzero(catalog.mask(selected_tags, _excluded_cost_tiers(budget_style)))
+    if not len(indices):
+        return indices, np.empty(0, dtype=np.int64)
+
+    suitability = None
+    if month and catalog.climate is not None:
+        suitability = climate_suitability(catalog.climate.monthly(indices, month), selected_tags)
+        keep = ~(suitability < CLIMATE_MIN_SUITABILITY)  # NaN (brak norm) zostaje
+        indices = indices[keep]
+        suitability = np.nan_to_num(suitability[keep], nan=CLIMATE_UNKNOWN_SUITABILITY)
+        if not len(indices):
+            return indices, np.empty(0, dtype=np.int64)
+
+    coverage = catalog.tag_overlap(selected_tags, indices) / len(set(selected_tags))
+    fit = _budget_fit(catalog.cost_multipliers[indices], budget_style)
+    scores = TAG_WEIGHT * coverage + BUDGET_WEIGHT * fit
+    if suitability is not None:
+        scores = (1.0 - CLIMATE_WEIGHT) * scores + CLIMATE_WEIGHT * suitability
+    scores = np.rint(scores * SCORE_SCALE).astype(np.int64)
+
+    ties = catalog.name_hashes[indices] ^ np.uint32(_query_seed(selected_tags, budget_style))
+    return indices, (scores << 32) | ties.astype(np.int64)
+
+
+def _pick_diverse(catalog: DestinationCatalog, indices: np.ndarray, keys: np.ndarray, k: int) -> list[int]:
+    """
+    Wybiera k miast z jednego kraju: najlepsze wg klucza, ale każde kolejne miasto o takim samym
+    zestawie tagów co już wybrane traci DIVERSITY_PENALTY.
+    """
+    # Kara nie podnosi wyniku, więc wystarczy rozważyć kilka razy więcej kandydatów niż k
+    pool = heapq.nlargest(k * 4, range(len(indices)), key=keys.__getitem__)
+    penalty = int(DIVERSITY_PENALTY * SCORE_SCALE) << 32
+
+    chosen, profiles = [], {}
+    while pool and len(chosen) < k:
+        def adjusted(pos):
+            return int(keys[pos]) - penalty * profiles.get(catalog.tag_bits[indices[pos]].tobytes(), 0)
+
+        best = max(pool, key=adjusted)
+        pool.remove(best)
+        profile = catalog.tag_bits[indices[best]].tobytes()
+        profiles[profile] = profiles.get(profile, 0) + 1
+        chosen.append(int(indices[best]))
+    return chosen
+
+
+def recommend_city(selected_tags: list, catalog: DestinationCatalog, budget_style: str = None,
+                   start_date=None, end_date=None) -> dict | None:
     """
     Rekomenduje miasto na podstawie wybranych tagów i opcjonalnie stylu budżetowego.
 
     Args:
         selected_tags (list): Lista tagów wybranych przez użytkownika (np. ["city_break", "beach_sun"]).
-        cities_list (list): Lista słowników reprezentujących miasta (z pliku JSON).
+        catalog (DestinationCatalog): Katalog destynacji (app/catalog.py).
         budget_style (str, optional): Styl podróży ("Ekonomiczny", "Standardowy", "Komfortowy").
                                       Jeśli "Ekonomiczny", odrzuca miasta z cost_tier="high".
+        start_date, end_date (optional): Termin podróży - wybiera miesiąc do oceny klimatu.
 
     Returns:
-        dict | None: Wylosowany obiekt miasta spełniający kryteria lub None, jeśli brak pasujących miast.
+        dict | None: Najwyżej ocenione miasto (score_cities) lub None, jeśli brak pasujących miast.
     """
-    if not cities_list or not selected_tags:
+    if not catalog or not selected_tags:
         return None
 
-    # Krok 1: Filtrowanie po tagach
-    # Miasto musi mieć PRZYNAJMNIEJ JEDEN z wybranych tagów
-    filtered_cities = [
-        city for city in cities_list
-        if any(tag in city.get('tags', []) for tag in selected_tags)
-    ]
-
-    # Krok 2: Opcjonalne filtrowanie po budżecie
-    if budget_style == "Ekonomiczny":
-        # Odrzucamy miasta bardzo drogie (cost_tier: "high")
-        filtered_cities = [
-            city for city in filtered_cities
-            if city.get('cost_tier') != 'high'
-        ]
+    indices, keys = score_cities(selected_tags, catalog, budget_style, trip_month(start_date, end_date))
 
     # Jeśli po filtrowaniu lista jest pusta, zwracamy None
-    if not filtered_cities:
+    if not len(indices):
         return None
 
-    # Krok 3: Losowanie miasta
-    return random.choice(filtered_cities)
+    return catalog.entries[indices[np.argmax(keys)]]
 
-def get_grouped_recommendations(selected_tags: list, cities_list: list, budget_style: str = None) -> dict:
+def get_grouped_recommendations(selected_tags: list, catalog: DestinationCatalog, budget_style: str = None,
+                                start_date=None, end_date=None, max_countries: int = 4, max_cities: int = 4) -> dict:
     """
     Zwraca słownik pogrupowany krajami z listą miast spełniających kryteria.
     Struktura: { "Kraj": [miasto1, miasto2, ...], ... }
+    Kraje w kolejności najlepszego miasta, miasta od najwyżej ocenionych (score_cities).
     Maksymalnie 4 kraje, w każdym maksymalnie 4 miasta.
+
+    Z terminem podróży (i normami klimatycznymi w katalogu) ocena uwzględnia klimat w dominującym miesiącu.
+
+    Wynik jest deterministyczny, więc dla domyślnych limitów pochodzi z catalog.suggestions
+    (precompute_suggestions; dla miesiąca - z catalog.monthly_suggestions, gdy są już policzone) -
+    zwracany słownik jest współdzielony i nie wolno go modyfikować.
     """
-    if not cities_list or not selected_tags:
+    if not catalog or not selected_tags:
         return {}
 
-    # 1. Filtrowanie
-    filtered_cities = [
-        city for city in cities_list
-        if any(tag in city.get('tags', []) for tag in selected_tags)
-    ]
+    month = trip_month(start_date, end_date) if catalog.climate is not None else None
+    if (max_countries, max_cities) != (4, 4):
+        return _rank_grouped(selected_tags, catalog, budget_style, month, max_countries, max_cities)
 
-    if budget_style == "Ekonomiczny":
-        filtered_cities = [c for c in filtered_cities if c.get('cost_tier') != 'high']
+    suggestions = catalog.suggestions if month is None else catalog.monthly_suggestions.get(month, {})
+    cached = suggestions.get((frozenset(selected_tags), budget_style, month))
+    if cached is None:
+        # Tagi spoza katalogu, styl spoza BASE_COSTS, za dużo tagów na gotowe zestawy
+        # albo sugestie miesiąca jeszcze liczone w tle - liczymy od razu, bez czekania
+        return _rank_grouped(selected_tags, catalog, budget_style, month)
+    return cached
 
-    if not filtered_cities:
-        return {}
 
-    # 2. Grupowanie po kraju
-    grouped = defaultdict(list)
-    for city in filtered_cities:
-        country = city.get('country', 'Inne')
-        grouped[country].append(city)
+def _rank_grouped(selected_tags: list, catalog: DestinationCatalog, budget_style: str = None, month: int = None,
+                  max_countries: int = 4, max_cities: int = 4) -> dict:
+    # 1. Ocena wszystkich pasujących miast - operacje na tablicach katalogu
+    indices, keys = score_cities(selected_tags, catalog, budget_style, month)
+
+    if not len(indices):
+        return {}
 
-    # 3. Wybór krajów (max 4)
-    all_countries = list(grouped.keys())
-    random.shuffle(all_countries)
-    selected_countries = all_countries[:4]
+    # 2. Wybór krajów (max 4) wg najlepszego miasta - częściowa selekcja zamiast sortowania wszystkich
+    starts = catalog.country_runs(indices)
+    ends = np.r_[starts[1:], len(indices)]
+    best = np.maximum.reduceat(keys, starts)
+    top_runs = heapq.nlargest(max_countries, range(len(starts)), key=best.__getitem__)
 
-    # 4. Wybór miast w krajach (max 4)
+    # 3. Wybór miast w krajach (max 4), z karą za powtarzający się zestaw tagów
     result = {}
-    for country in selected_countries:
-        cities_in_country = grouped[country]
-        # Preferujmy różnorodność, więc shuffle
-        random.shuffle(cities_in_country)
-        result[country] = cities_in_country[:4]
+    for run in top_runs:
+        s, e = starts[run], ends[run]
+        country = catalog.countries[catalog.country_codes[indices[s]]]
+        result[country] = [catalog.entries[i] for i in _pick_diverse(catalog, indices[s:e], keys[s:e], max_cities)]
 
     return result
+
+
+def precompute_suggestions(catalog: DestinationCatalog, month: int = None) -> dict:
+    """
+    Sugestie dla każdej niepustej kombinacji tagów katalogu i każdego stylu z BASE_COSTS
+    (6 tagów -> 63 x 3 zestawy), klucz: (frozenset(tagi), styl, miesiąc).
+    Strona sugestii robi wtedy tylko odczyt ze słownika, niezależnie od rozmiaru katalogu.
+    Bez miesiąca liczy get_catalog przy budowie katalogu, dla miesięcy - precompute_monthly_suggestions.
+    """
+    tags = sorted(catalog.tag_bit)
+    if len(tags) > MAX_PRECOMPUTED_TAGS:
+        return {}
+
+    suggestions = {}
+    for size in range(1, len(tags) + 1):
+        for combo in itertools.combinations(tags, size):
+            for style in BASE_COSTS:
+                suggestions[(frozenset(combo), style, month)] = _rank_grouped(list(combo), catalog, style, month)
+    return suggestions
+
+
+def precompute_monthly_suggestions(catalog: DestinationCatalog) -> None:
+    """
+    Sugestie dla każdego miesiąca (12 x precompute_suggestions) - get_catalog zleca to w tle po
+    wczytaniu katalogu z normami klimatycznymi. Słownik miesiąca wstawiamy do catalog.monthly_suggestions
+    dopiero w całości, więc żądania czytają go bez blokady; do tego czasu liczą wynik same (_rank_grouped).
+    """
+    for month in range(1, 13):
+        catalog.monthly_suggestions[month] = precompute_suggestions(catalog, month)
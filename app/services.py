@@ -1,13 +1,56 @@
 # app/services.py
+import asyncio
+import math
+from collections import Counter
 from datetime import date, timedelta, datetime
-from .api_clients import get_weather, get_attractions, get_exchange_rate, get_coordinates_for_city
+from flask import current_app
+from .api_clients import get_weather, get_weather_bulk, get_attractions
 from .constans import BASE_COSTS, WEATHERCODE_TO_KEY, ICON_TO_EMOJI
+from .executor import submit_with_app_context
+from .forecast import DailySeries
+from .geocoder import local_geocode
+from .spatial import get_city_index, get_attractions_index
+from .itinerary import build_itinerary
 
 # ZMIANA: Dodano parametr 'country' do definicji funkcji
 def get_plan_details(city: str, days: int, style: str, country: str = None, start_date=None, end_date=None, lat: float = None, lon: float = None, cost_mult: float = 1.2) -> dict:
     """
     Główna funkcja serwisu, obsługująca dynamiczne miasta.
     """
+    city, days, start_date, end_date = _normalize_plan_query(city, days, start_date, end_date)
+
+    # Pogoda i atrakcje są od siebie niezależne - pobieramy je równolegle,
+    # więc czas odpowiedzi to najwolniejsze z zapytań, a nie ich suma.
+    # Pogodę pobiera wątek żądania, więc plan zajmuje w puli tylko jedno miejsce.
+    attractions_future = submit_with_app_context(get_attractions, city, country=country, limit=12)
+    weather_info = get_weather(city, start_date=start_date, end_date=end_date, lat=lat, lon=lon, country=country)
+    # Atrakcje (SSR) - wynik zapytania uruchomionego równolegle z pogodą
+    attractions_list = attractions_future.result() or []
+
+    return _build_plan(city, days, style, country, start_date, end_date, lat, lon, cost_mult, weather_info, attractions_list)
+
+
+async def get_plan_details_async(city: str, days: int, style: str, country: str = None, start_date=None, end_date=None, lat: float = None, lon: float = None, cost_mult: float = 1.2) -> dict:
+    """
+    Asynchroniczna wersja get_plan_details (dla widoków `async def`).
+    Pogoda i atrakcje pobierane są współbieżnie na pętli workera, przez wspólną pulę połączeń httpx.
+    """
+    from .async_api_clients import run_on_upstream_loop, get_weather_async, get_attractions_async
+
+    city, days, start_date, end_date = _normalize_plan_query(city, days, start_date, end_date)
+
+    async def _fetch(http):
+        return await asyncio.gather(
+            get_weather_async(http, city, start_date=start_date, end_date=end_date, lat=lat, lon=lon, country=country),
+            get_attractions_async(http, city, country=country, limit=12),
+        )
+
+    weather_info, attractions_list = await run_on_upstream_loop(_fetch)
+
+    return _build_plan(city, days, style, country, start_date, end_date, lat, lon, cost_mult, weather_info, attractions_list or [])
+
+
+def _normalize_plan_query(city: str, days, start_date, end_date) -> tuple:
     # Normalizuj nazwę miasta
     if isinstance(city, str):
         city = city.strip()
@@ -22,13 +65,16 @@ def get_plan_details(city: str, days: int, style: str, country: str = None, star
     
     # Upewnij się, że days jest intem
     days = int(days)
+    return city, days, start_date, end_date
 
-    # Pobierz pogodę
-    weather_info = get_weather(city, start_date=start_date, end_date=end_date, lat=lat, lon=lon)
 
+def _add_weather_icons(weather_info: dict | None) -> None:
     # Przetwarzanie pogody (ikony)
     if weather_info and isinstance(weather_info, dict):
         daily = weather_info.get('daily')
+        if isinstance(daily, DailySeries):
+            # Słowniki dni dla szablonu (i zapisu planu) powstają dopiero tutaj
+            daily = weather_info['daily'] = daily.to_dicts()
         if isinstance(daily, list):
             for d in daily:
                 # Przypisz icon_key
@@ -47,10 +93,10 @@ def get_plan_details(city: str, days: int, style: str, country: str = None, star
                 first = daily[0]
                 if 'icon_key' in first:
                     weather_info['icon_key'] = first.get('icon_key')
-    
-    # Pobierz atrakcje (SSR) - TERAZ PRZEKAZUJEMY KRAJ
-    # ZMIANA: Przekazujemy country do get_attractions
-    attractions_list = get_attractions(city, country=country, limit=12) or []
+
+
+def _build_plan(city, days, style, country, start_date, end_date, lat, lon, cost_mult, weather_info, attractions_list) -> dict:
+    _add_weather_icons(weather_info)
 
     # Obliczanie kosztów
     base_rate = BASE_COSTS.get(style, 500) # Domyślnie Standardowy
@@ -70,11 +116,122 @@ def get_plan_details(city: str, days: int, style: str, country: str = None, star
         "cost": cost_info,
         "weather": weather_info or {"opis": "Brak danych pogodowych"},
         "attractions": attractions_list,
-        "nearby_places": [], 
+        "nearby_places": find_nearby_places(city, country, lat, lon, attractions_list),
+        # Atrakcje rozłożone na dni (indeksy w "attractions"), trasa od centrum miasta
+        "itinerary": build_itinerary(attractions_list, days, _plan_center(city, country, lat, lon), start_date),
     }
 
     # Dodaj współrzędne centrum (jeśli dostępne)
     if lat is not None and lon is not None:
         result['center'] = {'lat': lat, 'lon': lon}
 
-    return result
\ No newline at end of file
+    return result
+
+
+def _plan_center(city: str, country: str = None, lat: float = None, lon: float = None) -> dict | None:
+    """Współrzędne centrum planu: z parametrów albo z lokalnego geokodera (bez zapytań do API)."""
+    if lat is None or lon is None:
+        return local_geocode(city, country)
+    try:
+        return {"lat": float(lat), "lon": float(lon)}
+    except (TypeError, ValueError):
+        return None
+
+
+def find_nearby_places(city: str, country: str = None, lat: float = None, lon: float = None, attractions_list: list = None) -> list[dict]:
+    """
+    Miasta z katalogu i atrakcje z cache (innych zapytań) w pobliżu centrum planu - z indeksu
+    przestrzennego (app/spatial.py), bez zapytań do API. Bez współrzędnych centrum zwraca [].
+    """
+    center = _plan_center(city, country, lat, lon)
+    if not center:
+        return []
+    lat, lon = center["lat"], center["lon"]
+
+    config = current_app.config
+    limit = config.get("NEARBY_PLACES_LIMIT", 6)
+    nearby = []
+
+    city_key = (city or "").casefold()
+    for place, distance in get_city_index().nearest(lat, lon, limit + 1, max_km=config.get("NEARBY_CITIES_RADIUS_KM", 150)):
+        if place["name"].casefold() == city_key:
+            continue
+        nearby.append({
+            "type": "city",
+            "name": place["name"],
+            "country": place.get("country"),
+            "lat": place["lat"],
+            "lon": place["lon"],
+            "distance_km": round(distance, 1),
+        })
+    nearby = nearby[:limit]
+
+    # Atrakcje już pokazane w planie pomijamy
+    shown = {a.get("name") for a in attractions_list or []}
+    radius = config.get("NEARBY_ATTRACTIONS_RADIUS_KM", 20)
+    added = 0
+    for place, distance in get_attractions_index().within(lat, lon, radius, limit=limit + len(shown)):
+        if place.get("name") in shown or added >= limit:
+            continue
+        nearby.append({
+            "type": "attraction",
+            "name": place.get("name"),
+            "address": place.get("address"),
+            "rating": place.get("rating"),
+            "lat": place["lat"],
+            "lon": place["lon"],
+            "distance_km": round(distance, 1),
+        })
+        added += 1
+
+    return nearby
+
+
+def get_suggestions_weather(grouped_suggestions: dict, start_date=None, end_date=None) -> dict:
+    """
+    Skrót pogody dla miast ze strony sugestii: {"Kraj|Miasto": {"icon_emoji", "opis", "temp_min", "temp_max"}}.
+
+    Współrzędne bierzemy z lokalnego geokodera (bez zapytań do API), a pogodę dla wszystkich
+    miast pobieramy jednym zbiorczym zapytaniem (get_weather_bulk). Miasta bez współrzędnych pomijamy.
+    """
+    keys, locations = [], []
+    for country, cities in grouped_suggestions.items():
+        for city in cities:
+            coords = local_geocode(city.get('name'), country)
+            if coords:
+                keys.append(f"{country}|{city.get('name')}")
+                locations.append(coords)
+    if not locations:
+        return {}
+
+    summaries = {}
+    for key, weather_info in zip(keys, get_weather_bulk(locations, start_date=start_date, end_date=end_date)):
+        if weather_info:
+            summaries[key] = _summarize_weather(weather_info)
+    return summaries
+
+
+def _summarize_weather(weather_info: dict) -> dict:
+    daily = weather_info.get('daily')
+    if not daily:
+        # Tylko bieżąca pogoda (np. daty poza zakresem prognozy)
+        temp = weather_info.get('temperatura')
+        return {
+            "icon_emoji": '🌤️',
+            "opis": weather_info.get('opis'),
+            "temp_min": temp,
+            "temp_max": temp,
+        }
+
+    # Najczęstsza pogoda w okresie podróży i skrajne temperatury - wprost z kolumn serii, bez słowników dni
+    icon_keys = [WEATHERCODE_TO_KEY.get(code, 'unknown') for code in daily.codes]
+    icon_key, _ = Counter(icon_keys).most_common(1)[0]
+    representative = daily.day_dict(icon_keys.index(icon_key))
+    temps_min = [v for v in daily.temp_min if math.isfinite(v)]
+    temps_max = [v for v in daily.temp_max if math.isfinite(v)]
+    return {
+        "icon_emoji": ICON_TO_EMOJI.get(icon_key, '🌤️'),
+        "opis": representative.get('opis'),
+        "temp_min": round(min(temps_min)) if temps_min else None,
+        "temp_max": round(max(temps_max)) if temps_max else None,
+    }
@@ -0,0 +1,152 @@
+# app/singleflight.py
+"""
+Łączenie identycznych, równoczesnych zapytań do zewnętrznych API ("single-flight").
+
+Gdy wiele żądań naraz potrzebuje tych samych danych (np. pogody dla popularnego miasta),
+tylko jedno z nich (lider) wykonuje zapytanie, a pozostałe czekają na jego wynik.
+W obrębie procesu służy do tego słownik trwających wywołań; między workerami gunicorna -
+blokada pliku (fcntl.flock). AsyncSingleFlight robi to samo dla korutyn jednej pętli zdarzeń
+(app/async_api_clients.py). Funkcja wywoływana przez lidera powinna najpierw ponownie
+sprawdzić cache, bo w innym workerze wynik mógł właśnie zostać zapisany.
+
+Wynik jest współdzielony między czekających - wywołujący nie mogą go modyfikować.
+"""
+import asyncio
+import hashlib
+import os
+import threading
+import time
+from contextlib import contextmanager
+from flask import current_app
+
+try:
+    import fcntl
+except ImportError:  # Windows - tylko łączenie w obrębie procesu
+    fcntl = None
+
+# Liczba plików blokad; różne klucze mogą czasem trafić na ten sam plik
+LOCK_STRIPES = 1024
+
+
+class _Call:
+    __slots__ = ("event", "result", "error")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: str, fn, *args, **kwargs):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            with _cross_worker_lock(key):
+                call.result = fn(*args, **kwargs)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.event.set()
+
+
+_group = SingleFlight()
+
+
+class AsyncSingleFlight:
+    """Odpowiednik SingleFlight dla korutyn - czekający nie blokują pętli zdarzeń. Związany z jedną pętlą."""
+
+    def __init__(self):
+        self._calls = {}
+
+    async def do(self, key: str, fn, *args, **kwargs):
+        call = self._calls.get(key)
+        if call is not None:
+            # shield - anulowanie czekającego nie przerywa lidera
+            return await asyncio.shield(call)
+
+        call = asyncio.get_running_loop().create_future()
+        # Błąd lidera bez czekających też uznajemy za odebrany (bez ostrzeżenia asyncio)
+        call.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._calls[key] = call
+        try:
+            # Blokada pliku czeka w wątku (time.sleep), więc nie wstrzymuje pętli
+            lock = _cross_worker_lock(key)
+            await asyncio.to_thread(lock.__enter__)
+            try:
+                result = await fn(*args, **kwargs)
+            finally:
+                await asyncio.to_thread(lock.__exit__, None, None, None)
+            call.set_result(result)
+            return result
+        except asyncio.CancelledError:
+            call.cancel()
+            raise
+        except BaseException as e:
+            call.set_exception(e)
+            raise
+        finally:
+            self._calls.pop(key, None)
+
+
+def single_flight(namespace: str, key: str, fn, *args, **kwargs):
+    """Wykonuje fn(*args, **kwargs) raz dla wszystkich równoczesnych wywołań z tym samym (namespace, key)."""
+    return _group.do(f"{namespace}:{key}", fn, *args, **kwargs)
+
+
+@contextmanager
+def _cross_worker_lock(key: str):
+    config = current_app.config
+    if fcntl is None or not config.get("SINGLEFLIGHT_CROSS_WORKER", True):
+        yield
+        return
+
+    stripe = int(hashlib.sha1(key.encode("utf-8")).hexdigest(), 16) % LOCK_STRIPES
+    lock_dir = os.path.join(current_app.instance_path, "locks")
+    try:
+        os.makedirs(lock_dir, exist_ok=True)
+        fd = os.open(os.path.join(lock_dir, f"{stripe:04d}.lock"), os.O_CREAT | os.O_RDWR, 0o644)
+    except OSError as e:
+        current_app.logger.warning(f"Single-flight: brak blokady między workerami ({e})")
+        yield
+        return
+
+    try:
+        # Nie czekamy w nieskończoność - po SINGLEFLIGHT_WAIT_SECONDS idziemy dalej bez blokady
+        deadline = time.monotonic() + config.get("SINGLEFLIGHT_WAIT_SECONDS", 25)
+        locked = False
+        while True:
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                locked = True
+                break
+            except BlockingIOError:
+                if time.monotonic() >= deadline:
+                    break
+                time.sleep(0.05)
+        try:
+            yield
+        finally:
+            if locked:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+    finally:
+        os.close(fd)
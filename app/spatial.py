@@ -0,0 +1,154 @@
+# app/spatial.py
+"""
+Indeks przestrzenny punktów (lat/lon) - miasta katalogu i atrakcje z cache Google Places.
+
+Punkty dzielimy na komórki siatki CELL_DEG x CELL_DEG stopni i sortujemy po numerze komórki,
+więc zapytanie "w promieniu R km" przegląda tylko kilka ciągłych zakresów tablic, a dokładną
+odległość liczy wektorowo (haversine w NumPy). k najbliższych: promień rośnie dwukrotnie,
+aż znajdzie się k punktów. Dzięki temu nearby_places w planie nie wymaga zapytań do API.
+"""
+import math
+import threading
+import time
+import numpy as np
+from flask import current_app
+
+EARTH_RADIUS_KM = 6371.0088
+# Bok komórki siatki w stopniach (~111 km na równoleżniku 0)
+CELL_DEG = 1.0
+# Połowa obwodu Ziemi - większy promień obejmuje wszystkie punkty
+MAX_DISTANCE_KM = math.pi * EARTH_RADIUS_KM
+
+
+def haversine_km(lat: float, lon: float, lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+    """Odległości (km) od punktu (lat, lon) do tablic współrzędnych, w stopniach."""
+    lat1, lon1 = np.radians(lat), np.radians(lon)
+    lat2, lon2 = np.radians(lats), np.radians(lons)
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+class SpatialIndex:
+    """Siatka nad listą słowników z kluczami lat/lon (punkty bez współrzędnych są pomijane)."""
+
+    def __init__(self, points: list[dict]):
+        points = [p for p in points if p.get("lat") is not None and p.get("lon") is not None]
+        lats = np.array([float(p["lat"]) for p in points], dtype=np.float64)
+        lons = np.array([float(p["lon"]) for p in points], dtype=np.float64)
+
+        self._lon_cells = int(round(360 / CELL_DEG))
+        order = np.argsort(self._cell_ids(lats, lons), kind="stable")
+        self.points = [points[i] for i in order]
+        self.lats, self.lons = lats[order], lons[order]
+        cells = self._cell_ids(self.lats, self.lons)
+        # Zakres [start, end) każdej niepustej komórki
+        self._cells, self._starts = np.unique(cells, return_index=True)
+        self._ends = np.r_[self._starts[1:], len(cells)].astype(np.int64)
+
+    def __len__(self):
+        return len(self.points)
+
+    def _cell_ids(self, lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+        row = np.floor((np.clip(lats, -90.0, 89.999999) + 90.0) / CELL_DEG).astype(np.int64)
+        col = np.floor((np.mod(lons + 180.0, 360.0)) / CELL_DEG).astype(np.int64) % self._lon_cells
+        return row * self._lon_cells + col
+
+    def _candidates(self, lat: float, lon: float, radius_km: float) -> np.ndarray:
+        """Indeksy punktów z komórek pokrywających prostokąt wokół okręgu o promieniu radius_km."""
+        if radius_km >= MAX_DISTANCE_KM / 2:
+            return np.arange(len(self.points))
+
+        dlat = math.degrees(radius_km / EARTH_RADIUS_KM)
+        lat_min, lat_max = max(-90.0, lat - dlat), min(90.0, lat + dlat)
+        # Szerokość komórki w km maleje z szerokością geograficzną - liczymy dla bardziej "biegunowej" krawędzi
+        cos_edge = math.cos(math.radians(max(abs(lat_min), abs(lat_max))))
+        rows = range(int((lat_min + 90.0) // CELL_DEG), min(int((lat_max + 90.0) // CELL_DEG), int(180 / CELL_DEG) - 1) + 1)
+        if cos_edge < 1e-6 or radius_km / (EARTH_RADIUS_KM * cos_edge) >= math.pi:
+            cols = range(self._lon_cells)
+        else:
+            dlon = math.degrees(radius_km / (EARTH_RADIUS_KM * cos_edge))
+            first = int(((lon - dlon + 180.0) % 360.0) // CELL_DEG)
+            count = min(self._lon_cells, int(math.ceil(2 * dlon / CELL_DEG)) + 2)
+            # Przez antypołudnik numery kolumn "zawijają się"
+            cols = [(first + i) % self._lon_cells for i in range(count)]
+
+        wanted = np.array([r * self._lon_cells + c for r in rows for c in cols], dtype=np.int64)
+        pos = np.searchsorted(self._cells, wanted)
+        in_range = pos < len(self._cells)
+        pos, wanted = pos[in_range], wanted[in_range]
+        # searchsorted dla pustej komórki wskazuje następną - zostawiamy tylko dokładne trafienia
+        pos = pos[self._cells[pos] == wanted]
+        if not len(pos):
+            return np.empty(0, dtype=np.int64)
+        return np.concatenate([np.arange(self._starts[p], self._ends[p]) for p in pos])
+
+    def within(self, lat: float, lon: float, radius_km: float, limit: int = None) -> list[tuple]:
+        """[(punkt, odległość_km)] w promieniu radius_km, od najbliższego."""
+        ids = self._candidates(lat, lon, radius_km)
+        if not len(ids):
+            return []
+        dist = haversine_km(lat, lon, self.lats[ids], self.lons[ids])
+        inside = dist <= radius_km
+        ids, dist = ids[inside], dist[inside]
+        order = np.argsort(dist, kind="stable")
+        if limit is not None:
+            order = order[:limit]
+        return [(self.points[ids[i]], float(dist[i])) for i in order]
+
+    def nearest(self, lat: float, lon: float, k: int, max_km: float = MAX_DISTANCE_KM) -> list[tuple]:
+        """k najbliższych punktów [(punkt, odległość_km)], nie dalej niż max_km."""
+        if not len(self.points) or k <= 0:
+            return []
+        radius = min(max_km, CELL_DEG * 111.0)
+        while True:
+            found = self.within(lat, lon, radius, limit=k)
+            # Wszystkie punkty bliższe niż `radius` są w wyniku, więc k znalezionych to k najbliższych
+            if len(found) >= k or radius >= max_km:
+                return found
+            radius = min(max_km, radius * 2)
+
+
+_city_index = None
+_city_index_source = None
+_attractions_index = None
+_attractions_built_at = 0.0
+_index_lock = threading.Lock()
+
+
+def get_city_index() -> SpatialIndex:
+    """Indeks miast katalogu ze współrzędnymi - przebudowywany razem z lokalnym geokoderem."""
+    global _city_index, _city_index_source
+    from .geocoder import get_local_geocoder
+
+    geocoder = get_local_geocoder()
+    if _city_index is not None and _city_index_source is geocoder:
+        return _city_index
+    with _index_lock:
+        if _city_index is None or _city_index_source is not geocoder:
+            _city_index = SpatialIndex(geocoder.places)
+            _city_index_source = geocoder
+        return _city_index
+
+
+def get_attractions_index() -> SpatialIndex:
+    """Indeks atrakcji z cache Google Places (wszystkie miasta), odświeżany co NEARBY_ATTRACTIONS_REFRESH_SECONDS."""
+    global _attractions_index, _attractions_built_at
+    from .cache import attractions_cache_payloads
+
+    max_age = current_app.config.get("NEARBY_ATTRACTIONS_REFRESH_SECONDS", 300)
+    if _attractions_index is not None and time.monotonic() - _attractions_built_at < max_age:
+        return _attractions_index
+    with _index_lock:
+        if _attractions_index is None or time.monotonic() - _attractions_built_at >= max_age:
+            # To samo miejsce może być w wynikach kilku zapytań - zostawiamy pierwsze wystąpienie
+            seen, points = set(), []
+            for payload in attractions_cache_payloads():
+                for place in payload or []:
+                    key = (place.get("name"), place.get("lat"), place.get("lon"))
+                    if key not in seen:
+                        seen.add(key)
+                        points.append(place)
+            _attractions_index = SpatialIndex(points)
+            _attractions_built_at = time.monotonic()
+            current_app.logger.info(f"Indeks przestrzenny atrakcji: {len(_attractions_index)} miejsc.")
+        return _attractions_index
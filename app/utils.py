@@ -1,39 +1,65 @@
-from thefuzz import process, fuzz
+import re
+import unicodedata
 
-def normalize_city_name(user_input: str, cities_list: list, threshold: int = 75) -> dict | None:
+# Litery, których NFKD nie rozkłada na literę bazową + znak diakrytyczny
+_EXTRA_ASCII = str.maketrans({
+    "ł": "l", "Ł": "L", "ø": "o", "Ø": "O", "đ": "d", "Đ": "D",
+    "ß": "ss", "æ": "ae", "Æ": "AE", "œ": "oe", "Œ": "OE", "ı": "i",
+})
+
+
+def normalize_to_ascii(s: str) -> str:
+    """Prosta transliteracja do ASCII: Łódź -> Lodz"""
+    if not s:
+        return s
+    nk = unicodedata.normalize("NFKD", s.translate(_EXTRA_ASCII))
+    return "".join(c for c in nk if not unicodedata.combining(c))
+
+
+def fold_text(s: str) -> str:
+    """
+    Klucz do porównywania nazw: ASCII, małe litery, interpunkcja zamieniona na spacje.
+    Np. "Mazar-i Szarif" -> "mazar i szarif", "Łódź" -> "lodz".
+    """
+    if not s:
+        return ""
+    return re.sub(r"[\W_]+", " ", normalize_to_ascii(s).casefold()).strip()
+
+
+def trigrams(key: str) -> set:
+    """Trigramy klucza z fold_text (z dopełnieniem spacjami, żeby początek słowa miał większą wagę)."""
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def normalize_city_name(user_input: str, catalog, threshold: int = 75) -> dict | None:
     """
     Normalizuje nazwę miasta wpisaną przez użytkownika, znajdując najlepsze dopasowanie
-    w liście miast z pliku JSON.
+    w katalogu destynacji.
 
     Args:
         user_input (str): Tekst wpisany przez użytkownika (np. "krakow", "warsaw").
-        cities_list (list): Lista słowników reprezentujących miasta (np. z pliku JSON).
-                            Oczekuje, że każdy słownik ma klucz 'city'.
+        catalog (DestinationCatalog): Katalog destynacji (app/catalog.py).
         threshold (int): Minimalny próg dopasowania (0-100). Domyślnie 75.
 
     Returns:
-        dict | None: Pełny obiekt miasta z listy, jeśli znaleziono dopasowanie powyżej progu.
+        dict | None: Pełny obiekt miasta z katalogu, jeśli znaleziono dopasowanie powyżej progu.
                      W przeciwnym razie None.
     """
-    if not user_input or not cities_list:
+    if not user_input or not catalog:
         return None
 
-    # Tworzymy mapę {nazwa_miasta: obiekt_miasta} dla łatwego dostępu po znalezieniu nazwy
-    # Zakładamy, że w JSON klucz z nazwą miasta to 'city' (zgodnie z typową strukturą)
-    # Jeśli klucz jest inny (np. 'name'), trzeba to dostosować.
-    cities_map = {city_obj.get('city'): city_obj for city_obj in cities_list if city_obj.get('city')}
-    
-    # Lista samych nazw miast do przeszukania
-    city_names = list(cities_map.keys())
-
-    # Używamy process.extractOne do znalezienia najlepszego dopasowania
-    # scorer=fuzz.token_sort_ratio jest dobry do ignorowania kolejności słów i wielkości liter
-    best_match = process.extractOne(user_input, city_names, scorer=fuzz.token_sort_ratio)
-
-    if best_match:
-        matched_name, score = best_match
-        
-        if score >= threshold:
-            return cities_map[matched_name]
-    
-    return None
+    # Dokładna nazwa (bez względu na wielkość liter i znaki diakrytyczne) - z indeksu nazw katalogu
+    name, _, country = user_input.partition(",")
+    exact = catalog.find_by_name(name, country.strip() or None)
+    if exact:
+        return exact[0]
+
+    # Dopasowanie rozmyte - indeks trigramów + RapidFuzz (app/matching.py)
+    if not country.strip():
+        matches = catalog.matcher.search(user_input, limit=1, score_cutoff=threshold)
+        return matches[0][0] if matches else None
+    # Z podanym krajem bierzemy tylko miasta z tego kraju (search stawia je na początku)
+    matches = catalog.matcher.search(user_input, limit=5, score_cutoff=threshold)
+    in_country = [entry for entry, _ in matches if fold_text(entry.get('country')) == fold_text(country)]
+    return in_country[0] if in_country else None
@@ -15,6 +15,95 @@ class BaseConfig:
     GEOAPIFY_API_KEY = os.environ.get('GEOAPIFY_API_KEY')
     GOOGLE_PLACES_API_KEY = os.environ.get('GOOGLE_PLACES_API_KEY')
 
+    # Pula połączeń HTTP do zewnętrznych API (app/http_client.py)
+    UPSTREAM_POOL_CONNECTIONS = int(os.environ.get('UPSTREAM_POOL_CONNECTIONS', 4))
+    UPSTREAM_POOL_MAXSIZE = int(os.environ.get('UPSTREAM_POOL_MAXSIZE', 20))
+    UPSTREAM_MAX_RETRIES = int(os.environ.get('UPSTREAM_MAX_RETRIES', 2))
+    UPSTREAM_BACKOFF_FACTOR = float(os.environ.get('UPSTREAM_BACKOFF_FACTOR', 0.3))
+    UPSTREAM_CONNECT_TIMEOUT = float(os.environ.get('UPSTREAM_CONNECT_TIMEOUT', 3.05))
+    # Timeouty odczytu (sekundy) dla poszczególnych upstreamów
+    UPSTREAM_TIMEOUTS = {
+        'open_meteo': float(os.environ.get('OPEN_METEO_TIMEOUT', 10)),
+        'geoapify': float(os.environ.get('GEOAPIFY_TIMEOUT', 8)),
+        'google_places': float(os.environ.get('GOOGLE_PLACES_TIMEOUT', 20)),
+    }
+    # Liczba wątków do równoległego pobierania danych planu (app/executor.py)
+    UPSTREAM_EXECUTOR_WORKERS = int(os.environ.get('UPSTREAM_EXECUTOR_WORKERS', 8))
+    # Osobna pula odświeżania cache w tle (stale-while-revalidate), żeby nie blokowała planów
+    BACKGROUND_EXECUTOR_WORKERS = int(os.environ.get('BACKGROUND_EXECUTOR_WORKERS', 2))
+
+    # Bezpieczniki zewnętrznych API (app/circuit_breaker.py): okno ostatnich wywołań, próg błędów, czas otwarcia
+    CIRCUIT_BREAKER_ENABLED = os.environ.get('CIRCUIT_BREAKER_ENABLED', 'true').lower() in ['true', 'on', '1']
+    CIRCUIT_WINDOW_SIZE = int(os.environ.get('CIRCUIT_WINDOW_SIZE', 20))
+    CIRCUIT_MIN_CALLS = int(os.environ.get('CIRCUIT_MIN_CALLS', 5))
+    CIRCUIT_ERROR_RATE = float(os.environ.get('CIRCUIT_ERROR_RATE', 0.5))
+    CIRCUIT_OPEN_SECONDS = float(os.environ.get('CIRCUIT_OPEN_SECONDS', 30))
+    # Adaptacyjny timeout odczytu: p95 * mnożnik, w granicach [minimum, UPSTREAM_TIMEOUTS]
+    UPSTREAM_ADAPTIVE_TIMEOUTS = os.environ.get('UPSTREAM_ADAPTIVE_TIMEOUTS', 'true').lower() in ['true', 'on', '1']
+    UPSTREAM_TIMEOUT_P95_MULTIPLIER = float(os.environ.get('UPSTREAM_TIMEOUT_P95_MULTIPLIER', 3.0))
+    UPSTREAM_MIN_READ_TIMEOUT = float(os.environ.get('UPSTREAM_MIN_READ_TIMEOUT', 2.0))
+
+    # Łączenie identycznych równoczesnych zapytań (app/singleflight.py)
+    SINGLEFLIGHT_CROSS_WORKER = os.environ.get('SINGLEFLIGHT_CROSS_WORKER', 'true').lower() in ['true', 'on', '1']
+    SINGLEFLIGHT_WAIT_SECONDS = float(os.environ.get('SINGLEFLIGHT_WAIT_SECONDS', 25))
+
+    # Asynchroniczny widok planu (httpx + asgiref) zamiast puli wątków; włączenie: ASYNC_PLAN_VIEW=true
+    # (czytane przy create_app). Pod serwerem WSGI (gunicorn sync/gthread) żądanie i tak zajmuje
+    # wątek workera do końca - zysk to tylko współbieżne zapytania do API w obrębie jednego planu.
+    # Więcej planów naraz na workera wymaga serwera ASGI (np. uvicorn z asgiref.wsgi.WsgiToAsgi).
+    ASYNC_PLAN_VIEW = os.environ.get('ASYNC_PLAN_VIEW', 'false').lower() in ['true', 'on', '1']
+
+    # Jak często (s) sprawdzać, czy destinations.json lub wersje danych w bazie się zmieniły (app/catalog.py, app/countries.py)
+    CATALOG_CHECK_SECONDS = float(os.environ.get('CATALOG_CHECK_SECONDS', 5))
+    # Po nieudanym (błąd bazy) lub pustym wczytaniu tabeli countries - ponowna próba po tylu sekundach
+    COUNTRIES_RETRY_SECONDS = float(os.environ.get('COUNTRIES_RETRY_SECONDS', 30))
+    # Gdy ani snapshot, ani destinations.json nie dają miast - ponowna próba po tylu sekundach (app/catalog.py)
+    CATALOG_RETRY_SECONDS = float(os.environ.get('CATALOG_RETRY_SECONDS', 30))
+    # Normy klimatyczne miast (scripts/build_climate_normals.py); domyślnie app/plans/climate_normals.npy
+    CLIMATE_NORMALS_PATH = os.environ.get('CLIMATE_NORMALS_PATH')
+    # Snapshot katalogu z importu (JSON Lines, scripts/seed_destinations.py); domyślnie app/plans/destinations.snapshot
+    CATALOG_SNAPSHOT_PATH = os.environ.get('CATALOG_SNAPSHOT_PATH')
+
+    # Miejsca w pobliżu w planie (app/spatial.py): promienie (km), limit na rodzaj, odświeżanie indeksu atrakcji
+    NEARBY_CITIES_RADIUS_KM = float(os.environ.get('NEARBY_CITIES_RADIUS_KM', 150))
+    NEARBY_ATTRACTIONS_RADIUS_KM = float(os.environ.get('NEARBY_ATTRACTIONS_RADIUS_KM', 20))
+    NEARBY_PLACES_LIMIT = int(os.environ.get('NEARBY_PLACES_LIMIT', 6))
+    NEARBY_ATTRACTIONS_REFRESH_SECONDS = int(os.environ.get('NEARBY_ATTRACTIONS_REFRESH_SECONDS', 300))
+    # Twardy limit czasu układania planu dnia po dniu (app/itinerary.py), ms
+    ITINERARY_TIME_BUDGET_MS = float(os.environ.get('ITINERARY_TIME_BUDGET_MS', 50))
+
+    # Cache geokodowania w bazie (app/cache.py), TTL w sekundach
+    GEOCODE_CACHE_TTL = int(os.environ.get('GEOCODE_CACHE_TTL', 90 * 24 * 3600))
+    GEOCODE_NEGATIVE_CACHE_TTL = int(os.environ.get('GEOCODE_NEGATIVE_CACHE_TTL', 600))
+    # Co ile sekund przebudować lokalny geokoder katalogu miast (app/geocoder.py)
+    LOCAL_GEOCODER_REFRESH_SECONDS = int(os.environ.get('LOCAL_GEOCODER_REFRESH_SECONDS', 600))
+    # Po błędzie bazy przy przebudowie geokodera - ponowna próba po tylu sekundach (do tego czasu poprzedni indeks)
+    LOCAL_GEOCODER_RETRY_SECONDS = int(os.environ.get('LOCAL_GEOCODER_RETRY_SECONDS', 30))
+
+    # Podpowiedzi miast (app/autocomplete.py): przebudowa indeksu i minimalna liczba
+    # lokalnych trafień, przy której nie pytamy zewnętrznego API
+    AUTOCOMPLETE_REFRESH_SECONDS = int(os.environ.get('AUTOCOMPLETE_REFRESH_SECONDS', 600))
+    AUTOCOMPLETE_MIN_LOCAL_HITS = int(os.environ.get('AUTOCOMPLETE_MIN_LOCAL_HITS', 3))
+
+    # Cache pogody per (komórka siatki, dzień). Open-Meteo odświeża prognozy co godzinę.
+    WEATHER_GRID_DEG = float(os.environ.get('WEATHER_GRID_DEG', 0.1))
+    WEATHER_CACHE_TTL = int(os.environ.get('WEATHER_CACHE_TTL', 3600))
+    WEATHER_CURRENT_CACHE_TTL = int(os.environ.get('WEATHER_CURRENT_CACHE_TTL', 900))
+
+    # Cache atrakcji Google Places (stale-while-revalidate)
+    ATTRACTIONS_CACHE_FRESH_TTL = int(os.environ.get('ATTRACTIONS_CACHE_FRESH_TTL', 24 * 3600))
+    ATTRACTIONS_CACHE_STALE_TTL = int(os.environ.get('ATTRACTIONS_CACHE_STALE_TTL', 14 * 24 * 3600))
+    ATTRACTIONS_ZERO_RESULTS_TTL = int(os.environ.get('ATTRACTIONS_ZERO_RESULTS_TTL', 3600))
+    # Wygasłe wpisy cache (geokodowanie, pogoda, atrakcje) usuwamy po tylu sekundach od wygaśnięcia (app/cache.py)
+    CACHE_PURGE_GRACE_SECONDS = int(os.environ.get('CACHE_PURGE_GRACE_SECONDS', 7 * 24 * 3600))
+    # Jak często (s) proces sprząta wygasłe wpisy przy zapisie do cache
+    CACHE_PURGE_INTERVAL_SECONDS = int(os.environ.get('CACHE_PURGE_INTERVAL_SECONDS', 3600))
+
+    # Liczba planów na stronie listy "Moje plany" (stronicowanie kluczem: created_at, id)
+    MY_PLANS_PAGE_SIZE = int(os.environ.get('MY_PLANS_PAGE_SIZE', 24))
+    # Maksymalna liczba wyników wyszukiwania w zapisanych planach (app/plan_search.py)
+    PLAN_SEARCH_LIMIT = int(os.environ.get('PLAN_SEARCH_LIMIT', 50))
+
     #Mail configuration
     MAIL_SERVER = os.environ.get('MAIL_SERVER', 'smtp.gmail.com')
     MAIL_PORT = int(os.environ.get('MAIL_PORT', 587))
@@ -33,6 +122,16 @@ class DevelopmentConfig(BaseConfig):
         'sqlite:///' + os.path.join(basedir,'app-dev.db')
 
 
+class TestingConfig(BaseConfig):
+    """Testing configuration (pytest, katalog tests/)."""
+    TESTING = True
+    WTF_CSRF_ENABLED = False
+    # Baza w pamięci - każdy test dostaje pustą bazę (tests/conftest.py)
+    SQLALCHEMY_DATABASE_URI = 'sqlite://'
+    # Blokady plików między workerami są w testach zbędne
+    SINGLEFLIGHT_CROSS_WORKER = False
+
+
 class ProductionConfig(BaseConfig):
     """Production configuration."""
     DEBUG = False
@@ -42,6 +141,7 @@ class ProductionConfig(BaseConfig):
 
 config = {
     'development': DevelopmentConfig,
+    'testing': TestingConfig,
     'production': ProductionConfig,
     'default': DevelopmentConfig
 }
\ No newline at end of file
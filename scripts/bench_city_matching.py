@@ -0,0 +1,86 @@
+import json
+import os
+import random
+import sys
+import time
+
+# Dodaj ścieżkę do katalogu nadrzędnego
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from thefuzz import process as thefuzz_process, fuzz as thefuzz_fuzz
+from app.matching import CityMatcher
+
+# Porównanie dopasowania nazw miast: dotychczasowe thefuzz.process.extractOne po całym
+# katalogu (mapa nazw budowana przy każdym wywołaniu, z poprawionym kluczem 'name')
+# z indeksem z app/matching.py (blocking po trigramach + RapidFuzz).
+# Nie wymaga bazy ani aplikacji.
+# Użycie: python scripts/bench_city_matching.py [liczba_zapytań] [powielenie_katalogu]
+
+CATALOG_PATH = os.path.join(os.path.dirname(__file__), '..', 'app', 'plans', 'destinations.json')
+
+
+def with_typo(name: str, rng: random.Random) -> str:
+    """Literówka: usunięta, zamieniona albo zdublowana litera, czasem małe litery bez polskich znaków."""
+    if len(name) < 4:
+        return name.lower()
+    i = rng.randrange(1, len(name) - 1)
+    kind = rng.choice(("drop", "swap", "double", "lower"))
+    if kind == "drop":
+        return name[:i] + name[i + 1:]
+    if kind == "swap":
+        return name[:i] + name[i + 1] + name[i] + name[i + 2:]
+    if kind == "double":
+        return name[:i] + name[i] + name[i:]
+    return name.lower()
+
+
+def legacy_match(user_input: str, cities_list: list, threshold: int = 75):
+    cities_map = {city_obj.get('name'): city_obj for city_obj in cities_list if city_obj.get('name')}
+    best_match = thefuzz_process.extractOne(user_input, list(cities_map.keys()), scorer=thefuzz_fuzz.token_sort_ratio)
+    if best_match and best_match[1] >= threshold:
+        return cities_map[best_match[0]]
+    return None
+
+
+def main(queries: int = 200, scale: int = 1):
+    with open(CATALOG_PATH, 'r', encoding='utf-8') as f:
+        base = json.load(f)
+    entries = base if scale == 1 else [dict(e, name=f"{e['name']} {k}" if k else e['name']) for k in range(scale) for e in base]
+
+    rng = random.Random(42)
+    targets = rng.sample(base, min(queries, len(base)))
+    typed = [with_typo(e['name'], rng) for e in targets]
+
+    started = time.perf_counter()
+    matcher = CityMatcher(entries)
+    build = time.perf_counter() - started
+
+    started = time.perf_counter()
+    legacy = [legacy_match(q, entries) for q in typed]
+    legacy_time = time.perf_counter() - started
+
+    started = time.perf_counter()
+    indexed = [matcher.search(q, limit=1, score_cutoff=75) for q in typed]
+    indexed_time = time.perf_counter() - started
+
+    legacy_hits = sum(1 for r, t in zip(legacy, targets) if r and r['name'] == t['name'])
+    indexed_hits = sum(1 for r, t in zip(indexed, targets) if r and r[0][0]['name'] == t['name'])
+
+    print(f"Katalog: {len(entries)} miast, zapytań: {len(typed)} (z literówkami)")
+    print(f"Budowa indeksu: {build * 1000:.0f} ms")
+    print(f"{'wariant':<28} {'na zapytanie':>14} {'trafne':>8}")
+    print(f"{'thefuzz extractOne':<28} {legacy_time / len(typed) * 1000:11.2f} ms {legacy_hits:8d}")
+    print(f"{'indeks + RapidFuzz':<28} {indexed_time / len(typed) * 1000:11.2f} ms {indexed_hits:8d}")
+    print(f"Przyspieszenie: {legacy_time / indexed_time:.0f}x")
+
+    sample = typed[0]
+    print(f"\nTop 5 dla '{sample}':")
+    for entry, score in matcher.search(sample, limit=5):
+        print(f"  {score:5.1f}  {entry['name']}, {entry['country']}")
+
+
+if __name__ == '__main__':
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 200,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 1,
+    )
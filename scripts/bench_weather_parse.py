@@ -0,0 +1,126 @@
+import json
+import os
+import sys
+import timeit
+import tracemalloc
+from datetime import date, datetime, timedelta
+
+# Dodaj ścieżkę do katalogu nadrzędnego
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.constans import WEATHER_CODES_PL
+from app.forecast import DailySeries, current_humidity
+
+# Porównanie dotychczasowego parsowania odpowiedzi Open-Meteo (seria godzinowa dla całego
+# zakresu dat, parsowanie każdego znacznika czasu, słownik per dzień w try/except)
+# z oszczędnym trybem z app/forecast.py. Mierzy czas (dekodowanie JSON + parsowanie)
+# i szczyt alokacji pamięci na jeden plan. Nie wymaga bazy ani sieci.
+# Użycie: python scripts/bench_weather_parse.py [liczba_dni] [powtórzenia]
+
+
+def build_response(days: int, lean: bool) -> str:
+    start = date.today()
+    day_list = [(start + timedelta(days=i)).isoformat() for i in range(days)]
+    data = {
+        "latitude": 50.06,
+        "longitude": 19.94,
+        "current_weather": {"temperature": 12.3, "windspeed": 8.1, "weathercode": 3, "time": f"{day_list[0]}T14:00"},
+        "daily": {
+            "time": day_list,
+            "temperature_2m_max": [15.2 + i % 5 for i in range(days)],
+            "temperature_2m_min": [4.1 + i % 3 for i in range(days)],
+            "precipitation_sum": [0.4 * (i % 4) for i in range(days)],
+            "weathercode": [(1, 3, 61, 80)[i % 4] for i in range(days)],
+            "windspeed_10m_max": [10.5 + i % 7 for i in range(days)],
+        },
+    }
+    if lean:
+        data["current"] = {"time": f"{day_list[0]}T14:00", "relative_humidity_2m": 71}
+    else:
+        hours = [f"{d}T{h:02d}:00" for d in day_list for h in range(24)]
+        data["hourly"] = {"time": hours, "relativehumidity_2m": [50 + i % 40 for i in range(len(hours))]}
+    return json.dumps(data)
+
+
+def legacy_parse(data: dict) -> tuple:
+    """Wierne odtworzenie parsowania sprzed wprowadzenia app/forecast.py."""
+    current = data["current_weather"]
+    humidity = None
+    hourly = data.get("hourly")
+    if hourly:
+        humidities = hourly.get("relativehumidity_2m", [])
+        cur_time = datetime.fromisoformat(current["time"])
+        parsed_times = [datetime.fromisoformat(t) for t in hourly.get("time", [])]
+        best_i, best_diff = None, None
+        for i, t in enumerate(parsed_times):
+            diff = abs((t - cur_time).total_seconds())
+            if best_diff is None or diff < best_diff:
+                best_i, best_diff = i, diff
+        if best_i is not None and best_i < len(humidities):
+            humidity = humidities[best_i]
+
+    daily = data["daily"]
+    columns = {
+        "temperatura_min": (daily.get("temperature_2m_min", []), lambda v: round(float(v))),
+        "temperatura_max": (daily.get("temperature_2m_max", []), lambda v: round(float(v))),
+        "opad_mm": (daily.get("precipitation_sum", []), lambda v: round(float(v), 1)),
+        "wiatr_kmh": (daily.get("windspeed_10m_max", []), lambda v: round(float(v), 1)),
+    }
+    codes = daily.get("weathercode", [])
+    days = []
+    for i, day_str in enumerate(daily.get("time", [])):
+        day_obj = {"date": day_str}
+        for key, (values, convert) in columns.items():
+            try:
+                if i < len(values):
+                    day_obj[key] = convert(values[i])
+            except Exception:
+                pass
+        try:
+            code_i = int(codes[i])
+            day_obj["weathercode"] = code_i
+            day_obj["opis"] = WEATHER_CODES_PL.get(code_i, "Nieznane warunki pogodowe")
+        except Exception:
+            day_obj["opis"] = "Nieznane warunki pogodowe"
+        days.append(day_obj)
+    return humidity, days
+
+
+def lean_parse(data: dict) -> tuple:
+    series = DailySeries(data["daily"])
+    # Słowniki dni powstają dopiero przy renderowaniu - tu dla porównania tworzymy wszystkie
+    return current_humidity(data), series.to_dicts()
+
+
+def measure(label: str, payload: str, parse, repeats: int) -> None:
+    def run():
+        return parse(json.loads(payload))
+
+    seconds = min(timeit.repeat(run, number=repeats, repeat=3)) / repeats
+    tracemalloc.start()
+    run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<42} {len(payload) / 1024:8.1f} KiB {seconds * 1e6:10.1f} µs {peak / 1024:10.1f} KiB")
+
+
+def main(days: int = 16, repeats: int = 500):
+    legacy_payload = build_response(days, lean=False)
+    lean_payload = build_response(days, lean=True)
+
+    # Oba tryby muszą dawać te same dane
+    assert legacy_parse(json.loads(legacy_payload))[1] == lean_parse(json.loads(lean_payload))[1]
+    assert legacy_parse(json.loads(legacy_payload))[0] == lean_parse(json.loads(legacy_payload))[0]
+
+    print(f"Prognoza na {days} dni, {repeats} powtórzeń")
+    print(f"{'wariant':<42} {'odpowiedź':>12} {'czas/plan':>13} {'szczyt pamięci':>14}")
+    measure("dotychczasowy (seria godzinowa)", legacy_payload, legacy_parse, repeats)
+    measure("oszczędny parser, stara odpowiedź", legacy_payload, lean_parse, repeats)
+    measure("oszczędny parser + current=", lean_payload, lean_parse, repeats)
+
+
+if __name__ == '__main__':
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 16,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 500,
+    )
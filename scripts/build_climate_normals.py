@@ -0,0 +1,118 @@
+import json
+import os
+import sys
+import time
+import numpy as np
+
+# Dodaj ścieżkę do katalogu nadrzędnego
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import create_app
+from app.catalog import get_catalog
+from app.climate import CLIMATE_VARIABLES, climate_key, climate_paths
+from app.geocoder import local_geocode
+from app.http_client import upstream_get, OPEN_METEO
+
+# Budowa norm klimatycznych (średnie miesięczne: temperatura, opad, usłonecznienie) dla miast katalogu
+# z archiwum Open-Meteo. Uruchamiany offline - aplikacja czyta gotowy plik (app/climate.py),
+# a zmiana jego daty modyfikacji przeładowuje katalog w workerach.
+# Wymaga współrzędnych miast w bazie (najpierw scripts/geocode_destinations.py).
+# Użycie: python scripts/build_climate_normals.py [pierwszy_rok] [ostatni_rok] [miast_na_zapytanie]
+
+OPEN_METEO_ARCHIVE_URL = "https://archive-api.open-meteo.com/v1/archive"
+DAILY_FIELDS = ("temperature_2m_mean", "precipitation_sum", "sunshine_duration")
+
+
+def monthly_normals(daily: dict) -> np.ndarray:
+    """Sekcja 'daily' odpowiedzi archiwum -> tablica (12, zmienne) średnich dziennych w miesiącach."""
+    months = np.array(daily["time"], dtype="datetime64[D]").astype("datetime64[M]").astype(np.int64) % 12
+    columns = [
+        np.array(daily.get("temperature_2m_mean", []), dtype=np.float64),
+        np.array(daily.get("precipitation_sum", []), dtype=np.float64),
+        # Usłonecznienie przychodzi w sekundach
+        np.array(daily.get("sunshine_duration", []), dtype=np.float64) / 3600.0,
+    ]
+    normals = np.full((12, len(CLIMATE_VARIABLES)), np.nan, dtype=np.float32)
+    for v, values in enumerate(columns):
+        # Brakujące dni (null -> NaN) pomijamy w średniej
+        known = ~np.isnan(values) if len(values) == len(months) else np.zeros(len(months), dtype=bool)
+        counts = np.bincount(months[known], minlength=12)
+        sums = np.bincount(months[known], weights=values[known], minlength=12)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            normals[:, v] = np.where(counts > 0, sums / counts, np.nan)
+    return normals
+
+
+def fetch_batch(places: list[dict], first_year: int, last_year: int) -> list[dict]:
+    params = {
+        "latitude": ",".join(str(p["lat"]) for p in places),
+        "longitude": ",".join(str(p["lon"]) for p in places),
+        "start_date": f"{first_year}-01-01",
+        "end_date": f"{last_year}-12-31",
+        "daily": ",".join(DAILY_FIELDS),
+        "timezone": "UTC",
+    }
+    response = upstream_get(OPEN_METEO, OPEN_METEO_ARCHIVE_URL, params=params, timeout=120)
+    response.raise_for_status()
+    data = response.json()
+    # Dla jednej lokalizacji Open-Meteo zwraca obiekt, dla wielu - listę obiektów
+    return [data] if isinstance(data, dict) else data
+
+
+def build_climate_normals(first_year: int = 2014, last_year: int = 2023, batch_size: int = 20, delay: float = 1.0):
+    app = create_app(os.getenv('FLASK_CONFIG') or 'development')
+
+    with app.app_context():
+        places, missing = [], 0
+        for entry in get_catalog():
+            coords = local_geocode(entry['name'], entry.get('country'))
+            if coords:
+                places.append({"key": climate_key(entry['name'], entry.get('country')), **coords})
+            else:
+                missing += 1
+        print(f"Miast ze współrzędnymi: {len(places)}, bez współrzędnych (pominięte): {missing}")
+
+        keys, rows = [], []
+        started = time.perf_counter()
+        for i in range(0, len(places), batch_size):
+            batch = places[i:i + batch_size]
+            try:
+                results = fetch_batch(batch, first_year, last_year)
+            except Exception as e:
+                print(f"Ostrzeżenie: partia {i // batch_size + 1} nieudana ({e}) - miasta pominięte")
+                continue
+            for place, data in zip(batch, results):
+                if data.get("daily", {}).get("time"):
+                    keys.append(place["key"])
+                    rows.append(monthly_normals(data["daily"]))
+            print(f"Przetworzono {min(i + batch_size, len(places))}/{len(places)}...")
+            if delay:
+                time.sleep(delay)
+
+        values = np.stack(rows) if rows else np.empty((0, 12, len(CLIMATE_VARIABLES)), dtype=np.float32)
+        path, keys_path = climate_paths()
+        meta = {
+            "variables": list(CLIMATE_VARIABLES),
+            "period": [first_year, last_year],
+            "source": OPEN_METEO_ARCHIVE_URL,
+            "keys": keys,
+        }
+        # Najpierw klucze, na końcu plik danych - jego data modyfikacji wyzwala przeładowanie katalogu.
+        # Zapis do plików tymczasowych i os.replace: czytelnicy nie zobaczą połowy pliku.
+        with open(keys_path + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False)
+        os.replace(keys_path + '.tmp', keys_path)
+        with open(path + '.tmp', 'wb') as f:
+            np.save(f, values.astype(np.float32))
+        os.replace(path + '.tmp', path)
+
+        print(f"Sukces! Normy dla {len(keys)} miast ({values.nbytes / 1024:.0f} KiB) w {path}, "
+              f"{time.perf_counter() - started:.0f} s.")
+
+
+if __name__ == '__main__':
+    build_climate_normals(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 2014,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 2023,
+        int(sys.argv[3]) if len(sys.argv) > 3 else 20,
+    )
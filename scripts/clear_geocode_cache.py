@@ -0,0 +1,18 @@
+import os
+import sys
+
+# Dodaj ścieżkę do katalogu nadrzędnego
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import create_app
+from app.cache import invalidate_geocode_cache
+
+# Użycie: python scripts/clear_geocode_cache.py [miasto]
+# Bez argumentu czyści cały cache geokodowania.
+if __name__ == '__main__':
+    app = create_app(os.getenv('FLASK_CONFIG') or 'development')
+    city = sys.argv[1] if len(sys.argv) > 1 else None
+    with app.app_context():
+        removed = invalidate_geocode_cache(city)
+        target = f"'{city}'" if city else "wszystkich miast"
+        print(f"Usunięto {removed} wpisów cache geokodowania dla {target}.")
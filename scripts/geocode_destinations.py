@@ -0,0 +1,52 @@
+import os
+import sys
+import time
+
+# Dodaj ścieżkę do katalogu nadrzędnego
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import create_app, db
+from app.models import City, DataVersion
+from app.catalog import DESTINATIONS_DATA
+from app.api_clients import get_coordinates_for_city
+
+# Jednorazowe (i przyrostowe) uzupełnienie współrzędnych miast z katalogu.
+# Po jego wykonaniu lokalny geokoder (app/geocoder.py) obsługuje miasta z katalogu bez zapytań do API.
+# Użycie: python scripts/geocode_destinations.py [opóźnienie_między_zapytaniami_w_sekundach]
+
+
+def geocode_destinations(delay: float = 0.2):
+    app = create_app(os.getenv('FLASK_CONFIG') or 'development')
+
+    with app.app_context():
+        cities = City.query.filter((City.lat.is_(None)) | (City.lon.is_(None))).all()
+        print(f"Miast bez współrzędnych: {len(cities)}")
+
+        updated = 0
+        missing = 0
+        for i, city in enumerate(cities, start=1):
+            coords = get_coordinates_for_city(city.name, city.country.name if city.country else None)
+            if coords:
+                city.lat = coords['lat']
+                city.lon = coords['lon']
+                updated += 1
+            else:
+                missing += 1
+                print(f"Ostrzeżenie: brak współrzędnych dla '{city.name}'")
+
+            # Zapisujemy partiami, żeby przerwanie skryptu nie traciło całej pracy
+            if i % 100 == 0:
+                db.session.commit()
+                print(f"Przetworzono {i}/{len(cities)}...")
+            if delay:
+                time.sleep(delay)
+
+        # Nowa wersja danych - workery przebudują lokalny geokoder i katalog (app/catalog.py)
+        if updated:
+            DataVersion.bump(DESTINATIONS_DATA)
+        db.session.commit()
+        print(f"Sukces! Uzupełniono {updated} miast. Bez wyniku: {missing}.")
+
+
+if __name__ == '__main__':
+    geocode_destinations(float(sys.argv[1]) if len(sys.argv) > 1 else 0.2)
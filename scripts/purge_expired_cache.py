@@ -0,0 +1,17 @@
+import os
+import sys
+
+# Dodaj ścieżkę do katalogu nadrzędnego
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import create_app
+from app.cache import purge_expired_cache
+
+# Użycie: python scripts/purge_expired_cache.py (np. z crona)
+# Usuwa wpisy cache geokodowania, pogody i atrakcji wygasłe ponad CACHE_PURGE_GRACE_SECONDS temu.
+if __name__ == '__main__':
+    app = create_app(os.getenv('FLASK_CONFIG') or 'development')
+    with app.app_context():
+        removed = purge_expired_cache()
+        for table, count in removed.items():
+            print(f"{table}: usunięto {count} wygasłych wpisów.")
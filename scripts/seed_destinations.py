@@ -1,12 +1,16 @@
-import json
 import os
 import sys
+import time
 
 # Dodaj ścieżkę do katalogu nadrzędnego
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
+from sqlalchemy import select
 from app import create_app, db
-from app.models import Country, City
+from app.models import Country, City, DataVersion
+from app.catalog import DESTINATIONS_DATA
+from app.countries import COUNTRIES_DATA
+from app.destinations_import import SnapshotWriter, batched, iter_destinations, snapshot_path, upsert
 
 # Lista krajów z informacją o bezpieczeństwie (na podstawie Twoich danych)
 DANGER_LIST = [
@@ -206,84 +210,143 @@ DANGER_LIST = [
   { "name": "Zjednoczone Emiraty Arabskie", "danger": "no" }
 ]
 
-def seed_destinations():
-    app = create_app(os.getenv('FLASK_CONFIG') or 'development')
-    
-    json_path = os.path.join(app.root_path, 'plans', 'destinations.json')
-    
-    if not os.path.exists(json_path):
-        print(f"Błąd: Plik nie istnieje: {json_path}")
-        return
+# Rekordów w jednej partii: jedno INSERT ... ON CONFLICT na tabelę i tyle wpisów w pamięci naraz
+BATCH_SIZE = 500
+# Kolumny miasta nadpisywane przy ponownym seedzie - współrzędne z geocode_destinations zostają
+CITY_UPDATE_COLUMNS = ('tags', 'cost_tier', 'cost_multiplier', 'image_keyword')
+# Ile komunikatów o odrzuconych rekordach wypisać
+MAX_REPORTED_ERRORS = 20
+
+# Import strumieniowy: źródło (tablica JSON albo JSON Lines) czytamy rekord po rekordzie
+# (app/destinations_import.py), każdy walidujemy i normalizujemy, a do bazy zapisujemy partiami
+# po BATCH_SIZE - pamięć nie rośnie z rozmiarem pliku. Równolegle powstaje snapshot (JSON Lines)
+# katalogu, który aplikacja wczytuje zamiast destinations.json (app/catalog.py).
+# Całość w jednej transakcji - błąd w dowolnej partii wycofuje import.
+#
+# Użycie: python scripts/seed_destinations.py [plik.json|plik.jsonl] [rozmiar_partii]
 
-    print(f"Wczytywanie danych z {json_path}...")
-    with open(json_path, 'r', encoding='utf-8') as f:
-        data = json.load(f)
 
+def import_destinations(json_path: str, batch_size: int = BATCH_SIZE, on_invalid=None) -> dict:
+    """
+    Import w bieżącym kontekście aplikacji. Zwraca liczniki i czasy; przy błędzie wycofuje
+    transakcję, porzuca snapshot i rzuca wyjątek dalej. Ponowny import tego samego pliku
+    nie dodaje wierszy (upsert po kluczach naturalnych).
+    """
     # Tworzenie słownika do szybkiego sprawdzania statusu niebezpieczeństwa
     danger_map = {item['name']: (item['danger'] == 'yes') for item in DANGER_LIST}
 
-    with app.app_context():
-        print("Rozpoczynam aktualizację bazy danych...")
-        
-        # 1. Dodawanie Krajów
-        unique_countries = {item['country'] for item in data if item.get('country')}
-        countries_added = 0
-        countries_updated = 0
-        
-        for country_name in unique_countries:
-            country = Country.query.filter_by(name=country_name).first()
-            is_dangerous = danger_map.get(country_name, False) # Domyślnie False jeśli brak w liście
+    started = time.perf_counter()
+    # Kraje są nieliczne - trzymamy je w pamięci przez cały import
+    existing_countries = dict(db.session.execute(select(Country.name, Country.danger)).all())
+    country_ids = dict(db.session.execute(select(Country.name, Country.id)).all())
+    stats = {"countries_added": 0, "countries_updated": 0, "cities_added": 0, "cities_total": 0}
+    timings = {"kraje": 0.0, "miasta": 0.0}
+    snapshot = SnapshotWriter(snapshot_path())
 
-            if not country:
-                db.session.add(Country(name=country_name, danger=is_dangerous))
-                countries_added += 1
-            else:
-                # Aktualizacja istniejącego kraju o status bezpieczeństwa
-                if country.danger != is_dangerous:
-                    country.danger = is_dangerous
-                    countries_updated += 1
-        
+    try:
+        for batch in batched(iter_destinations(json_path, on_invalid=on_invalid), batch_size):
+            # Jedno miasto na (kraj, nazwa) w partii - wygrywa ostatni wpis
+            # (ON CONFLICT nie może zmienić tego samego wiersza dwa razy w jednym zapytaniu).
+            # Powtórzenie w różnych partiach to po prostu kolejny upsert tego samego wiersza.
+            items = {(item['country'], item['name']): item for item in batch}
+
+            # 1. Kraje: upsert tylko tych, których jeszcze nie widzieliśmy albo zmienił się status
+            phase = time.perf_counter()
+            country_rows = [
+                # Domyślnie False jeśli brak w liście
+                {'name': name, 'danger': danger_map.get(name, False)}
+                for name in sorted({country for country, _ in items})
+                if existing_countries.get(name) != danger_map.get(name, False)
+            ]
+            if country_rows:
+                stats["countries_added"] += sum(1 for row in country_rows if row['name'] not in existing_countries)
+                stats["countries_updated"] += sum(1 for row in country_rows if row['name'] in existing_countries)
+                upsert(Country.__table__, country_rows, ['name'], ['danger'])
+                new_names = [row['name'] for row in country_rows]
+                country_ids.update(db.session.execute(
+                    select(Country.name, Country.id).where(Country.name.in_(new_names))
+                ).all())
+                existing_countries.update((row['name'], row['danger']) for row in country_rows)
+            timings["kraje"] += time.perf_counter() - phase
+
+            # 2. Miasta: istniejące klucze tej partii jednym zapytaniem (do raportu), potem upsert
+            phase = time.perf_counter()
+            city_rows = [
+                {
+                    'name': name,
+                    'country_id': country_ids[country],
+                    **{column: item[column] for column in CITY_UPDATE_COLUMNS},
+                }
+                for (country, name), item in items.items()
+            ]
+            keys = [(row['name'], row['country_id']) for row in city_rows]
+            # Filtr po samej nazwie korzysta z indeksu (name, country_id) także w SQLite; kraj sprawdzamy tu
+            existing_cities = set(db.session.execute(
+                select(City.name, City.country_id).where(City.name.in_({name for name, _ in keys}))
+            ).all())
+            stats["cities_added"] += sum(1 for key in keys if key not in existing_cities)
+            stats["cities_total"] += len(city_rows)
+            upsert(City.__table__, city_rows, ['name', 'country_id'], CITY_UPDATE_COLUMNS)
+            timings["miasta"] += time.perf_counter() - phase
+
+            snapshot.write(list(items.values()))
+
+        # Nowa wersja danych - workery przeładują katalog destynacji (app/catalog.py)
+        DataVersion.bump(DESTINATIONS_DATA)
+        # Nowa wersja krajów - workery przeładują słownik krajów (app/countries.py)
+        if stats["countries_added"] or stats["countries_updated"]:
+            DataVersion.bump(COUNTRIES_DATA)
+
+        phase = time.perf_counter()
         db.session.commit()
-        print(f"Dodano {countries_added} nowych krajów. Zaktualizowano {countries_updated} o status bezpieczeństwa.")
+        timings["commit"] = time.perf_counter() - phase
+    except Exception:
+        db.session.rollback()
+        snapshot.abort()
+        raise
+
+    # Snapshot podmieniamy dopiero po udanym commicie - katalog nie wyprzedzi bazy
+    snapshot.close()
+    timings["razem"] = time.perf_counter() - started
+    return {**stats, "snapshot_path": snapshot.path, "snapshot_count": snapshot.count, "timings": timings}
 
-        # 2. Dodawanie Miast (bez zmian)
-        cities_added = 0
-        cities_skipped = 0
-        
-        for item in data:
-            country_name = item.get('country')
-            city_name = item.get('name')
-            
-            if not country_name or not city_name:
-                continue
 
-            country_obj = Country.query.filter_by(name=country_name).first()
-            
-            if country_obj:
-                exists = City.query.filter_by(name=city_name, country_id=country_obj.id).first()
-                
-                if not exists:
-                    city = City(
-                        name=city_name,
-                        country=country_obj,
-                        tags=item.get('tags'),
-                        cost_tier=item.get('cost_tier'),
-                        cost_multiplier=item.get('cost_multiplier'),
-                        image_keyword=item.get('image_keyword')
-                    )
-                    db.session.add(city)
-                    cities_added += 1
-                else:
-                    cities_skipped += 1
-            else:
-                print(f"Ostrzeżenie: Nie znaleziono kraju '{country_name}' dla miasta '{city_name}'")
-        
+def seed_destinations(source_path: str = None, batch_size: int = BATCH_SIZE):
+    app = create_app(os.getenv('FLASK_CONFIG') or 'development')
+
+    json_path = source_path or os.path.join(app.root_path, 'plans', 'destinations.json')
+
+    if not os.path.exists(json_path):
+        print(f"Błąd: Plik nie istnieje: {json_path}")
+        return
+
+    rejected = 0
+
+    def on_invalid(error):
+        nonlocal rejected
+        rejected += 1
+        if rejected <= MAX_REPORTED_ERRORS:
+            print(f"  Pominięto rekord: {error}")
+
+    with app.app_context():
+        print(f"Import z {json_path} partiami po {batch_size}...")
         try:
-            db.session.commit()
-            print(f"Sukces! Dodano {cities_added} nowych miast. Pominięto {cities_skipped} istniejących.")
+            result = import_destinations(json_path, batch_size, on_invalid)
         except Exception as e:
-            db.session.rollback()
             print(f"Błąd zapisu do bazy: {e}")
+            return
+
+        print(f"Dodano {result['countries_added']} nowych krajów. "
+              f"Zaktualizowano {result['countries_updated']} o status bezpieczeństwa.")
+        print(f"Sukces! Dodano {result['cities_added']} nowych miast. "
+              f"Zaktualizowano {result['cities_total'] - result['cities_added']} istniejących.")
+        if rejected:
+            print(f"Pominięto {rejected} niepoprawnych rekordów.")
+        print(f"Snapshot katalogu: {result['snapshot_path']} ({result['snapshot_count']} wpisów).")
+        print("Czasy: " + ", ".join(f"{name} {seconds * 1000:.0f} ms" for name, seconds in result['timings'].items()))
 
 if __name__ == '__main__':
-    seed_destinations()
\ No newline at end of file
+    seed_destinations(
+        sys.argv[1] if len(sys.argv) > 1 else None,
+        int(sys.argv[2]) if len(sys.argv) > 2 else BATCH_SIZE,
+    )
@@ -0,0 +1,47 @@
+# tests/conftest.py
+"""Wspólne fixtures: aplikacja z pustą bazą SQLite w pamięci i sterowany zegar dla testów TTL."""
+from datetime import datetime, timedelta
+import pytest
+from app import create_app, db
+
+
+@pytest.fixture
+def app():
+    app = create_app('testing')
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+class FrozenClock:
+    """Podmienia datetime.utcnow() w wybranych modułach; advance() przesuwa czas."""
+
+    def __init__(self, now: datetime):
+        self.now = now
+
+    def advance(self, **kwargs) -> None:
+        self.now += timedelta(**kwargs)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    frozen = FrozenClock(datetime(2026, 1, 1, 12, 0, 0))
+
+    class _FrozenDatetime(datetime):
+        @classmethod
+        def utcnow(cls):
+            return frozen.now
+
+    def freeze(*modules):
+        for module in modules:
+            monkeypatch.setattr(module, "datetime", _FrozenDatetime)
+        return frozen
+
+    return freeze
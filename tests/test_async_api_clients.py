@@ -0,0 +1,84 @@
+# tests/test_async_api_clients.py
+import asyncio
+import threading
+import pytest
+from app import async_api_clients
+from app.async_api_clients import run_on_upstream_loop, get_attractions_async, get_coordinates_for_city_async
+
+
+@pytest.fixture
+def upstream(app):
+    yield
+    loop = app.extensions.pop("async_upstream", None)
+    if loop is not None:
+        loop.close()
+
+
+def _run(app, coro_fn, *args):
+    with app.app_context():
+        return asyncio.run(run_on_upstream_loop(coro_fn, *args))
+
+
+def test_one_http_pool_per_worker(app, upstream):
+    async def whoami(http):
+        return http, asyncio.get_running_loop()
+
+    first = _run(app, whoami)
+    second = _run(app, whoami)
+    # Każdy asyncio.run to nowa pętla widoku, ale klient i pętla zapytań są te same
+    assert first[0] is second[0]
+    assert first[1] is second[1]
+
+
+def test_concurrent_attraction_misses_share_one_request(app, upstream, monkeypatch):
+    calls = []
+
+    async def fake_fetch(http, city, country=None):
+        calls.append(city)
+        await asyncio.sleep(0.05)
+        return [{"name": "Wawel"}], "OK"
+
+    monkeypatch.setattr(async_api_clients, "_fetch_attractions_async", fake_fetch)
+
+    async def many(http):
+        return await asyncio.gather(*(get_attractions_async(http, "Kraków", "Polska") for _ in range(5)))
+
+    results = _run(app, many)
+    assert calls == ["Kraków"]
+    assert results == [[{"name": "Wawel"}]] * 5
+    # Wynik trafił do cache - kolejne wywołanie nie pyta API
+    assert _run(app, lambda http: get_attractions_async(http, "Kraków", "Polska")) == [{"name": "Wawel"}]
+    assert calls == ["Kraków"]
+
+
+def test_leader_error_reaches_waiters(app, upstream, monkeypatch):
+    async def broken_fetch(http, city, country=None):
+        await asyncio.sleep(0.05)
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(async_api_clients, "_fetch_attractions_async", broken_fetch)
+
+    async def many(http):
+        return await asyncio.gather(
+            *(get_attractions_async(http, "Gdańsk") for _ in range(3)), return_exceptions=True
+        )
+
+    results = _run(app, many)
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+
+def test_sync_lookups_run_off_the_event_loop(app, upstream, monkeypatch):
+    threads = []
+
+    def fake_local_geocode(city, country=None):
+        threads.append(threading.current_thread())
+        return {"lat": 50.06, "lon": 19.94}
+
+    monkeypatch.setattr(async_api_clients, "local_geocode", fake_local_geocode)
+
+    async def geocode(http):
+        return await get_coordinates_for_city_async(http, "Kraków"), threading.current_thread()
+
+    coords, loop_thread = _run(app, geocode)
+    assert coords == {"lat": 50.06, "lon": 19.94}
+    assert threads[0] is not loop_thread
@@ -0,0 +1,95 @@
+# tests/test_attractions_swr.py
+import pytest
+from app import api_clients, cache
+
+
+@pytest.fixture
+def places(app, monkeypatch, clock):
+    """Atrapa Google Places: kolejne wywołania zwracają kolejne wersje listy atrakcji."""
+    app.config.update(
+        ATTRACTIONS_CACHE_FRESH_TTL=3600,
+        ATTRACTIONS_CACHE_STALE_TTL=7200,
+        ATTRACTIONS_ZERO_RESULTS_TTL=600,
+    )
+    state = {"calls": 0, "status": "OK", "scheduled": []}
+
+    def fetch(city, country=None):
+        state["calls"] += 1
+        if state["status"] == "ERROR":
+            return None, None
+        if state["status"] == "ZERO_RESULTS":
+            return [], "ZERO_RESULTS"
+        return [{"name": f"{city} v{state['calls']}"}], "OK"
+
+    def submit(fn, *args, **kwargs):
+        # Odświeżenie w tle wykonujemy dopiero na żądanie testu
+        state["scheduled"].append(lambda: fn(*args, **kwargs))
+
+    monkeypatch.setattr(api_clients, "_fetch_attractions", fetch)
+    monkeypatch.setattr(api_clients, "submit_background", submit)
+    state["clock"] = clock(cache)
+    return state
+
+
+def test_miss_fetches_synchronously_and_caches(places):
+    assert api_clients.get_attractions("Lyon", "Francja") == [{"name": "Lyon v1"}]
+    assert api_clients.get_attractions("Lyon", "Francja") == [{"name": "Lyon v1"}]
+    assert places["calls"] == 1
+    assert places["scheduled"] == []
+
+
+def test_stale_entry_is_served_and_refreshed_in_background(places):
+    api_clients.get_attractions("Lyon", "Francja")
+    places["clock"].advance(seconds=3600)
+
+    # Nieświeży wpis wraca od razu, odświeżenie jest tylko zlecone
+    assert api_clients.get_attractions("Lyon", "Francja") == [{"name": "Lyon v1"}]
+    assert places["calls"] == 1
+    # Kolejne żądanie przed końcem odświeżania nie zleca drugiego
+    api_clients.get_attractions("Lyon", "Francja")
+    assert len(places["scheduled"]) == 1
+
+    places["scheduled"].pop()()
+    assert places["calls"] == 2
+    assert api_clients.get_attractions("Lyon", "Francja") == [{"name": "Lyon v2"}]
+    assert places["scheduled"] == []
+
+
+def test_entry_past_stale_ttl_is_refetched_synchronously(places):
+    api_clients.get_attractions("Lyon", "Francja")
+    places["clock"].advance(seconds=7200)
+    assert api_clients.get_attractions("Lyon", "Francja") == [{"name": "Lyon v2"}]
+    assert places["scheduled"] == []
+
+
+def test_expired_entry_is_fallback_when_upstream_fails(places):
+    api_clients.get_attractions("Lyon", "Francja")
+    places["clock"].advance(days=30)
+    places["status"] = "ERROR"
+    assert api_clients.get_attractions("Lyon", "Francja") == [{"name": "Lyon v1"}]
+
+
+def test_failed_refresh_keeps_stale_entry(places):
+    api_clients.get_attractions("Lyon", "Francja")
+    places["clock"].advance(seconds=3600)
+    api_clients.get_attractions("Lyon", "Francja")
+    places["status"] = "ERROR"
+    places["scheduled"].pop()()
+    assert api_clients.get_attractions("Lyon", "Francja") == [{"name": "Lyon v1"}]
+
+
+def test_zero_results_use_short_ttl(places):
+    places["status"] = "ZERO_RESULTS"
+    assert api_clients.get_attractions("Pustkowie") == []
+    assert api_clients.get_attractions("Pustkowie") == []
+    assert places["calls"] == 1
+
+    places["clock"].advance(seconds=600)
+    places["status"] = "OK"
+    assert api_clients.get_attractions("Pustkowie") == [{"name": "Pustkowie v2"}]
+
+
+def test_limit_applies_to_cached_payload(places, monkeypatch):
+    monkeypatch.setattr(api_clients, "_fetch_attractions", lambda city, country=None: ([{"name": str(i)} for i in range(10)], "OK"))
+    assert len(api_clients.get_attractions("Paryż", limit=3)) == 3
+    assert len(api_clients.get_attractions("Paryż", limit=8)) == 8
@@ -0,0 +1,128 @@
+# tests/test_autocomplete.py
+import pytest
+import requests
+from app import autocomplete
+from app.autocomplete import AutocompleteIndex
+from app.main import routes
+
+PLACES = [
+    ("Kraków", "Kraków, Polska", 50.06, 19.94),
+    ("Krasnystaw", "Krasnystaw, Polska", 50.98, 23.17),
+    ("Rio de Janeiro", "Rio de Janeiro, Brazylia", -22.91, -43.17),
+    ("Barcelona", "Barcelona, Hiszpania", 41.39, 2.17),
+    ("Kra", "Kra, Tajlandia", 10.0, 99.0),
+]
+
+
+def _index(places=PLACES) -> AutocompleteIndex:
+    index = AutocompleteIndex()
+    for name, display, lat, lon in places:
+        index.add(name, display, lat, lon, weight=2.0, sort=False)
+    index.finalize()
+    return index
+
+
+def _names(results):
+    return [r["name"] for r in results]
+
+
+def test_prefix_search_ignores_case_and_diacritics():
+    results = _index().search("KRAK")
+    # Prefiks wyprzedza podobne nazwy dobrane z trigramów
+    assert _names(results)[0] == "Kraków, Polska"
+    assert results[0] == {"name": "Kraków, Polska", "lat": 50.06, "lon": 19.94}
+
+
+def test_exact_name_ranks_before_longer_prefix_matches():
+    # "Kra" to pełna nazwa miasta - wyprzedza Kraków i Krasnystaw (tylko prefiks)
+    assert _names(_index().search("kra")) == ["Kra, Tajlandia", "Kraków, Polska", "Krasnystaw, Polska"]
+
+
+def test_word_start_matches_later_words():
+    assert _names(_index().search("janeiro")) == ["Rio de Janeiro, Brazylia"]
+    assert _names(_index().search("de jan")) == ["Rio de Janeiro, Brazylia"]
+
+
+def test_typo_falls_back_to_trigrams():
+    assert "Barcelona, Hiszpania" in _names(_index().search("Barcelna"))
+    # Zbyt krótkie zapytanie nie szuka literówek
+    assert _index().search("Bx") == []
+
+
+def test_query_after_comma_and_duplicates_are_ignored():
+    index = _index()
+    assert not index.add("Kraków", "Kraków, Polska")
+    assert len(index) == len(PLACES)
+    assert _names(index.search("Barcelona, Hiszpania")) == ["Barcelona, Hiszpania"]
+
+
+def test_catalog_places_rank_before_learned_ones():
+    index = _index([("Paryż", "Paryż, Francja", 48.86, 2.35)])
+    index.add("Paryż", "Paryż, Teksas, Stany Zjednoczone", 33.66, -95.56, weight=1.0)
+    assert _names(index.search("paryz")) == ["Paryż, Francja", "Paryż, Teksas, Stany Zjednoczone"]
+
+
+class _Response:
+    def __init__(self, results):
+        self._results = results
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return {"results": self._results}
+
+
+@pytest.fixture
+def geocode_api(app, monkeypatch):
+    """Endpoint /api/geocode z indeksem PLACES i podmienionym Open-Meteo Geocoding."""
+    index = _index()
+    monkeypatch.setattr(autocomplete, "get_autocomplete_index", lambda: index)
+    monkeypatch.setattr(autocomplete, "_learned", [])
+    monkeypatch.setattr(autocomplete, "_asked_upstream", set())
+    app.config["AUTOCOMPLETE_MIN_LOCAL_HITS"] = 3
+    state = {"calls": [], "results": [], "error": None}
+
+    def fake_get(upstream, url, params=None, timeout=None):
+        state["calls"].append(params["name"])
+        if state["error"]:
+            raise state["error"]
+        return _Response(state["results"])
+
+    monkeypatch.setattr(routes, "upstream_get", fake_get)
+    state["client"] = app.test_client()
+    return state
+
+
+def test_enough_local_hits_skip_upstream(geocode_api):
+    response = geocode_api["client"].get("/api/geocode", query_string={"q": "kra"})
+    assert len(response.get_json()) == 3
+    assert geocode_api["calls"] == []
+
+
+def test_few_local_hits_ask_upstream_once_and_learn_results(geocode_api):
+    geocode_api["results"] = [
+        {"name": "Barcelos", "admin1": "Braga", "country": "Portugalia", "latitude": 41.53, "longitude": -8.62},
+    ]
+    response = geocode_api["client"].get("/api/geocode", query_string={"q": "Barcel"})
+    assert _names(response.get_json()) == ["Barcelona, Hiszpania", "Barcelos, Braga, Portugalia"]
+    assert geocode_api["calls"] == ["Barcel"]
+
+    # To samo zapytanie ponownie - wynik z indeksu, bez zapytania do API
+    response = geocode_api["client"].get("/api/geocode", query_string={"q": "barcel"})
+    assert _names(response.get_json()) == ["Barcelona, Hiszpania", "Barcelos, Braga, Portugalia"]
+    assert geocode_api["calls"] == ["Barcel"]
+
+
+def test_upstream_failure_returns_local_hits(geocode_api):
+    geocode_api["error"] = requests.ConnectionError("offline")
+    response = geocode_api["client"].get("/api/geocode", query_string={"q": "janeiro"})
+    assert response.status_code == 200
+    assert _names(response.get_json()) == ["Rio de Janeiro, Brazylia"]
+
+
+def test_upstream_failure_without_local_hits_is_error(geocode_api):
+    geocode_api["error"] = requests.ConnectionError("offline")
+    response = geocode_api["client"].get("/api/geocode", query_string={"q": "Zzyzx"})
+    assert response.status_code == 500
+    assert response.get_json() == []
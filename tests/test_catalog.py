@@ -0,0 +1,144 @@
+# tests/test_catalog.py
+import pytest
+from app.catalog import DestinationCatalog
+from app.utils import normalize_city_name
+
+
+def _entry(name, country, tags=("city",), cost_tier="medium"):
+    return {"name": name, "country": country, "tags": list(tags), "cost_tier": cost_tier, "cost_multiplier": 1.0}
+
+
+@pytest.fixture
+def catalog():
+    return DestinationCatalog([
+        _entry("Paryż", "Francja"),
+        _entry("Kraków", "Polska"),
+        _entry("Walencja", "Hiszpania", tags=("beach",)),
+        _entry("Walencja", "Wenezuela", tags=("beach",)),
+    ])
+
+
+def test_find_by_name_ignores_case_and_diacritics(catalog):
+    assert [e["country"] for e in catalog.find_by_name("krakow")] == ["Polska"]
+    assert len(catalog.find_by_name("WALENCJA")) == 2
+
+
+def test_find_by_name_filters_by_country(catalog):
+    assert [e["country"] for e in catalog.find_by_name("Walencja", "wenezuela")] == ["Wenezuela"]
+    # Miasto o tej nazwie jest tylko w innym kraju - to nie to miasto
+    assert catalog.find_by_name("Paryż", "Teksas") == []
+
+
+def test_normalize_city_name_respects_country(catalog):
+    assert normalize_city_name("paryz, francja", catalog)["name"] == "Paryż"
+    assert normalize_city_name("Paryż, Teksas", catalog) is None
+    # Dopasowanie rozmyte też tylko w podanym kraju
+    assert normalize_city_name("Krakow, Polska", catalog)["country"] == "Polska"
+    assert normalize_city_name("Krakuw, Francja", catalog) is None
+
+
+@pytest.fixture
+def tagged():
+    return DestinationCatalog([
+        _entry("Nicea", "Francja", tags=("beach", "city"), cost_tier="high"),
+        _entry("Lyon", "Francja", tags=("city",)),
+        _entry("Sopot", "Polska", tags=("beach",), cost_tier="low"),
+        _entry("Zakopane", "Polska", tags=("mountains",)),
+        _entry("Split", "Chorwacja", tags=("beach", "city", "mountains")),
+    ])
+
+
+def _masked(catalog, mask):
+    return sorted(e["name"] for e, selected in zip(catalog.entries, mask) if selected)
+
+
+def test_mask_selects_cities_with_any_tag(tagged):
+    assert _masked(tagged, tagged.mask(["beach"])) == ["Nicea", "Sopot", "Split"]
+    assert _masked(tagged, tagged.mask(["beach", "mountains"])) == ["Nicea", "Sopot", "Split", "Zakopane"]
+    # Nieznany tag nie pasuje do niczego
+    assert _masked(tagged, tagged.mask(["desert"])) == []
+
+
+def test_mask_excludes_cost_tiers(tagged):
+    assert _masked(tagged, tagged.mask(["beach"], exclude_cost_tiers=("high",))) == ["Sopot", "Split"]
+    # Poziom kosztów spoza katalogu niczego nie wyklucza
+    assert _masked(tagged, tagged.mask(["beach"], exclude_cost_tiers=("luxury",))) == ["Nicea", "Sopot", "Split"]
+
+
+def test_tag_overlap_counts_shared_tags(tagged):
+    indices = [i for i, e in enumerate(tagged.entries) if e["name"] in ("Split", "Sopot", "Lyon")]
+    overlap = dict(zip((tagged.entries[i]["name"] for i in indices),
+                       tagged.tag_overlap(["beach", "city", "mountains"], indices)))
+    assert overlap == {"Split": 3, "Sopot": 1, "Lyon": 1}
+
+
+def test_group_by_country_keeps_catalog_order(tagged):
+    groups = tagged.group_by_country(tagged.mask(["city"]))
+    assert list(groups) == ["Chorwacja", "Francja"]
+    assert {country: [tagged.entries[i]["name"] for i in idx] for country, idx in groups.items()} == {
+        "Chorwacja": ["Split"], "Francja": ["Nicea", "Lyon"],
+    }
+    assert tagged.group_by_country(tagged.mask(["desert"])) == {}
+
+
+def test_more_than_64_tags_use_several_mask_words():
+    tags = [f"tag{i:02d}" for i in range(70)]
+    catalog = DestinationCatalog([
+        _entry("Pierwsze", "A", tags=tags[:1]),
+        _entry("Ostatnie", "B", tags=tags[-1:]),
+        _entry("Wszystkie", "C", tags=tags),
+    ])
+    assert catalog.tag_bits.shape == (3, 2)
+    assert _masked(catalog, catalog.mask([tags[-1]])) == ["Ostatnie", "Wszystkie"]
+    assert _masked(catalog, catalog.mask([tags[0]])) == ["Pierwsze", "Wszystkie"]
+    assert list(catalog.tag_overlap(tags, [0, 1, 2])) == [1, 1, 70]
+    assert list(catalog.tag_overlap([tags[0], tags[65]], [0, 1, 2])) == [1, 0, 2]
+
+
+@pytest.fixture
+def reload(app, monkeypatch):
+    """get_catalog z podmienionym źródłem wpisów i sterowanym zegarem."""
+    from app import catalog as catalog_module
+
+    monkeypatch.setattr(catalog_module, "_catalog", None)
+    monkeypatch.setattr(catalog_module, "_next_check_at", 0.0)
+    monkeypatch.setattr(catalog_module, "_current_version", lambda: ("v1",))
+    monkeypatch.setattr(catalog_module, "load_catalog_climate", lambda entries: None)
+    app.config["CATALOG_CHECK_SECONDS"] = 5
+    app.config["CATALOG_RETRY_SECONDS"] = 30
+    now = [1000.0]
+    monkeypatch.setattr(catalog_module.time, "monotonic", lambda: now[0])
+    source = {"entries": None}
+    monkeypatch.setattr(catalog_module, "_load_entries", lambda: source["entries"])
+    return catalog_module, source, now
+
+
+def test_failed_load_keeps_last_good_catalog_and_retries(reload):
+    catalog_module, source, now = reload
+    source["entries"] = [_entry("Kraków", "Polska")]
+    good = catalog_module.get_catalog()
+    assert len(good) == 1
+
+    # Nowa wersja danych, ale pliki nie dają się wczytać - zostaje poprzedni katalog
+    catalog_module._current_version = lambda: ("v2",)
+    source["entries"] = None
+    now[0] += 5
+    assert catalog_module.get_catalog() is good
+
+    source["entries"] = [_entry("Kraków", "Polska"), _entry("Gdańsk", "Polska")]
+    now[0] += 29
+    assert catalog_module.get_catalog() is good
+    now[0] += 1
+    reloaded = catalog_module.get_catalog()
+    assert len(reloaded) == 2 and reloaded.version == ("v2",)
+
+
+def test_empty_first_load_is_not_stamped_with_version(reload):
+    catalog_module, source, now = reload
+    source["entries"] = []
+    empty = catalog_module.get_catalog()
+    assert len(empty) == 0 and empty.version is None
+
+    source["entries"] = [_entry("Kraków", "Polska")]
+    now[0] += 30
+    assert len(catalog_module.get_catalog()) == 1
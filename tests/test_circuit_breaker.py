@@ -0,0 +1,97 @@
+# tests/test_circuit_breaker.py
+import pytest
+from app import circuit_breaker
+from app.circuit_breaker import CircuitBreaker, CircuitOpenError, CLOSED, OPEN, HALF_OPEN
+
+CONFIG = {
+    "CIRCUIT_WINDOW_SIZE": 10,
+    "CIRCUIT_MIN_CALLS": 4,
+    "CIRCUIT_ERROR_RATE": 0.5,
+    "CIRCUIT_OPEN_SECONDS": 30,
+    "UPSTREAM_MIN_READ_TIMEOUT": 1.0,
+    "UPSTREAM_TIMEOUT_P95_MULTIPLIER": 2.0,
+}
+
+
+@pytest.fixture
+def monotonic(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(circuit_breaker.time, "monotonic", lambda: now[0])
+    return now
+
+
+@pytest.fixture
+def breaker(app, monotonic):
+    return CircuitBreaker("open_meteo", CONFIG)
+
+
+def _fail(breaker, n):
+    for _ in range(n):
+        breaker.record(False, probe=breaker.before_call())
+
+
+def test_stays_closed_below_min_calls(breaker):
+    _fail(breaker, 3)
+    assert breaker.state == CLOSED
+    assert breaker.before_call() is False
+
+
+def test_opens_at_error_rate(breaker):
+    breaker.record(True, 0.1)
+    breaker.record(True, 0.1)
+    _fail(breaker, 1)
+    assert breaker.state == CLOSED
+    _fail(breaker, 1)
+    assert breaker.state == OPEN
+    assert breaker.is_open()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+
+def test_half_open_probe_success_closes(breaker, monotonic):
+    _fail(breaker, 4)
+    monotonic[0] += 30
+    assert not breaker.is_open()
+
+    assert breaker.before_call() is True
+    assert breaker.state == HALF_OPEN
+    # Tylko jedno zapytanie próbne naraz
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    breaker.record(True, 0.2, probe=True)
+    assert breaker.state == CLOSED
+    assert breaker.before_call() is False
+    # Okno wyników wyczyszczone - pojedynczy błąd nie otwiera od razu
+    _fail(breaker, 1)
+    assert breaker.state == CLOSED
+
+
+def test_half_open_probe_failure_reopens(breaker, monotonic):
+    _fail(breaker, 4)
+    monotonic[0] += 31
+    assert breaker.before_call() is True
+    breaker.record(False, probe=True)
+    assert breaker.state == OPEN
+    # Nowy okres otwarcia liczy się od nieudanej próby
+    monotonic[0] += 29
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    monotonic[0] += 1
+    assert breaker.before_call() is True
+
+
+def test_disabled_breaker_never_opens(app, monotonic):
+    breaker = CircuitBreaker("google_places", {**CONFIG, "CIRCUIT_BREAKER_ENABLED": False})
+    _fail(breaker, 10)
+    assert breaker.state == CLOSED
+    assert breaker.before_call() is False
+
+
+def test_read_timeout_follows_p95(breaker):
+    assert breaker.read_timeout(10.0) == 10.0
+    for latency in (0.5, 0.6, 0.7, 2.0):
+        breaker.record(True, latency)
+    assert breaker.read_timeout(10.0) == 4.0
+    assert breaker.read_timeout(3.0) == 3.0
+    assert breaker.read_timeout(10.0, probe=True) == 10.0
@@ -0,0 +1,140 @@
+# tests/test_climate.py
+import json
+import os
+from datetime import date
+import numpy as np
+import pytest
+from app.catalog import DestinationCatalog
+from app.climate import (
+    CLIMATE_VARIABLES, PRECIP, SUNSHINE, TEMP, CatalogClimate, climate_key, climate_suitability,
+    climate_version, load_catalog_climate, trip_month,
+)
+from app.recommendations import CLIMATE_MIN_SUITABILITY, score_cities
+
+
+def _conditions(temp, precip=1.0, sunshine=10.0) -> np.ndarray:
+    row = np.zeros((1, len(CLIMATE_VARIABLES)), dtype=np.float32)
+    row[0, [TEMP, PRECIP, SUNSHINE]] = temp, precip, sunshine
+    return row
+
+
+def test_trip_month_is_month_with_most_days():
+    assert trip_month("2026-01-30", "2026-02-04") == 2
+    assert trip_month("2026-01-27", "2026-02-02") == 1
+    # Remis - miesiąc startu
+    assert trip_month("2026-01-29", "2026-02-03") == 1
+    assert trip_month(date(2026, 12, 30), date(2027, 1, 3)) == 1
+    # Bez końca albo z końcem przed początkiem - miesiąc startu
+    assert trip_month("2026-07-10") == 7
+    assert trip_month("2026-07-10", "2026-06-01") == 7
+
+
+def test_trip_month_without_valid_dates_is_none():
+    assert trip_month() is None
+    assert trip_month(None, "2026-07-10") is None
+    assert trip_month("10.07.2026", "2026-07-12") is None
+
+
+def test_beach_needs_warmth_and_sun():
+    hot = climate_suitability(_conditions(28.0), ["beach_sun"])
+    cold = climate_suitability(_conditions(5.0), ["beach_sun"])
+    cloudy = climate_suitability(_conditions(28.0, sunshine=2.0), ["beach_sun"])
+    assert hot[0] == pytest.approx(1.0)
+    assert cold[0] == pytest.approx(0.0)
+    assert 0.0 < cloudy[0] < hot[0]
+
+
+def test_suitability_averages_tags_and_keeps_nan_for_missing_data():
+    conditions = np.vstack([_conditions(28.0), np.full((1, len(CLIMATE_VARIABLES)), np.nan, dtype=np.float32)])
+    beach = climate_suitability(conditions, ["beach_sun"])
+    both = climate_suitability(conditions, ["beach_sun", "nightlife_parties"])
+    assert beach[0] == pytest.approx(1.0)
+    assert 0.5 < both[0] < 1.0
+    assert np.isnan(beach[1]) and np.isnan(both[1])
+
+
+def _entry(name, country, tags=("beach_sun",)):
+    return {"name": name, "country": country, "tags": list(tags), "cost_tier": "medium", "cost_multiplier": 1.2}
+
+
+def _climate_catalog(temps: dict) -> DestinationCatalog:
+    """Katalog z normami: {nazwa: stała temperatura} - miasta spoza słownika bez danych."""
+    entries = [_entry(name, f"Kraj {name}") for name in ("Ciepłe", "Zimne", "Bez danych")]
+    catalog = DestinationCatalog(entries)
+    named = [e["name"] for e in catalog.entries if e["name"] in temps]
+    values = np.zeros((len(named), 12, len(CLIMATE_VARIABLES)), dtype=np.float32)
+    values[:, :, TEMP] = [[temps[name]] * 12 for name in named]
+    values[:, :, PRECIP] = 1.0
+    values[:, :, SUNSHINE] = 10.0
+    rows = np.array([named.index(e["name"]) if e["name"] in named else -1 for e in catalog.entries], dtype=np.int32)
+    catalog.climate = CatalogClimate(values, rows)
+    return catalog
+
+
+def test_score_cities_drops_unsuitable_and_keeps_unknown_climate():
+    catalog = _climate_catalog({"Ciepłe": 28.0, "Zimne": 2.0})
+    assert np.nanmin(climate_suitability(catalog.climate.monthly(np.arange(3), 1), ["beach_sun"])) < CLIMATE_MIN_SUITABILITY
+
+    indices, keys = score_cities(["beach_sun"], catalog, "Standardowy", month=1)
+    ranked = [catalog.entries[i]["name"] for i in indices[np.argsort(-keys)]]
+    # Zimne poniżej CLIMATE_MIN_SUITABILITY odpada, miasto bez norm dostaje ocenę neutralną
+    assert ranked == ["Ciepłe", "Bez danych"]
+
+    # Bez miesiąca klimat nie ma znaczenia
+    indices, _ = score_cities(["beach_sun"], catalog, "Standardowy")
+    assert len(indices) == 3
+
+
+@pytest.fixture
+def normals(app, tmp_path):
+    """Zapisuje pliki norm (npy + json z kluczami) pod CLIMATE_NORMALS_PATH."""
+    path = tmp_path / "climate_normals.npy"
+    app.config["CLIMATE_NORMALS_PATH"] = str(path)
+
+    def write(keys, values=None, variables=CLIMATE_VARIABLES):
+        if values is None:
+            values = np.ones((len(keys), 12, len(CLIMATE_VARIABLES)), dtype=np.float32)
+        np.save(path, values)
+        with open(tmp_path / "climate_normals.json", "w", encoding="utf-8") as f:
+            json.dump({"keys": keys, "variables": list(variables)}, f)
+        return path
+
+    return write
+
+
+def test_load_matches_rows_to_catalog_entries(normals):
+    entries = [_entry("Kraków", "Polska"), _entry("Nowe miasto", "Polska")]
+    values = np.arange(12 * len(CLIMATE_VARIABLES), dtype=np.float32).reshape(1, 12, len(CLIMATE_VARIABLES))
+    normals([climate_key("krakow", "polska")], values)
+
+    climate = load_catalog_climate(entries)
+    # Miasto dodane do katalogu po zbudowaniu norm - brak danych (NaN), nie błąd
+    assert climate.coverage == 1
+    july = climate.monthly(np.array([0, 1]), 7)
+    assert july[0].tolist() == values[0, 6].tolist()
+    assert np.isnan(july[1]).all()
+
+
+def test_missing_file_gives_no_climate(app, tmp_path):
+    app.config["CLIMATE_NORMALS_PATH"] = str(tmp_path / "brak.npy")
+    assert load_catalog_climate([_entry("Kraków", "Polska")]) is None
+    assert climate_version() is None
+
+
+def test_stale_or_incompatible_file_gives_no_climate(normals):
+    entries = [_entry("Kraków", "Polska")]
+    # Plik zbudowany dla innej listy kluczy (kształt nie pasuje do .json)
+    normals([climate_key("Kraków", "Polska"), climate_key("Gdańsk", "Polska")],
+            np.ones((1, 12, len(CLIMATE_VARIABLES)), dtype=np.float32))
+    assert load_catalog_climate(entries) is None
+    # Inny zestaw zmiennych
+    normals([climate_key("Kraków", "Polska")], variables=("temp_mean_c",))
+    assert load_catalog_climate(entries) is None
+
+
+def test_rebuilt_file_changes_climate_version(normals):
+    path = normals([climate_key("Kraków", "Polska")])
+    before = climate_version()
+    os.utime(path, ns=(before + 10**9, before + 10**9))
+    # Wersja norm jest częścią wersji katalogu - nowy plik przeładowuje katalog
+    assert climate_version() == before + 10**9
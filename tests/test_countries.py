@@ -0,0 +1,82 @@
+# tests/test_countries.py
+import pytest
+from sqlalchemy.exc import OperationalError
+from app import countries, db
+from app.models import Country, DataVersion
+
+
+@pytest.fixture
+def monotonic(app, monkeypatch):
+    monkeypatch.setattr(countries, "_directory", None)
+    monkeypatch.setattr(countries, "_next_check_at", 0.0)
+    app.config["CATALOG_CHECK_SECONDS"] = 5
+    app.config["COUNTRIES_RETRY_SECONDS"] = 30
+    now = [1000.0]
+    monkeypatch.setattr(countries.time, "monotonic", lambda: now[0])
+    return now
+
+
+@pytest.fixture
+def database_down(monkeypatch):
+    def broken_session(*args, **kwargs):
+        raise OperationalError("SELECT countries", {}, Exception("database is locked"))
+
+    working_session = countries.Session
+
+    def set_down(down: bool = True):
+        monkeypatch.setattr(countries, "Session", broken_session if down else working_session)
+
+    return set_down
+
+
+def _seed(*names, danger=True):
+    for name in names:
+        db.session.add(Country(name=name, danger=danger))
+    DataVersion.bump(countries.COUNTRIES_DATA)
+    db.session.commit()
+
+
+def test_directory_lookup(monotonic):
+    _seed("Afganistan")
+    directory = countries.get_countries()
+    assert directory.is_dangerous("afganistan")
+    assert not directory.is_dangerous("Polska")
+    assert countries.get_countries() is directory
+
+
+def test_failed_load_is_not_cached(monotonic, database_down):
+    _seed("Afganistan")
+    database_down()
+    assert not countries.get_countries().is_dangerous("Afganistan")
+
+    database_down(False)
+    # Przed upływem COUNTRIES_RETRY_SECONDS nie pytamy bazy ponownie ...
+    monotonic[0] += 29
+    assert not countries.get_countries().is_dangerous("Afganistan")
+    # ... a potem wczytujemy kraje, mimo że wersja się nie zmieniła
+    monotonic[0] += 1
+    assert countries.get_countries().is_dangerous("Afganistan")
+
+
+def test_last_good_directory_survives_failed_reload(monotonic, database_down):
+    _seed("Afganistan")
+    good = countries.get_countries()
+
+    _seed("Syria")
+    database_down()
+    monotonic[0] += 5
+    assert countries.get_countries() is good
+    assert good.is_dangerous("Afganistan")
+
+    database_down(False)
+    monotonic[0] += 30
+    reloaded = countries.get_countries()
+    assert reloaded is not good
+    assert reloaded.is_dangerous("Syria")
+
+
+def test_empty_table_is_not_cached(monotonic):
+    assert len(countries.get_countries()) == 0
+    _seed("Afganistan")
+    monotonic[0] += 30
+    assert countries.get_countries().is_dangerous("Afganistan")
@@ -0,0 +1,110 @@
+# tests/test_destinations_import.py
+import io
+import json
+import pickle
+import pytest
+from app import destinations_import
+from app.destinations_import import (
+    InvalidDestination, SnapshotWriter, _iter_json_array, iter_destinations, normalize_destination, read_snapshot,
+)
+
+
+def _city(name, country="Polska", **extra):
+    return {"name": name, "country": country, "tags": ["city_break"], "cost_tier": "medium",
+            "cost_multiplier": 1.0, "image_keyword": f"{name} {country}", **extra}
+
+
+class CountingReader(io.StringIO):
+    """StringIO liczący wywołania read() - ile pliku parser faktycznie przeczytał."""
+
+    def __init__(self, text):
+        super().__init__(text)
+        self.reads = 0
+
+    def read(self, size=-1):
+        self.reads += 1
+        return super().read(size)
+
+
+def test_json_array_is_streamed_in_small_chunks(monkeypatch):
+    monkeypatch.setattr(destinations_import, "READ_CHUNK", 16)
+    records = [_city(f"Miasto {i}") for i in range(50)] + [1.5, True]
+    assert list(_iter_json_array(io.StringIO(json.dumps(records, ensure_ascii=False)))) == records
+
+
+def test_malformed_record_fails_fast(monkeypatch):
+    monkeypatch.setattr(destinations_import, "READ_CHUNK", 64)
+    monkeypatch.setattr(destinations_import, "MAX_RECORD_CHARS", 256)
+    # Niedomknięty napis - bez limitu parser doczytywałby resztę pliku
+    text = '[{"name": "Kraków", "country": "Polska"}, {"name": "Zepsute' + ', {"name": "x"}' * 10_000 + "]"
+    reader = CountingReader(text)
+    records = _iter_json_array(reader)
+    assert next(records)["name"] == "Kraków"
+    with pytest.raises(json.JSONDecodeError):
+        next(records)
+    assert reader.reads * 64 < 1024
+
+
+def test_normalize_destination():
+    entry = normalize_destination({"name": " Gdańsk ", "country": "Polska", "tags": ["beach_sun", "x", "beach_sun"],
+                                   "cost_tier": "bogus", "cost_multiplier": float("inf")})
+    assert entry == {"name": "Gdańsk", "country": "Polska", "tags": ["beach_sun"], "cost_tier": None,
+                     "cost_multiplier": None, "image_keyword": "Gdańsk Polska"}
+    with pytest.raises(InvalidDestination):
+        normalize_destination({"name": "Gdańsk", "country": "Polska", "tags": ["unknown"]})
+
+
+def test_jsonl_source(tmp_path):
+    path = tmp_path / "cities.jsonl"
+    path.write_text("\n".join(json.dumps(r) for r in [_city("A"), {"name": "B"}, _city("C")]) + "\n", encoding="utf-8")
+    rejected = []
+    assert [e["name"] for e in iter_destinations(str(path), on_invalid=rejected.append)] == ["A", "C"]
+    assert len(rejected) == 1
+
+
+def test_snapshot_round_trip_is_plain_json(tmp_path):
+    path = str(tmp_path / "destinations.snapshot")
+    writer = SnapshotWriter(path)
+    writer.write([_city("Kraków"), _city("Gdańsk")])
+    writer.write([_city("Lizbona", "Portugalia")])
+    writer.close()
+
+    assert writer.count == 3
+    assert [e["name"] for e in read_snapshot(path)] == ["Kraków", "Gdańsk", "Lizbona"]
+    assert list(read_snapshot(path))[0] == _city("Kraków")
+    with open(path, encoding="utf-8") as f:
+        assert all(json.loads(line) is not None for line in f)
+
+
+def test_snapshot_keeps_last_duplicate_across_batches(tmp_path):
+    path = str(tmp_path / "destinations.snapshot")
+    writer = SnapshotWriter(path)
+    writer.write([_city("Kraków", cost_tier="low"), _city("Gdańsk")])
+    writer.write([_city("Kraków", cost_tier="high"), _city("Kraków", "Wenezuela")])
+    writer.close()
+
+    entries = list(read_snapshot(path))
+    assert writer.count == 3
+    assert [(e["name"], e["country"], e["cost_tier"]) for e in entries] == [
+        ("Gdańsk", "Polska", "medium"), ("Kraków", "Polska", "high"), ("Kraków", "Wenezuela", "medium"),
+    ]
+    assert not (tmp_path / "destinations.snapshot.tmp").exists()
+
+
+def test_pickled_snapshot_is_rejected(tmp_path):
+    path = tmp_path / "destinations.snapshot"
+    path.write_bytes(pickle.dumps({"format": 1, "fields": ("name",)}) + pickle.dumps([("Kraków",)]))
+    with pytest.raises(ValueError):
+        list(read_snapshot(str(path)))
+
+
+def test_aborted_snapshot_leaves_old_file(tmp_path):
+    path = str(tmp_path / "destinations.snapshot")
+    writer = SnapshotWriter(path)
+    writer.write([_city("Kraków")])
+    writer.close()
+
+    writer = SnapshotWriter(path)
+    writer.write([_city("Gdańsk")])
+    writer.abort()
+    assert [e["name"] for e in read_snapshot(path)] == ["Kraków"]
@@ -0,0 +1,53 @@
+# tests/test_forecast.py
+import math
+from app.forecast import DailySeries
+
+
+def _series(**columns):
+    daily = {"time": ["2026-01-01", "2026-01-02"]}
+    daily.update(columns)
+    return DailySeries(daily)
+
+
+def test_missing_and_non_finite_values_are_skipped():
+    series = _series(
+        temperature_2m_min=[math.inf, None],
+        temperature_2m_max=[math.nan, 4.6],
+        precipitation_sum=[-math.inf, 1.25],
+        windspeed_10m_max=[10 ** 400, "?"],
+        weathercode=[math.inf, 61],
+    )
+    series.description = "Pochmurno"
+    first, second = series.to_dicts()
+    assert first == {"date": "2026-01-01", "opis": "Pochmurno"}
+    assert second["temperatura_max"] == 5
+    assert second["opad_mm"] == 1.2
+    assert second["weathercode"] == 61
+    assert "temperatura_min" not in second and "wiatr_kmh" not in second
+
+
+def test_cache_rows_round_trip():
+    series = _series(
+        temperature_2m_min=[-1.4, None],
+        temperature_2m_max=[4.0, math.inf],
+        precipitation_sum=[0.0, 2.5],
+        windspeed_10m_max=[12.3, 7.0],
+        weathercode=[3, None],
+    )
+    rows = {series.dates[i]: series.row(i) for i in range(len(series))}
+    assert rows["2026-01-02"] == [None, None, 2.5, 7.0, None]
+
+    restored = DailySeries.from_cache(["2026-01-01", "2026-01-02", "2026-01-03"], rows)
+    assert restored.dates == series.dates
+    assert restored.to_dicts() == series.to_dicts()
+
+
+def test_from_cache_skips_unavailable_and_reads_old_dict_entries():
+    payloads = {
+        "2026-01-01": {"date": "2026-01-01", "temperatura_min": -2, "temperatura_max": 3, "weathercode": 0},
+        "2026-01-02": {"date": "2026-01-02", "unavailable": True},
+    }
+    series = DailySeries.from_cache(["2026-01-01", "2026-01-02"], payloads)
+    assert series.dates == ["2026-01-01"]
+    assert series.day_dict(0)["temperatura_max"] == 3
+    assert series.day_dict(0)["opis"] == "Bezchmurnie"
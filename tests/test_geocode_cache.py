@@ -0,0 +1,65 @@
+# tests/test_geocode_cache.py
+from app import api_clients, cache
+
+
+def test_positive_entry_lives_for_geocode_ttl(app, clock):
+    frozen = clock(cache)
+    app.config["GEOCODE_CACHE_TTL"] = 3600
+    cache.geocode_cache_put("Kraków, Polska", {"lat": 50.06, "lon": 19.94}, provider="geoapify")
+
+    # Klucz nie zależy od wielkości liter i białych znaków
+    assert cache.geocode_cache_get("  kraków,   POLSKA ") == (True, {"lat": 50.06, "lon": 19.94})
+    frozen.advance(seconds=3599)
+    assert cache.geocode_cache_get("Kraków, Polska")[0] is True
+    frozen.advance(seconds=1)
+    assert cache.geocode_cache_get("Kraków, Polska") == (False, None)
+
+
+def test_negative_entry_uses_short_ttl(app, clock):
+    frozen = clock(cache)
+    app.config["GEOCODE_NEGATIVE_CACHE_TTL"] = 600
+    cache.geocode_cache_put("Nieistniejące", None)
+
+    assert cache.geocode_cache_get("Nieistniejące") == (True, None)
+    frozen.advance(seconds=600)
+    assert cache.geocode_cache_get("Nieistniejące") == (False, None)
+
+
+def test_put_overwrites_existing_entry(app):
+    cache.geocode_cache_put("Lyon", None)
+    cache.geocode_cache_put("Lyon", {"lat": 45.76, "lon": 4.83})
+    assert cache.geocode_cache_get("Lyon") == (True, {"lat": 45.76, "lon": 4.83})
+    assert cache.invalidate_geocode_cache("lyon") == 1
+    assert cache.geocode_cache_get("Lyon") == (False, None)
+
+
+def test_get_coordinates_hits_remote_once(app, monkeypatch):
+    calls = []
+
+    def remote(city, country):
+        calls.append((city, country))
+        return {"lat": 1.0, "lon": 2.0}, "geoapify", True
+
+    monkeypatch.setattr(api_clients, "local_geocode", lambda city, country=None: None)
+    monkeypatch.setattr(api_clients, "_geocode_remote", remote)
+
+    assert api_clients.get_coordinates_for_city("Gdzieś", "Polska") == {"lat": 1.0, "lon": 2.0}
+    assert api_clients.get_coordinates_for_city("Gdzieś", "Polska") == {"lat": 1.0, "lon": 2.0}
+    assert calls == [("Gdzieś", "Polska")]
+
+
+def test_network_error_is_not_cached(app, monkeypatch):
+    calls = []
+
+    def remote(city, country):
+        calls.append(city)
+        # definitive=False: błąd sieci, a nie "brak wyników"
+        return None, None, False
+
+    monkeypatch.setattr(api_clients, "local_geocode", lambda city, country=None: None)
+    monkeypatch.setattr(api_clients, "_geocode_remote", remote)
+
+    assert api_clients.get_coordinates_for_city("Offline") is None
+    assert api_clients.get_coordinates_for_city("Offline") is None
+    assert len(calls) == 2
+    assert cache.geocode_cache_get("Offline") == (False, None)
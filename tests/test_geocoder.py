@@ -0,0 +1,87 @@
+# tests/test_geocoder.py
+from types import SimpleNamespace
+import pytest
+from sqlalchemy.exc import OperationalError
+from app import db, geocoder
+from app.geocoder import LocalGeocoder
+from app.models import City, Country
+
+PLACES = [
+    {"name": "Paryż", "country": "Francja", "lat": 48.86, "lon": 2.35},
+    {"name": "Kraków", "country": "Polska", "lat": 50.06, "lon": 19.94},
+    {"name": "Walencja", "country": "Hiszpania", "lat": 39.47, "lon": -0.38},
+    {"name": "Walencja", "country": "Wenezuela", "lat": 10.16, "lon": -68.0},
+]
+
+
+def test_lookup_by_name_and_country():
+    geocoder = LocalGeocoder(PLACES)
+    assert geocoder.lookup("Krakow") == {"lat": 50.06, "lon": 19.94}
+    assert geocoder.lookup("Kraków, Polska") == {"lat": 50.06, "lon": 19.94}
+    assert geocoder.lookup("Walencja", "Wenezuela") == {"lat": 10.16, "lon": -68.0}
+
+
+def test_ambiguous_name_without_country_is_none():
+    assert LocalGeocoder(PLACES).lookup("Walencja") is None
+
+
+def test_country_mismatch_is_none():
+    geocoder = LocalGeocoder(PLACES)
+    # Paryż w Teksasie nie może dostać współrzędnych Paryża we Francji
+    assert geocoder.lookup("Paryż, Texas, Stany Zjednoczone") is None
+    assert geocoder.lookup("Paryż", "Stany Zjednoczone") is None
+    assert geocoder.lookup("Nieznane") is None
+
+
+def test_lookup_by_alias():
+    geocoder = LocalGeocoder([{**PLACES[0], "aliases": ["Paris"]}, PLACES[1]])
+    assert geocoder.lookup("paris") == {"lat": 48.86, "lon": 2.35}
+    assert geocoder.lookup("Paris", "Francja") == {"lat": 48.86, "lon": 2.35}
+    assert geocoder.lookup("Paris", "Stany Zjednoczone") is None
+
+
+@pytest.fixture
+def catalog_cities(app, monkeypatch):
+    monkeypatch.setattr(geocoder, "_geocoder", None)
+    monkeypatch.setattr(geocoder, "_geocoder_retry_at", 0.0)
+    monkeypatch.setattr(geocoder, "get_catalog", lambda: SimpleNamespace(version=("v1",)))
+    app.config["LOCAL_GEOCODER_REFRESH_SECONDS"] = 600
+    app.config["LOCAL_GEOCODER_RETRY_SECONDS"] = 30
+    now = [1000.0]
+    monkeypatch.setattr(geocoder.time, "monotonic", lambda: now[0])
+
+    france = Country(name="Francja")
+    db.session.add(france)
+    db.session.flush()
+    db.session.add(City(name="Paryż", country_id=france.id, lat=48.86, lon=2.35))
+    db.session.commit()
+    return now
+
+
+def test_catalog_cities_get_aliases_from_data_file(catalog_cities):
+    assert geocoder.local_geocode("Paris", "Francja") == {"lat": 48.86, "lon": 2.35}
+    assert geocoder.local_geocode("Paryz") == {"lat": 48.86, "lon": 2.35}
+
+
+def test_failed_rebuild_keeps_previous_index_and_retries(catalog_cities, monkeypatch):
+    built = geocoder.get_local_geocoder()
+    working = geocoder._load_catalog_entries
+    calls = []
+
+    def broken():
+        calls.append(1)
+        raise OperationalError("SELECT cities", {}, Exception("database is locked"))
+
+    monkeypatch.setattr(geocoder, "_load_catalog_entries", broken)
+    # Przebudowa po LOCAL_GEOCODER_REFRESH_SECONDS nie udaje się - zostaje poprzedni indeks
+    catalog_cities[0] += 600
+    assert geocoder.get_local_geocoder() is built
+    assert geocoder.local_geocode("Paryż") == {"lat": 48.86, "lon": 2.35}
+    # Do LOCAL_GEOCODER_RETRY_SECONDS nie pytamy bazy ponownie
+    catalog_cities[0] += 29
+    geocoder.get_local_geocoder()
+    assert len(calls) == 1
+
+    monkeypatch.setattr(geocoder, "_load_catalog_entries", working)
+    catalog_cities[0] += 1
+    assert geocoder.get_local_geocoder() is not built
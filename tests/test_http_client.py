@@ -0,0 +1,56 @@
+# tests/test_http_client.py
+import pytest
+from urllib3.exceptions import MaxRetryError, NewConnectionError, ReadTimeoutError
+from app.http_client import GOOGLE_PLACES, OPEN_METEO, RETRY_STATUSES, UpstreamHTTP
+
+CONFIG = {
+    "UPSTREAM_POOL_CONNECTIONS": 3,
+    "UPSTREAM_POOL_MAXSIZE": 7,
+    "UPSTREAM_MAX_RETRIES": 2,
+    "UPSTREAM_CONNECT_TIMEOUT": 1.5,
+    "UPSTREAM_TIMEOUTS": {OPEN_METEO: 8, GOOGLE_PLACES: 20},
+    "UPSTREAM_ADAPTIVE_TIMEOUTS": False,
+}
+
+
+@pytest.fixture
+def http():
+    http = UpstreamHTTP(CONFIG)
+    yield http
+    http.close()
+
+
+def _adapter(http, upstream=OPEN_METEO):
+    return http.session(upstream).get_adapter("https://api.open-meteo.com")
+
+
+def test_pool_size_comes_from_config(http):
+    adapter = _adapter(http)
+    assert adapter._pool_connections == 3
+    assert adapter._pool_maxsize == 7
+    # Jedna sesja (i pula) na upstream
+    assert http.session(OPEN_METEO) is http.session(OPEN_METEO)
+    assert http.session(GOOGLE_PLACES) is not http.session(OPEN_METEO)
+
+
+def test_retries_connect_errors_and_retry_statuses_only(http):
+    retry = _adapter(http).max_retries
+    assert retry.connect == 2 and retry.status == 2 and retry.read == 0
+    for status in RETRY_STATUSES:
+        assert retry.is_retry("GET", status)
+    assert not retry.is_retry("GET", 404)
+    assert not retry.is_retry("POST", 503)
+
+    # Błąd połączenia - kolejna próba; timeout odczytu - koniec bez ponawiania
+    after_connect_error = retry.increment("GET", "/", error=NewConnectionError(None, "refused"))
+    assert after_connect_error.connect == 1
+    with pytest.raises(MaxRetryError):
+        retry.increment("GET", "/", error=ReadTimeoutError(None, "/", "read timed out"))
+
+
+def test_timeouts_come_from_config(http):
+    assert http.timeout(OPEN_METEO) == (1.5, 8)
+    assert http.timeout(GOOGLE_PLACES) == (1.5, 20)
+    # Nieznany upstream - domyślnie 10 s; override zastępuje górną granicę z konfiguracji
+    assert http.timeout("inne") == (1.5, 10)
+    assert http.timeout(GOOGLE_PLACES, override=1.0) == (1.0, 1.0)
@@ -0,0 +1,58 @@
+# tests/test_itinerary.py
+import math
+import random
+import pytest
+from app.itinerary import build_itinerary
+
+CENTER = {"lat": 50.0614, "lon": 19.9366}
+
+
+def _attractions(n: int, seed: int = 1, spread: float = 0.05) -> list[dict]:
+    rng = random.Random(seed)
+    return [
+        {"name": f"A{i}", "lat": CENTER["lat"] + rng.uniform(-spread, spread), "lon": CENTER["lon"] + rng.uniform(-spread, spread)}
+        for i in range(n)
+    ]
+
+
+def _check_balanced(itinerary, n: int, days: int):
+    stops = [i for day in itinerary for i in day["stops"]]
+    assert sorted(stops) == list(range(n))
+    assert all(len(day["stops"]) <= math.ceil(n / days) for day in itinerary)
+
+
+@pytest.mark.parametrize("n, days", [(12, 3), (10, 3), (7, 7), (5, 2), (13, 4)])
+def test_days_are_balanced_and_every_stop_is_used_once(app, n, days):
+    itinerary = build_itinerary(_attractions(n, seed=n), days, center=CENTER, start_date="2026-05-01")
+    assert [d["day"] for d in itinerary] == list(range(1, days + 1))
+    assert itinerary[0]["date"] == "2026-05-01"
+    _check_balanced(itinerary, n, days)
+
+
+def test_more_days_than_attractions(app):
+    itinerary = build_itinerary(_attractions(3), 5, center=CENTER)
+    assert len(itinerary) == 3
+    assert all(len(d["stops"]) == 1 for d in itinerary)
+
+
+def test_distant_groups_go_to_separate_days(app):
+    near = _attractions(4, seed=2, spread=0.01)
+    far = [{"name": f"F{i}", "lat": a["lat"] + 1.0, "lon": a["lon"] + 1.0} for i, a in enumerate(_attractions(4, seed=3, spread=0.01))]
+    itinerary = build_itinerary(near + far, 2, center=CENTER)
+    assert [sorted(d["stops"]) for d in itinerary] == [[0, 1, 2, 3], [4, 5, 6, 7]]
+
+
+def test_unlocated_and_identical_points(app):
+    attractions = [{"name": "Bez współrzędnych"}] * 3 + [{"name": "X", **CENTER}] * 5
+    itinerary = build_itinerary(attractions, 3)
+    _check_balanced(itinerary, 8, 3)
+
+
+def test_balanced_even_without_time_budget(app):
+    app.config["ITINERARY_TIME_BUDGET_MS"] = 0
+    _check_balanced(build_itinerary(_attractions(20, seed=9), 4, center=CENTER), 20, 4)
+
+
+def test_empty_input(app):
+    assert build_itinerary([], 3) == []
+    assert build_itinerary(_attractions(2), 0) == []
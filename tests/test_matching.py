@@ -0,0 +1,64 @@
+# tests/test_matching.py
+import pytest
+from rapidfuzz import fuzz
+from app.matching import CityMatcher
+from app.utils import fold_text, normalize_city_name
+from app.catalog import DestinationCatalog
+
+ENTRIES = [
+    {"name": "Kraków", "country": "Polska", "tags": ["city"]},
+    {"name": "Gdańsk", "country": "Polska", "tags": ["beach"]},
+    {"name": "Gdynia", "country": "Polska", "tags": ["beach"]},
+    {"name": "Lisbon", "country": "Portugalia", "tags": ["city"]},
+    {"name": "Rzym", "country": "Włochy", "tags": ["city"]},
+    {"name": "Rzym", "country": "Polska", "tags": ["nature"]},
+]
+
+
+@pytest.fixture
+def matcher():
+    return CityMatcher(ENTRIES)
+
+
+def _names(results):
+    return [(entry["name"], entry["country"]) for entry, _ in results]
+
+
+def test_typo_above_threshold_matches(matcher):
+    (entry, score), = matcher.search("krakuw", limit=1, score_cutoff=75)
+    assert entry["name"] == "Kraków"
+    assert score == pytest.approx(fuzz.token_sort_ratio("krakuw", "krakow"))
+
+
+def test_threshold_boundary(matcher):
+    score = fuzz.token_sort_ratio("lizbona", "lisbon")
+    assert _names(matcher.search("lizbona", limit=1, score_cutoff=score - 0.01)) == [("Lisbon", "Portugalia")]
+    assert matcher.search("lizbona", limit=1, score_cutoff=score + 0.01) == []
+
+
+def test_dissimilar_names_stay_below_threshold(matcher):
+    # Gdańsk i Gdynia mają wspólne trigramy, ale wynik 50 < 75
+    assert _names(matcher.search("gdynia", limit=5, score_cutoff=75)) == [("Gdynia", "Polska")]
+
+
+def test_candidates_need_a_third_of_query_trigrams(matcher):
+    assert len(matcher.candidates(fold_text("zzzzzz"))) == 0
+    ids = matcher.candidates(fold_text("krakow"))
+    assert [ENTRIES[i]["name"] for i in ids] == ["Kraków"]
+
+
+def test_short_query_scans_whole_catalog(matcher):
+    # "rz" ma mniej niż trzy znaki - bez blockingu po trigramach
+    assert {entry["name"] for entry, _ in matcher.search("rz", limit=10)} >= {"Rzym"}
+
+
+def test_country_in_query_moves_its_cities_first(matcher):
+    assert _names(matcher.search("Rzym, Polska", limit=2)) == [("Rzym", "Polska"), ("Rzym", "Włochy")]
+    assert _names(matcher.search("Rzym", limit=2, country="Włochy"))[0] == ("Rzym", "Włochy")
+
+
+def test_normalize_city_name_threshold(app):
+    catalog = DestinationCatalog([dict(e, cost_tier="medium") for e in ENTRIES])
+    assert normalize_city_name("Lizbona", catalog, threshold=75)["name"] == "Lisbon"
+    assert normalize_city_name("Lizbona", catalog, threshold=80) is None
+    assert normalize_city_name("", catalog) is None
@@ -0,0 +1,106 @@
+# tests/test_my_plans.py
+"""Lista "Moje plany": stronicowanie kursorem (created_at, id), także przy identycznych datach."""
+from contextlib import contextmanager
+from datetime import datetime
+import pytest
+from flask import template_rendered
+from app import db
+from app.models import GeneratedPlan, User
+
+
+@contextmanager
+def _captured_context(app):
+    """Kontekst szablonu wyrenderowanego w trakcie żądania."""
+    rendered = {}
+
+    def record(sender, template, context, **extra):
+        rendered.update(context)
+
+    template_rendered.connect(record, app)
+    try:
+        yield rendered
+    finally:
+        template_rendered.disconnect(record, app)
+
+
+def _user(email: str) -> User:
+    user = User(email=email)
+    user.set_password("haslo")
+    db.session.add(user)
+    db.session.flush()
+    return user
+
+
+def _plan(user: User, created_at: datetime, city: str = "Kraków") -> GeneratedPlan:
+    plan = GeneratedPlan(city=city, country="Polska", days=3, travel_style="standard",
+                         created_at=created_at, user_id=user.id)
+    db.session.add(plan)
+    return plan
+
+
+@pytest.fixture
+def logged_in(app, client):
+    user = _user("jan@example.com")
+    db.session.commit()
+    with client.session_transaction() as session:
+        session["_user_id"] = str(user.id)
+        session["_fresh"] = True
+    return user
+
+
+def _page(app, client, after=None):
+    with _captured_context(app) as context:
+        response = client.get("/my-plans", query_string={"after": after} if after else None)
+    assert response.status_code == 200
+    return [plan.id for plan in context["plans"]], context["next_cursor"], context["is_first_page"]
+
+
+def test_pages_cover_plans_with_identical_created_at_once_and_in_order(app, client, logged_in):
+    app.config["MY_PLANS_PAGE_SIZE"] = 2
+    same = datetime(2026, 3, 1, 10, 0, 0)
+    plans = [_plan(logged_in, same) for _ in range(5)] + [_plan(logged_in, datetime(2026, 2, 1))]
+    db.session.commit()
+
+    seen, cursor, pages = [], None, 0
+    while True:
+        ids, cursor, is_first_page = _page(app, client, cursor)
+        assert is_first_page == (pages == 0)
+        seen.extend(ids)
+        pages += 1
+        if cursor is None:
+            break
+
+    # Przy tej samej dacie kolejność rozstrzyga id (malejąco); nic się nie powtarza ani nie ginie
+    expected = [p.id for p in sorted(plans, key=lambda p: (p.created_at, p.id), reverse=True)]
+    assert seen == expected
+    assert pages == 3
+
+
+def test_lists_only_current_users_plans(app, client, logged_in):
+    other = _user("anna@example.com")
+    mine = _plan(logged_in, datetime(2026, 3, 1))
+    _plan(other, datetime(2026, 3, 2), city="Gdańsk")
+    db.session.commit()
+
+    ids, cursor, _ = _page(app, client)
+    assert ids == [mine.id]
+    assert cursor is None
+
+
+@pytest.mark.parametrize("cursor", ["bez-daty", "2026-03-01T10:00:00_x", "_"])
+def test_invalid_cursor_shows_first_page(app, client, logged_in, cursor):
+    plan = _plan(logged_in, datetime(2026, 3, 1))
+    db.session.commit()
+
+    ids, _, is_first_page = _page(app, client, cursor)
+    assert ids == [plan.id]
+    assert is_first_page
+
+
+def test_created_at_is_required(app):
+    user = _user("ola@example.com")
+    db.session.add(GeneratedPlan(city="Kraków", days=1, travel_style="standard", user_id=user.id))
+    db.session.commit()
+    # Domyślna data z modelu - kursor zawsze ma z czego powstać
+    assert GeneratedPlan.query.one().created_at is not None
+    assert GeneratedPlan.__table__.c.created_at.nullable is False
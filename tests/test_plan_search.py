@@ -0,0 +1,105 @@
+# tests/test_plan_search.py
+"""Wyszukiwanie w planach: zapytanie json_each na SQLite i operator @> (JSONB) w SQL PostgreSQL."""
+from datetime import datetime
+from sqlalchemy.dialects import postgresql
+from app import db
+from app.models import GeneratedPlan, User
+from app.plan_search import _contains_attraction, attraction_type_labels, search_plans
+
+
+def _user(email: str) -> User:
+    user = User(email=email)
+    user.set_password("haslo")
+    db.session.add(user)
+    db.session.flush()
+    return user
+
+
+def _plan(user: User, city: str, country: str, attractions: list, day: int) -> GeneratedPlan:
+    plan = GeneratedPlan(city=city, country=country, days=2, travel_style="standard",
+                         attractions_data=attractions, created_at=datetime(2026, 3, day), user_id=user.id)
+    db.session.add(plan)
+    return plan
+
+
+def _plans(app):
+    user, other = _user("jan@example.com"), _user("anna@example.com")
+    krakow = _plan(user, "Kraków", "Polska", [
+        {"name": "Muzeum Narodowe", "types": ["Muzeum", "Atrakcja turystyczna"]},
+        {"name": "Wawel", "types": ["Atrakcja turystyczna"]},
+    ], day=1)
+    rome = _plan(user, "Rzym", "Włochy", [
+        {"name": "Muzea Watykańskie", "types": ["Muzeum"]},
+    ], day=2)
+    gdansk = _plan(user, "Gdańsk", "Polska", [
+        {"name": "Molo", "types": ["Rope bridge"]},
+    ], day=3)
+    # Plan innego użytkownika z muzeum - nie może trafić do wyników
+    _plan(other, "Paryż", "Francja", [{"name": "Luwr", "types": ["Muzeum"]}], day=4)
+    db.session.commit()
+    return user, krakow, rome, gdansk
+
+
+def _ids(plans):
+    return [plan.id for plan in plans]
+
+
+def test_attraction_type_labels_accept_google_key_and_polish_name():
+    assert "Muzeum" in attraction_type_labels("museum")
+    assert "Muzeum" in attraction_type_labels(" muzeum ")
+    # Rodzaj bez tłumaczenia - tak, jak zapisuje go _parse_place_data
+    assert "Rope bridge" in attraction_type_labels("rope_bridge")
+
+
+def test_search_by_type_on_sqlite(app):
+    user, krakow, rome, _ = _plans(app)
+    assert _ids(search_plans(user.id, attraction_type="museum")) == [rome.id, krakow.id]
+    assert _ids(search_plans(user.id, attraction_type="Muzeum")) == [rome.id, krakow.id]
+
+
+def test_search_by_untranslated_type_on_sqlite(app):
+    user, _, _, gdansk = _plans(app)
+    assert _ids(search_plans(user.id, attraction_type="rope_bridge")) == [gdansk.id]
+
+
+def test_search_by_name_and_country_on_sqlite(app):
+    user, krakow, rome, gdansk = _plans(app)
+    assert _ids(search_plans(user.id, attraction_name="Wawel")) == [krakow.id]
+    assert _ids(search_plans(user.id, attraction_name="Wawe")) == []
+    assert _ids(search_plans(user.id, country=" polska ")) == [gdansk.id, krakow.id]
+    assert _ids(search_plans(user.id, attraction_type="muzeum", country="Polska")) == [krakow.id]
+
+
+def test_search_is_scoped_to_user(app):
+    user, *_ = _plans(app)
+    other = User.query.filter_by(email="anna@example.com").one()
+    assert "Paryż" not in [plan.city for plan in search_plans(user.id, attraction_type="muzeum")]
+    assert [plan.city for plan in search_plans(other.id, attraction_type="muzeum")] == ["Paryż"]
+
+
+def test_plans_without_attractions_do_not_match(app):
+    user = _user("ola@example.com")
+    _plan(user, "Łódź", "Polska", None, day=1)
+    _plan(user, "Poznań", "Polska", [], day=2)
+    db.session.commit()
+    assert search_plans(user.id, attraction_type="muzeum") == []
+    assert len(search_plans(user.id, country="Polska")) == 2
+
+
+def _postgres_sql(condition):
+    compiled = condition.compile(dialect=postgresql.dialect())
+    return str(compiled), list(compiled.params.values())
+
+
+def test_postgres_type_search_uses_jsonb_containment():
+    sql, params = _postgres_sql(_contains_attraction("postgresql", types=["Muzeum", "Museum"]))
+    # Każda etykieta osobnym @> (indeks GIN jsonb_path_ops), bez json_each i LIKE
+    assert sql.count("generated_plans.attractions_data @>") == 2
+    assert "json_each" not in sql and "LIKE" not in sql
+    assert params == [[{"types": ["Muzeum"]}], [{"types": ["Museum"]}]]
+
+
+def test_postgres_name_search_uses_jsonb_containment():
+    sql, params = _postgres_sql(_contains_attraction("postgresql", name="Wawel"))
+    assert "generated_plans.attractions_data @>" in sql
+    assert params == [[{"name": "Wawel"}]]
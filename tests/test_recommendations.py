@@ -0,0 +1,126 @@
+# tests/test_recommendations.py
+import random
+import numpy as np
+from app.catalog import DestinationCatalog
+from app.recommendations import (
+    SCORE_SCALE, _pick_diverse, get_grouped_recommendations, recommend_city, score_cities,
+)
+
+
+def _entry(name, country, tags, cost_multiplier=1.0, cost_tier="medium"):
+    return {"name": name, "country": country, "tags": tags, "cost_tier": cost_tier, "cost_multiplier": cost_multiplier}
+
+
+# Miasta o identycznych tagach i kosztach - ten sam wynik, kolejność rozstrzyga tylko skrót nazwy
+TIED = [_entry(f"Miasto {i}", f"Kraj {i % 3}", ["beach"]) for i in range(12)]
+
+
+def _names(entries):
+    return [e["name"] for e in entries]
+
+
+def test_tied_scores_have_distinct_keys():
+    catalog = DestinationCatalog(TIED)
+    indices, keys = score_cities(["beach"], catalog, "Standardowy")
+    assert len(set((keys >> 32).tolist())) == 1
+    assert len(set(keys.tolist())) == len(indices)
+
+
+def test_tie_break_does_not_depend_on_catalog_order():
+    shuffled = TIED[:]
+    random.Random(7).shuffle(shuffled)
+    first = get_grouped_recommendations(["beach"], DestinationCatalog(TIED), "Standardowy")
+    second = get_grouped_recommendations(["beach"], DestinationCatalog(shuffled), "Standardowy")
+    assert list(first) == list(second)
+    assert {c: _names(v) for c, v in first.items()} == {c: _names(v) for c, v in second.items()}
+    assert recommend_city(["beach"], DestinationCatalog(TIED)) == recommend_city(["beach"], DestinationCatalog(shuffled))
+
+
+def test_tie_break_depends_on_query():
+    catalog = DestinationCatalog(TIED)
+    _, economy = score_cities(["beach"], catalog, "Ekonomiczny")
+    _, standard = score_cities(["beach"], catalog, "Standardowy")
+    # Inne ziarno zapytania - inna (ale stała) kolejność remisów
+    assert np.argsort(economy).tolist() != np.argsort(standard).tolist()
+
+
+def test_score_beats_tie_break():
+    catalog = DestinationCatalog(TIED + [_entry("Tanie", "Kraj 9", ["beach"], cost_multiplier=0.5),
+                                         _entry("Drogie", "Kraj 9", ["beach"], cost_multiplier=3.0)])
+    indices, keys = score_cities(["beach"], catalog, "Ekonomiczny")
+    ranked = [catalog.entries[indices[i]]["name"] for i in np.argsort(-keys)]
+    assert ranked[-1] == "Drogie"
+    assert recommend_city(["beach"], catalog, "Ekonomiczny")["name"] != "Drogie"
+
+
+def test_limits_on_countries_and_cities():
+    catalog = DestinationCatalog([_entry(f"M{i}", f"K{i % 5}", ["city"]) for i in range(30)])
+    result = get_grouped_recommendations(["city"], catalog, "Standardowy", max_countries=3, max_cities=2)
+    assert len(result) == 3
+    assert all(len(cities) == 2 for cities in result.values())
+
+
+def test_pick_diverse_penalises_repeated_tag_profile():
+    entries = [
+        _entry("A", "Kraj", ["beach", "city"]),
+        _entry("B", "Kraj", ["beach", "city"]),
+        _entry("C", "Kraj", ["beach", "nature"]),
+    ]
+    catalog = DestinationCatalog(entries)
+    indices = np.arange(3)
+    # B minimalnie gorsze od A, C wyraźnie gorsze - ale kara za powtórzony zestaw tagów jest większa
+    keys = np.array([100, 99, 90], dtype=np.int64) * (SCORE_SCALE // 1000) << 32
+    assert _names(catalog.entries[i] for i in _pick_diverse(catalog, indices, keys, 2)) == ["A", "C"]
+    assert _names(catalog.entries[i] for i in _pick_diverse(catalog, indices, keys, 3)) == ["A", "C", "B"]
+
+
+def _climate_catalog():
+    from app.climate import CLIMATE_VARIABLES, CatalogClimate, PRECIP, SUNSHINE, TEMP
+
+    entries = [_entry("Północ", "Kraj A", ["beach_sun"]), _entry("Południe", "Kraj B", ["beach_sun"])]
+    catalog = DestinationCatalog(entries)
+    values = np.zeros((2, 12, len(CLIMATE_VARIABLES)), dtype=np.float32)
+    # Północ ciepła tylko w lipcu, Południe cały rok
+    values[:, :, TEMP] = [[0.0] * 6 + [26.0] + [0.0] * 5, [27.0] * 12]
+    values[:, :, PRECIP] = 1.0
+    values[:, :, SUNSHINE] = 10.0
+    rows = np.array([0 if e["name"] == "Północ" else 1 for e in catalog.entries], dtype=np.int32)
+    catalog.climate = CatalogClimate(values, rows)
+    return catalog
+
+
+def test_month_suggestions_fall_back_to_ranking_until_precomputed():
+    from app.recommendations import precompute_monthly_suggestions
+
+    catalog = _climate_catalog()
+    # Sugestie miesięcy jeszcze niepoliczone - wynik liczony od razu, nic nie jest zapisywane
+    january = get_grouped_recommendations(["beach_sun"], catalog, "Standardowy", "2026-01-10", "2026-01-14")
+    assert list(january) == ["Kraj B"]
+    assert catalog.monthly_suggestions == {}
+
+    precompute_monthly_suggestions(catalog)
+    assert sorted(catalog.monthly_suggestions) == list(range(1, 13))
+    cached = get_grouped_recommendations(["beach_sun"], catalog, "Standardowy", "2026-01-10", "2026-01-14")
+    assert cached == january
+    assert cached is catalog.monthly_suggestions[1][(frozenset(["beach_sun"]), "Standardowy", 1)]
+    july = get_grouped_recommendations(["beach_sun"], catalog, "Standardowy", "2026-07-10", "2026-07-14")
+    assert set(july) == {"Kraj A", "Kraj B"}
+    # Gotowe zestawy bez miesiąca nie są modyfikowane
+    assert catalog.suggestions == {}
+
+
+def test_catalog_with_climate_schedules_month_suggestions(app, monkeypatch):
+    from app import catalog as catalog_module
+    from app.recommendations import precompute_monthly_suggestions
+
+    climate = _climate_catalog().climate
+    monkeypatch.setattr(catalog_module, "_catalog", None)
+    monkeypatch.setattr(catalog_module, "_next_check_at", 0.0)
+    monkeypatch.setattr(catalog_module, "_current_version", lambda: ("v1",))
+    monkeypatch.setattr(catalog_module, "_load_entries", lambda: [_entry("Północ", "Kraj A", ["beach_sun"])])
+    monkeypatch.setattr(catalog_module, "load_catalog_climate", lambda entries: climate)
+    submitted = []
+    monkeypatch.setattr(catalog_module, "submit_background", lambda fn, *args: submitted.append((fn, args)))
+
+    catalog = catalog_module.get_catalog()
+    assert submitted == [(precompute_monthly_suggestions, (catalog,))]
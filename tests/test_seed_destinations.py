@@ -0,0 +1,87 @@
+# tests/test_seed_destinations.py
+import json
+import pytest
+from app import db
+from app.catalog import DESTINATIONS_DATA
+from app.countries import COUNTRIES_DATA
+from app.models import City, Country, DataVersion
+from scripts.seed_destinations import import_destinations
+
+RECORDS = [
+    {"name": "Kraków", "country": "Polska", "tags": ["city_break"], "cost_tier": "medium", "cost_multiplier": 1.0},
+    {"name": "Gdańsk", "country": "Polska", "tags": ["beach_sun"], "cost_tier": "medium"},
+    {"name": "Kabul", "country": "Afganistan", "tags": ["history_culture"], "cost_tier": "low"},
+    {"name": "Lizbona", "country": "Portugalia", "tags": ["city_break", "beach_sun"], "cost_tier": "medium"},
+]
+
+
+@pytest.fixture
+def source(app, tmp_path):
+    app.config["CATALOG_SNAPSHOT_PATH"] = str(tmp_path / "destinations.snapshot")
+
+    def write(records, name="destinations.json"):
+        path = tmp_path / name
+        path.write_text(json.dumps(records, ensure_ascii=False), encoding="utf-8")
+        return str(path)
+
+    return write
+
+
+def _rows():
+    cities = {(c.country.name, c.name): (c.id, c.tags, c.cost_tier, c.lat) for c in City.query.all()}
+    countries = {c.name: (c.id, c.danger) for c in Country.query.all()}
+    return cities, countries
+
+
+def test_second_import_changes_nothing(source):
+    path = source(RECORDS)
+    first = import_destinations(path, batch_size=2)
+    assert (first["cities_added"], first["countries_added"]) == (4, 3)
+    before = _rows()
+    assert before[1]["Afganistan"][1] is True
+
+    second = import_destinations(path, batch_size=3)
+    assert (second["cities_added"], second["countries_added"], second["countries_updated"]) == (0, 0, 0)
+    assert second["cities_total"] == 4
+    assert _rows() == before
+    assert DataVersion.current(DESTINATIONS_DATA) == 2
+    # Kraje się nie zmieniły - ich wersja zostaje
+    assert DataVersion.current(COUNTRIES_DATA) == 1
+
+
+def test_reimport_updates_attributes_but_keeps_coordinates(source):
+    import_destinations(source(RECORDS))
+    krakow = City.query.filter_by(name="Kraków").one()
+    krakow.lat, krakow.lon = 50.06, 19.94
+    db.session.commit()
+
+    changed = [dict(RECORDS[0], tags=["city_break", "nightlife_parties"], cost_tier="high")] + RECORDS[1:]
+    import_destinations(source(changed))
+    krakow = City.query.filter_by(name="Kraków").one()
+    assert krakow.tags == ["city_break", "nightlife_parties"]
+    assert krakow.cost_tier == "high"
+    assert (krakow.lat, krakow.lon) == (50.06, 19.94)
+    assert City.query.count() == 4
+
+
+def test_duplicates_and_invalid_records(source):
+    rejected = []
+    records = RECORDS + [dict(RECORDS[0], cost_tier="low"), {"name": "", "country": "Polska", "tags": ["city_break"]}]
+    result = import_destinations(source(records), batch_size=10, on_invalid=rejected.append)
+    assert City.query.count() == 4
+    assert len(rejected) == 1
+    # W obrębie partii wygrywa ostatni wpis
+    assert City.query.filter_by(name="Kraków").one().cost_tier == "low"
+    assert result["cities_total"] == 4
+
+
+def test_snapshot_has_each_city_once(source, app):
+    from app.destinations_import import read_snapshot
+
+    records = RECORDS + [dict(RECORDS[0], cost_tier="low")]
+    result = import_destinations(source(records), batch_size=2)
+    entries = list(read_snapshot(app.config["CATALOG_SNAPSHOT_PATH"]))
+    assert result["snapshot_count"] == len(entries) == City.query.count() == 4
+    # Jak w bazie - wygrywa ostatni wpis z pliku
+    krakow = [e for e in entries if e["name"] == "Kraków"]
+    assert [e["cost_tier"] for e in krakow] == ["low"] == [City.query.filter_by(name="Kraków").one().cost_tier]
@@ -0,0 +1,102 @@
+# tests/test_singleflight.py
+import threading
+import time
+import pytest
+from app.singleflight import SingleFlight, single_flight
+
+
+def _run_concurrently(app, n: int, target):
+    """
+    Uruchamia target() w n wątkach (każdy z kontekstem aplikacji), zwraca (wątki, [(wynik, wyjątek)]).
+    Wraca dopiero, gdy wszystkie wątki są gotowe do wywołania target().
+    """
+    results = [None] * n
+    ready = threading.Barrier(n + 1)
+
+    def worker(i):
+        with app.app_context():
+            ready.wait()
+            try:
+                results[i] = (target(), None)
+            except Exception as e:
+                results[i] = (None, e)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(n)]
+    for t in threads:
+        t.start()
+    ready.wait()
+    return threads, results
+
+
+def _release(started: threading.Event, release: threading.Event):
+    assert started.wait(5)
+    # Chwila, żeby pozostałe wątki zdążyły dołączyć do trwającego wywołania
+    time.sleep(0.1)
+    release.set()
+
+
+def test_concurrent_calls_share_one_execution(app):
+    group = SingleFlight()
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return {"temp": 21}
+
+    threads, results = _run_concurrently(app, 8, lambda: group.do("weather:krakow", fetch))
+    _release(started, release)
+    for t in threads:
+        t.join(5)
+
+    assert calls == [1]
+    assert all(result == {"temp": 21} and error is None for result, error in results)
+    # Wszyscy dostają ten sam (współdzielony) obiekt
+    assert len({id(result) for result, _ in results}) == 1
+
+
+def test_error_propagates_to_all_waiters(app):
+    group = SingleFlight()
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        raise TimeoutError("upstream")
+
+    threads, results = _run_concurrently(app, 5, lambda: group.do("k", fetch))
+    _release(started, release)
+    for t in threads:
+        t.join(5)
+
+    assert calls == [1]
+    errors = [error for _, error in results]
+    assert all(isinstance(e, TimeoutError) for e in errors)
+
+
+def test_finished_call_is_not_reused(app):
+    group = SingleFlight()
+    counter = iter(range(10))
+    assert group.do("k", lambda: next(counter)) == 0
+    assert group.do("k", lambda: next(counter)) == 1
+    # Po błędzie klucz też jest zwalniany
+    with pytest.raises(ValueError):
+        group.do("k", lambda: (_ for _ in ()).throw(ValueError()))
+    assert group.do("k", lambda: next(counter)) == 2
+
+
+def test_different_keys_run_independently(app):
+    group = SingleFlight()
+    assert group.do("a", lambda: "A") == "A"
+    assert group.do("b", lambda: "B") == "B"
+
+
+def test_cross_worker_lock_file(app, tmp_path):
+    app.config["SINGLEFLIGHT_CROSS_WORKER"] = True
+    app.instance_path = str(tmp_path)
+    assert single_flight("geocode", "krakow", lambda x: x * 2, 21) == 42
+    assert len(list((tmp_path / "locks").iterdir())) == 1
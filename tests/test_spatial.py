@@ -0,0 +1,66 @@
+# tests/test_spatial.py
+import random
+import numpy as np
+import pytest
+from app.spatial import SpatialIndex, haversine_km
+
+
+def _random_points(n: int, seed: int) -> list[dict]:
+    rng = random.Random(seed)
+    return [{"id": i, "lat": rng.uniform(-89.5, 89.5), "lon": rng.uniform(-180.0, 180.0)} for i in range(n)]
+
+
+def _brute_force(points, lat, lon, radius_km):
+    dist = haversine_km(lat, lon, np.array([p["lat"] for p in points]), np.array([p["lon"] for p in points]))
+    return sorted((float(d), p["id"]) for p, d in zip(points, dist) if d <= radius_km)
+
+
+def test_haversine_known_distance():
+    # Kraków - Warszawa ~252 km
+    assert haversine_km(50.0614, 19.9366, np.array([52.2297]), np.array([21.0122]))[0] == pytest.approx(252, abs=2)
+
+
+@pytest.mark.parametrize("lat, lon, radius_km", [
+    (50.06, 19.94, 300.0),
+    (0.0, 179.8, 500.0),     # antypołudnik
+    (-17.7, -179.9, 800.0),  # Fidżi, po drugiej stronie antypołudnika
+    (85.0, 10.0, 1500.0),    # blisko bieguna - komórki są wąskie
+    (-60.0, -70.0, 5000.0),
+])
+def test_within_matches_brute_force(lat, lon, radius_km):
+    points = _random_points(3000, seed=int(abs(lat * 100 + lon)))
+    index = SpatialIndex(points)
+    found = [(round(d, 6), p["id"]) for p, d in index.within(lat, lon, radius_km)]
+    expected = [(round(d, 6), i) for d, i in _brute_force(points, lat, lon, radius_km)]
+    assert sorted(found) == expected
+    # Wynik posortowany od najbliższego
+    assert [d for d, _ in found] == sorted(d for d, _ in found)
+
+
+def test_within_across_antimeridian():
+    index = SpatialIndex([
+        {"name": "Suva", "lat": -18.14, "lon": 178.44},
+        {"name": "Taveuni", "lat": -16.85, "lon": -179.97},
+        {"name": "Sydney", "lat": -33.87, "lon": 151.21},
+    ])
+    names = [p["name"] for p, _ in index.within(-17.5, 179.9, 300)]
+    assert sorted(names) == ["Suva", "Taveuni"]
+
+
+def test_nearest_matches_brute_force_and_respects_max_km():
+    points = _random_points(2000, seed=3)
+    index = SpatialIndex(points)
+    for lat, lon in [(10.0, 20.0), (-45.0, 179.5), (70.0, -100.0)]:
+        expected = _brute_force(points, lat, lon, float("inf"))[:5]
+        found = [(d, p["id"]) for p, d in index.nearest(lat, lon, 5)]
+        assert [i for _, i in found] == [i for _, i in expected]
+    limited = index.nearest(10.0, 20.0, 5, max_km=50)
+    assert all(d <= 50 for _, d in limited)
+
+
+def test_points_without_coordinates_and_empty_index():
+    index = SpatialIndex([{"lat": None, "lon": 1.0}, {"lat": 1.0}, {"lat": 1.0, "lon": 1.0}])
+    assert len(index) == 1
+    assert SpatialIndex([]).nearest(0.0, 0.0, 3) == []
+    assert SpatialIndex([]).within(0.0, 0.0, 100) == []
+    assert index.within(1.0, 1.0, 0.0, limit=1)[0][1] == 0.0
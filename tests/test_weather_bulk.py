@@ -0,0 +1,111 @@
+# tests/test_weather_bulk.py
+"""Zbiorcza pogoda dla strony sugestii: cache per komórka, paczki po 50 lokalizacji, mapowanie odpowiedzi."""
+import pytest
+from app import api_clients, services
+from app.api_clients import WEATHER_BULK_MAX_LOCATIONS, get_weather_bulk
+
+DAYS = ["2026-01-01", "2026-01-02"]
+
+
+class _Response:
+    def __init__(self, data):
+        self._data = data
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self._data
+
+
+def _forecast(lat: float) -> dict:
+    """Odpowiedź Open-Meteo dla jednej lokalizacji - temperatura zależy od szerokości, żeby sprawdzić mapowanie."""
+    return {
+        "current_weather": {"temperature": lat, "weathercode": 0, "windspeed": 5.0},
+        "daily": {
+            "time": DAYS,
+            "temperature_2m_min": [lat - 1] * len(DAYS),
+            "temperature_2m_max": [lat + 1] * len(DAYS),
+            "precipitation_sum": [0.0] * len(DAYS),
+            "windspeed_10m_max": [10.0] * len(DAYS),
+            "weathercode": [0] * len(DAYS),
+        },
+    }
+
+
+@pytest.fixture
+def open_meteo(app, monkeypatch):
+    """Podmienione upstream_get: zapisuje listy współrzędnych z każdego zapytania."""
+    app.config["WEATHER_GRID_DEG"] = 0.1
+    requests_made = []
+
+    def fake_get(upstream, url, params=None, timeout=None):
+        lats = [float(v) for v in str(params["latitude"]).split(",")]
+        requests_made.append(lats)
+        forecasts = [_forecast(lat) for lat in lats]
+        # Dla jednej lokalizacji Open-Meteo zwraca obiekt, dla wielu - listę
+        return _Response(forecasts[0] if len(forecasts) == 1 else forecasts)
+
+    monkeypatch.setattr(api_clients, "upstream_get", fake_get)
+    return requests_made
+
+
+def _bulk(locations):
+    return get_weather_bulk(locations, start_date=DAYS[0], end_date=DAYS[-1])
+
+
+def test_each_location_gets_its_own_forecast(open_meteo):
+    results = _bulk([{"lat": 10.0, "lon": 1.0}, {"lat": 20.0, "lon": 2.0}, {"lat": 30.0, "lon": 3.0}])
+    assert open_meteo == [[10.0, 20.0, 30.0]]
+    assert [r["temperatura"] for r in results] == [10.0, 20.0, 30.0]
+    assert [r["daily"].to_dicts()[0]["temperatura_max"] for r in results] == [11.0, 21.0, 31.0]
+
+
+def test_cached_cells_are_not_refetched(open_meteo):
+    _bulk([{"lat": 10.0, "lon": 1.0}])
+    results = _bulk([{"lat": 10.01, "lon": 1.01}, {"lat": 20.0, "lon": 2.0}])
+    # Pierwsza lokalizacja leży w tej samej komórce siatki - z cache; do API idzie tylko druga
+    assert open_meteo == [[10.0], [20.0]]
+    assert [r["temperatura"] for r in results] == [10.0, 20.0]
+
+
+def test_locations_in_one_cell_are_fetched_once(open_meteo):
+    results = _bulk([{"lat": 10.0, "lon": 1.0}, {"lat": 10.02, "lon": 1.02}])
+    assert open_meteo == [[10.0]]
+    assert results[0]["temperatura"] == results[1]["temperatura"] == 10.0
+    assert results[0]["daily"].to_dicts() == results[1]["daily"].to_dicts()
+
+
+def test_missing_cells_are_fetched_in_chunks(open_meteo):
+    locations = [{"lat": float(i), "lon": 0.0} for i in range(WEATHER_BULK_MAX_LOCATIONS + 5)]
+    results = _bulk(locations)
+    assert [len(lats) for lats in open_meteo] == [WEATHER_BULK_MAX_LOCATIONS, 5]
+    assert [r["temperatura"] for r in results] == [loc["lat"] for loc in locations]
+
+
+def test_invalid_coordinates_give_none(open_meteo):
+    results = _bulk([{"lat": None, "lon": 1.0}, {"lon": 2.0}, {"lat": 10.0, "lon": 1.0}])
+    assert results[:2] == [None, None]
+    assert results[2]["temperatura"] == 10.0
+    assert open_meteo == [[10.0]]
+
+
+def test_suggestions_weather_skips_cities_without_coordinates(open_meteo, monkeypatch):
+    coords = {("Kraków", "Polska"): {"lat": 50.0, "lon": 20.0}, ("Sopot", "Polska"): {"lat": 54.4, "lon": 18.6}}
+    monkeypatch.setattr(services, "local_geocode", lambda name, country: coords.get((name, country)))
+    grouped = {
+        "Polska": [{"name": "Kraków"}, {"name": "Nieznane"}, {"name": "Sopot"}],
+        "Peru": [{"name": "Cusco"}],
+    }
+
+    summaries = services.get_suggestions_weather(grouped, DAYS[0], DAYS[-1])
+    assert open_meteo == [[50.0, 54.4]]
+    assert set(summaries) == {"Polska|Kraków", "Polska|Sopot"}
+    assert summaries["Polska|Kraków"]["temp_max"] == 51
+    assert summaries["Polska|Sopot"]["temp_min"] == 53
+
+
+def test_suggestions_weather_without_coordinates_does_not_call_api(open_meteo, monkeypatch):
+    monkeypatch.setattr(services, "local_geocode", lambda name, country: None)
+    assert services.get_suggestions_weather({"Peru": [{"name": "Cusco"}]}, DAYS[0], DAYS[-1]) == {}
+    assert open_meteo == []
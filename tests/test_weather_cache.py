@@ -0,0 +1,154 @@
+# tests/test_weather_cache.py
+from datetime import date, timedelta
+import pytest
+from app import api_clients, cache
+from app.models import WeatherCacheEntry
+
+
+def _days(n: int) -> list[str]:
+    return [(date(2026, 1, 1) + timedelta(days=i)).isoformat() for i in range(n)]
+
+
+def _forecast(days: list[str]) -> dict:
+    """Minimalna odpowiedź Open-Meteo (current_weather + daily) dla podanych dni."""
+    response = {"current_weather": {"temperature": 3.4, "weathercode": 3, "windspeed": 12.0}}
+    if days:
+        response["daily"] = {
+            "time": days,
+            "temperature_2m_min": [-1.0] * len(days),
+            "temperature_2m_max": [4.0] * len(days),
+            "precipitation_sum": [0.5] * len(days),
+            "windspeed_10m_max": [20.0] * len(days),
+            "weathercode": [61] * len(days),
+        }
+    return response
+
+
+def _rendered(weather: dict) -> dict:
+    """Wynik get_weather z dniami jako słownikami (tak jak trafia do szablonu)."""
+    return {**weather, "daily": weather["daily"].to_dicts()}
+
+
+@pytest.fixture
+def upstream(monkeypatch):
+    calls = []
+
+    def fetch(lat, lon, city=None, s=None, e=None):
+        calls.append((lat, lon, s, e))
+        return _forecast(_days(3) if s else [])
+
+    monkeypatch.setattr(api_clients, "_fetch_forecast", fetch)
+    return calls
+
+
+def test_snap_to_weather_grid(app):
+    app.config["WEATHER_GRID_DEG"] = 0.1
+    assert api_clients.snap_to_weather_grid(50.0614, 19.9366) == (50.1, 19.9)
+    assert api_clients.snap_to_weather_grid(50.0649, 19.9449) == (50.1, 19.9)
+    assert api_clients.snap_to_weather_grid(-33.8688, 151.2093) == (-33.9, 151.2)
+
+
+def test_nearby_points_share_one_cell(app, upstream):
+    days = _days(3)
+    first = api_clients.get_weather("Kraków", days[0], days[-1], lat=50.0614, lon=19.9366)
+    second = api_clients.get_weather("Kraków Rynek", days[0], days[-1], lat=50.0649, lon=19.9449)
+
+    assert _rendered(first) == _rendered(second)
+    assert first["daily"].dates == days
+    # Jedno zapytanie, dla środka komórki
+    assert upstream == [(50.1, 19.9, days[0], days[-1])]
+    keys = {(e.cell_key, e.day) for e in WeatherCacheEntry.query.all()}
+    assert keys == {("50.100,19.900", d) for d in days + [cache.CURRENT_WEATHER_KEY]}
+
+
+def test_other_cell_is_fetched_separately(app, upstream):
+    days = _days(3)
+    api_clients.get_weather("Kraków", days[0], days[-1], lat=50.06, lon=19.94)
+    api_clients.get_weather("Wieliczka", days[0], days[-1], lat=49.98, lon=20.06)
+    assert [(lat, lon) for lat, lon, _, _ in upstream] == [(50.1, 19.9), (50.0, 20.1)]
+
+
+def test_only_missing_days_are_requested(app, upstream):
+    days = _days(3)
+    api_clients.get_weather("Kraków", days[0], days[1], lat=50.06, lon=19.94)
+    api_clients.get_weather("Kraków", days[0], days[2], lat=50.06, lon=19.94)
+    assert [(s, e) for _, _, s, e in upstream] == [(days[0], days[1]), (days[2], days[2])]
+
+
+def test_current_weather_expires_before_daily_forecast(app, upstream, clock):
+    frozen = clock(cache)
+    app.config["WEATHER_CACHE_TTL"] = 3600
+    app.config["WEATHER_CURRENT_CACHE_TTL"] = 900
+    days = _days(3)
+
+    api_clients.get_weather("Kraków", days[0], days[-1], lat=50.06, lon=19.94)
+    frozen.advance(seconds=899)
+    api_clients.get_weather("Kraków", days[0], days[-1], lat=50.06, lon=19.94)
+    assert len(upstream) == 1
+
+    # Wygasła tylko bieżąca pogoda - pytamy bez zakresu dat
+    frozen.advance(seconds=1)
+    api_clients.get_weather("Kraków", days[0], days[-1], lat=50.06, lon=19.94)
+    assert upstream[-1][2:] == (None, None)
+
+    # Po WEATHER_CACHE_TTL wygasają też dni prognozy
+    frozen.advance(seconds=3600)
+    api_clients.get_weather("Kraków", days[0], days[-1], lat=50.06, lon=19.94)
+    assert upstream[-1][2:] == (days[0], days[-1])
+    assert len(upstream) == 3
+
+
+def test_expired_entries_are_served_when_upstream_is_down(app, upstream, clock, monkeypatch):
+    frozen = clock(cache)
+    days = _days(3)
+    fresh = api_clients.get_weather("Kraków", days[0], days[-1], lat=50.06, lon=19.94)
+
+    frozen.advance(days=1)
+    monkeypatch.setattr(api_clients, "_fetch_forecast", lambda *args, **kwargs: None)
+    stale = api_clients.get_weather("Kraków", days[0], days[-1], lat=50.06, lon=19.94)
+    assert _rendered(stale) == _rendered(fresh)
+
+
+@pytest.fixture
+def purge(app, monkeypatch, clock):
+    """Sprzątanie cache z zegarem UTC i monotonicznym pod kontrolą testu."""
+    app.config["CACHE_PURGE_GRACE_SECONDS"] = 24 * 3600
+    app.config["CACHE_PURGE_INTERVAL_SECONDS"] = 3600
+    monotonic = [1000.0]
+    monkeypatch.setattr(cache, "_purged_at", None)
+    monkeypatch.setattr(cache.time, "monotonic", lambda: monotonic[0])
+    return clock(cache), monotonic
+
+
+def test_purge_removes_only_entries_expired_past_grace(purge):
+    frozen, _ = purge
+    cache.weather_cache_put("50.100,19.900", {"2026-01-01": [1.0, 2.0, 0.0, 5.0, 3]})
+    cache.attractions_cache_put("krakow|polska|pl", [{"name": "Wawel"}], "OK")
+    cache.geocode_cache_put("Kraków", {"lat": 50.06, "lon": 19.94})
+
+    # Wygasłe, ale w okresie karencji - nadal dostępne awaryjnie
+    frozen.advance(hours=2)
+    assert cache.purge_expired_cache() == {"geocode_cache": 0, "weather_cache": 0, "attractions_cache": 0}
+    assert cache.weather_cache_get("50.100,19.900", ["2026-01-01"], include_expired=True)
+
+    frozen.advance(days=2)
+    assert cache.purge_expired_cache() == {"geocode_cache": 0, "weather_cache": 1, "attractions_cache": 0}
+    assert WeatherCacheEntry.query.count() == 0
+    assert cache.attractions_cache_get("krakow|polska|pl", include_expired=True)
+
+    frozen.advance(days=100)
+    assert cache.purge_expired_cache() == {"geocode_cache": 1, "weather_cache": 0, "attractions_cache": 1}
+
+
+def test_put_purges_expired_entries_at_most_once_per_interval(purge):
+    frozen, monotonic = purge
+    cache.weather_cache_put("50.100,19.900", {"2026-01-01": [1.0, 2.0, 0.0, 5.0, 3]})
+    frozen.advance(days=2)
+    # Pierwszy zapis w procesie już posprzątał (nic nie było wygasłe) - do końca interwału nie sprzątamy ponownie
+    cache.weather_cache_put("10.000,10.000", {"2026-01-03": [1.0, 2.0, 0.0, 5.0, 3]})
+    assert WeatherCacheEntry.query.filter_by(cell_key="50.100,19.900").count() == 1
+
+    monotonic[0] += 3600
+    cache.weather_cache_put("10.000,10.000", {"2026-01-04": [1.0, 2.0, 0.0, 5.0, 3]})
+    assert WeatherCacheEntry.query.filter_by(cell_key="50.100,19.900").count() == 0
+    assert WeatherCacheEntry.query.filter_by(cell_key="10.000,10.000").count() == 2